@@ -13,7 +13,7 @@
 
 from AlgorithmImports import *
 from Alphas.BasePairsTradingAlphaModel import BasePairsTradingAlphaModel
-from scipy.stats import pearsonr
+from Alphas.RollingCorrelation import RollingCorrelation
 
 class PearsonCorrelationPairsTradingAlphaModel(BasePairsTradingAlphaModel):
     ''' This alpha model is designed to rank every pair combination by its pearson correlation
@@ -57,18 +57,13 @@ class PearsonCorrelationPairsTradingAlphaModel(BasePairsTradingAlphaModel):
             history = history.close.unstack(level=0)
 
             df = self.get_price_dataframe(history)
-            stop = len(df.columns)
 
-            corr = dict()
-
-            for i in range(0, stop):
-                for j in range(i+1, stop):
-                    if (j, i) not in corr:
-                        corr[(i, j)] = pearsonr(df.iloc[:,i], df.iloc[:,j])[0]
-
-            corr = sorted(corr.items(), key = lambda kv: kv[1])
-            if corr[-1][1] >= self.minimum_correlation:
-                self.best_pair = (symbols[corr[-1][0][0]], symbols[corr[-1][0][1]])
+            # every pair at once, columns are in the order of the symbols
+            correlation = RollingCorrelation(len(df), range(len(df.columns)))
+            correlation.update_many(df.values)
+            best = correlation.max_pair()
+            if best is not None and best[2] >= self.minimum_correlation:
+                self.best_pair = (symbols[best[0]], symbols[best[1]])
 
         super().on_securities_changed(algorithm, changes)
 
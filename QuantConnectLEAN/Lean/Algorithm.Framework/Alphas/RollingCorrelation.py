@@ -0,0 +1,138 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+class RollingCorrelation:
+    '''Correlation matrix of a set of series over a rolling window, updated one observation (a value per series) at a time.
+    Pearson keeps the running sums and cross products of the window, an update costs O(N^2).
+    Kendall (tau-b) keeps the matrix of concordant minus discordant pair counts: an update adds the pairs the new
+    observation forms with the window and removes those of the dropped one, a single O(N^2 T) matrix product
+    instead of the O(N^2 T^2) of a full recomputation.
+    Observations must hold a value for every series, align and fill them before updating.'''
+
+    METHODS = ('pearson', 'kendall')
+
+    def __init__(self, size, labels, method = 'pearson'):
+        '''Initializes a new instance of the RollingCorrelation class
+        Args:
+            size: Number of observations in the window
+            labels: Labels of the series, e.g. their symbols, in the order of the observation values
+            method: 'pearson' or 'kendall' '''
+        if method not in self.METHODS:
+            raise ValueError(f'RollingCorrelation: unsupported method {method}, expected one of {self.METHODS}')
+        self.size = size
+        self.labels = list(labels)
+        self.method = method
+        self._index = { label: i for i, label in enumerate(self.labels) }
+        self.reset()
+
+    def reset(self):
+        '''Empties the window'''
+        count = len(self.labels)
+        self._window = np.zeros((self.size, count))
+        self._count = 0
+        self._next = 0
+        self._updates = 0
+        self._sum = np.zeros(count)
+        self._cross = np.zeros((count, count))
+
+    @property
+    def samples(self):
+        '''Number of observations in the window'''
+        return self._count
+
+    @property
+    def is_ready(self):
+        return self._count == self.size
+
+    def update(self, values):
+        '''Adds an observation, dropping the oldest one once the window is full
+        Args:
+            values: A value per series, in the order of the labels'''
+        values = np.asarray(values, dtype=np.float64)
+        window = self._window[:self._count]
+        if self._count == self.size:
+            oldest = self._window[self._next]
+            if self.method == 'pearson':
+                self._sum -= oldest
+                self._cross -= np.outer(oldest, oldest)
+            else:
+                # the dropped row forms no pair with itself, sign(0) = 0
+                signs = np.sign(window - oldest)
+                self._cross -= signs.T @ signs
+        elif self.method == 'kendall':
+            window = self._window[:self._count + 1]
+
+        self._window[self._next] = values
+        self._next = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+        self._updates += 1
+
+        if self.method == 'pearson':
+            self._sum += values
+            self._cross += np.outer(values, values)
+            # recompute the sums once per window length, the running ones drift
+            if self._updates % self.size == 0:
+                window = self._window[:self._count]
+                self._sum = window.sum(axis=0)
+                self._cross = window.T @ window
+        else:
+            signs = np.sign(window - values)
+            self._cross += signs.T @ signs
+
+    def update_many(self, values):
+        '''Adds observations in time order
+        Args:
+            values: 2-d array with an observation per row'''
+        for row in np.asarray(values, dtype=np.float64):
+            self.update(row)
+
+    def correlation(self):
+        '''Correlation matrix of the window, NaN for series without variation'''
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.method == 'pearson':
+                mean = self._sum / self._count
+                covariance = self._cross / self._count - np.outer(mean, mean)
+                scale = np.sqrt(np.maximum(np.diag(covariance), 0))
+                result = covariance / np.outer(scale, scale)
+            else:
+                # the diagonal counts the pairs of each series that are not tied, the tau-b denominator
+                scale = np.sqrt(np.diag(self._cross))
+                result = self._cross / np.outer(scale, scale)
+        return np.clip(result, -1, 1)
+
+    def get(self, label1, label2):
+        '''Correlation between two series'''
+        return self.correlation()[self._index[label1], self._index[label2]]
+
+    def max_pair(self, rows = None, columns = None):
+        '''Most correlated pair of different series
+        Args:
+            rows: Labels the first series of the pair is taken from, all of them by default
+            columns: Labels the second series of the pair is taken from, all of them by default
+        Returns:
+            (row label, column label, correlation), None if no pair has a correlation'''
+        correlation = self.correlation()
+        row_index = np.array([self._index[x] for x in rows] if rows is not None else range(len(self.labels)), dtype=int)
+        column_index = np.array([self._index[x] for x in columns] if columns is not None else range(len(self.labels)), dtype=int)
+        candidates = correlation[np.ix_(row_index, column_index)]
+        excluded = np.isnan(candidates) | (row_index[:, None] == column_index[None, :])
+        if rows is None and columns is None:
+            # each pair once
+            excluded |= row_index[:, None] > column_index[None, :]
+        candidates = np.where(excluded, -np.inf, candidates)
+        if candidates.size == 0 or np.isneginf(candidates.max()):
+            return None
+        i, j = np.unravel_index(np.argmax(candidates), candidates.shape)
+        return self.labels[row_index[i]], self.labels[column_index[j]], float(candidates[i, j])
@@ -0,0 +1,109 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+class RollingRegression:
+    '''Least squares line of each series against time over a rolling window: value = slope * x + intercept, with
+    x = offset, offset + 1, ... from the oldest to the newest observation of the window.
+    The design matrix only depends on the number of observations, its sums are closed form. An update adjusts
+    the sums of the values and of x times the values of every series, O(N), instead of refitting each series.
+    Observations must hold a value for every series, align and fill them before updating.'''
+
+    def __init__(self, size, labels, offset = 0):
+        '''Initializes a new instance of the RollingRegression class
+        Args:
+            size: Number of observations in the window
+            labels: Labels of the series, e.g. their symbols, in the order of the observation values
+            offset: x of the oldest observation of the window'''
+        self.size = size
+        self.labels = list(labels)
+        self.offset = offset
+        self._index = { label: i for i, label in enumerate(self.labels) }
+        self.reset()
+
+    def reset(self):
+        '''Empties the window'''
+        count = len(self.labels)
+        self._window = np.zeros((self.size, count))
+        self._count = 0
+        self._next = 0
+        self._updates = 0
+        self._sum = np.zeros(count)
+        # sum of x * value with x counted from 0 at the oldest observation
+        self._weighted_sum = np.zeros(count)
+
+    @property
+    def samples(self):
+        '''Number of observations in the window'''
+        return self._count
+
+    @property
+    def is_ready(self):
+        return self._count == self.size
+
+    def update(self, values):
+        '''Adds an observation, dropping the oldest one once the window is full
+        Args:
+            values: A value per series, in the order of the labels'''
+        values = np.asarray(values, dtype=np.float64)
+        if self._count == self.size:
+            oldest = self._window[self._next]
+            # every remaining observation moves one x down, the new one takes the last x
+            self._weighted_sum += (self.size - 1) * values - self._sum + oldest
+            self._sum += values - oldest
+        else:
+            self._weighted_sum += self._count * values
+            self._sum += values
+            self._count += 1
+
+        self._window[self._next] = values
+        self._next = (self._next + 1) % self.size
+        self._updates += 1
+
+        # recompute the sums once per window length, the running ones drift
+        if self._updates % self.size == 0:
+            window = np.roll(self._window, -self._next, axis=0) if self._count == self.size else self._window[:self._count]
+            self._sum = window.sum(axis=0)
+            self._weighted_sum = np.arange(self._count) @ window
+
+    def update_many(self, values):
+        '''Adds observations in time order
+        Args:
+            values: 2-d array with an observation per row'''
+        for row in np.asarray(values, dtype=np.float64):
+            self.update(row)
+
+    @property
+    def slopes(self):
+        '''Slope of each series, NaN with fewer than 2 observations'''
+        count = self._count
+        if count < 2:
+            return np.full(len(self.labels), np.nan)
+        mean_x = (count - 1) / 2
+        sum_xx = count * (count * count - 1) / 12
+        return (self._weighted_sum - mean_x * self._sum) / sum_xx
+
+    @property
+    def intercepts(self):
+        '''Intercept of each series, the fitted value at x = 0'''
+        count = self._count
+        if count == 0:
+            return np.full(len(self.labels), np.nan)
+        slopes = self.slopes if count > 1 else np.zeros(len(self.labels))
+        return self._sum / count - slopes * ((count - 1) / 2 + self.offset)
+
+    def get(self, label):
+        '''(slope, intercept) of a series'''
+        index = self._index[label]
+        return self.slopes[index], self.intercepts[index]
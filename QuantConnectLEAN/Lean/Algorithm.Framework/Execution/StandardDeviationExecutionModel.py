@@ -48,23 +48,30 @@ class StandardDeviationExecutionModel(ExecutionModel):
 
         # for performance we check count value, OrderByMarginImpact and ClearFulfilled are expensive to call
         if not self.targets_collection.is_empty:
+            # read the entry inputs of every target with symbol data once, targets without data are skipped
+            entries = []
             for target in self.targets_collection.order_by_margin_impact(algorithm):
-                symbol = target.symbol
+                # fetch our symbol data containing our STD/SMA indicators
+                data = self._symbol_data.get(target.symbol, None)
+                if data is None: continue
 
                 # calculate remaining quantity to be ordered
                 unordered_quantity = OrderSizing.get_unordered_quantity(algorithm, target)
+                entries.append((data, unordered_quantity, data.std.is_ready, data.security.bid_price, data.security.ask_price,
+                    data.sma.current.value, data.std.current.value))
 
-                # fetch our symbol data containing our STD/SMA indicators
-                data = self._symbol_data.get(symbol, None)
-                if data is None: return
+            if entries:
+                # check order entry conditions of all the targets at once
+                unordered, ready, bids, asks, smas, stds = (np.array(column, dtype=float) for column in list(zip(*entries))[1:])
+                favorable = ready.astype(bool) & self.prices_are_favorable(unordered, bids, asks, smas, stds)
 
-                # check order entry conditions
-                if data.std.is_ready and self.price_is_favorable(data, unordered_quantity):
+                for row in np.flatnonzero(favorable).tolist():
+                    data, unordered_quantity = entries[row][:2]
                     # Adjust order size to respect the maximum total order value
                     order_size = OrderSizing.get_order_size_for_maximum_value(data.security, self.maximum_order_value, unordered_quantity)
 
                     if order_size != 0:
-                        algorithm.market_order(symbol, order_size)
+                        algorithm.market_order(data.security.symbol, order_size)
 
             self.targets_collection.clear_fulfilled(algorithm)
 
@@ -98,6 +105,12 @@ class StandardDeviationExecutionModel(ExecutionModel):
             return data.security.ask_price > sma + deviations
 
 
+    def prices_are_favorable(self, unordered_quantities, bid_prices, ask_prices, smas, stds):
+        '''Vectorized price_is_favorable over arrays with an element per target'''
+        deviations = self.deviations * stds
+        return np.where(unordered_quantities > 0, bid_prices < smas - deviations, ask_prices > smas + deviations)
+
+
     def is_safe_to_remove(self, algorithm, symbol):
         '''Determines if it's safe to remove the associated symbol data'''
         # confirm the security isn't currently a member of any universe
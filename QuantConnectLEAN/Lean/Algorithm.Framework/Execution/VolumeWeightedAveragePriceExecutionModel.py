@@ -39,23 +39,28 @@ class VolumeWeightedAveragePriceExecutionModel(ExecutionModel):
 
         # for performance we check count value, OrderByMarginImpact and ClearFulfilled are expensive to call
         if not self.targets_collection.is_empty:
+            # read the entry inputs of every target with symbol data once, targets without data are skipped
+            entries = []
             for target in self.targets_collection.order_by_margin_impact(algorithm):
-                symbol = target.symbol
+                # fetch our symbol data containing our VWAP indicator
+                data = self.symbol_data.get(target.symbol, None)
+                if data is None: continue
 
                 # calculate remaining quantity to be ordered
                 unordered_quantity = OrderSizing.get_unordered_quantity(algorithm, target)
+                entries.append((data, unordered_quantity, data.security.bid_price, data.security.ask_price, data.vwap))
 
-                # fetch our symbol data containing our VWAP indicator
-                data = self.symbol_data.get(symbol, None)
-                if data is None: return
+            if entries:
+                # check order entry conditions of all the targets at once
+                unordered, bids, asks, vwaps = (np.array(column, dtype=float) for column in list(zip(*entries))[1:])
 
-                # check order entry conditions
-                if self.price_is_favorable(data, unordered_quantity):
+                for row in np.flatnonzero(self.prices_are_favorable(unordered, bids, asks, vwaps)).tolist():
+                    data, unordered_quantity = entries[row][:2]
                     # adjust order size to respect maximum order size based on a percentage of current volume
                     order_size = OrderSizing.get_order_size_for_percent_volume(data.security, self.maximum_order_quantity_percent_volume, unordered_quantity)
 
                     if order_size != 0:
-                        algorithm.market_order(symbol, order_size)
+                        algorithm.market_order(data.security.symbol, order_size)
 
             self.targets_collection.clear_fulfilled(algorithm)
 
@@ -89,6 +94,10 @@ class VolumeWeightedAveragePriceExecutionModel(ExecutionModel):
 
         return False
 
+    def prices_are_favorable(self, unordered_quantities, bid_prices, ask_prices, vwaps):
+        '''Vectorized price_is_favorable over arrays with an element per target'''
+        return np.where(unordered_quantities > 0, bid_prices < vwaps, ask_prices > vwaps)
+
     def is_safe_to_remove(self, algorithm, symbol):
         '''Determines if it's safe to remove the associated symbol data'''
         # confirm the security isn't currently a member of any universe
@@ -0,0 +1,176 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from AlgorithmImports import *
+
+import json
+import queue
+import socket
+import threading
+
+class DiscordSignalExport:
+    '''Signal export provider streaming portfolio targets and insights to the Discord bot's signal receiver
+    (bot.py SignalReceiver) over a local socket, as one json line per time slice:
+        {"algorithm": ..., "signal": ..., "time": ..., "targets": [{"symbol", "quantity"}], "insights": [{"symbol", "direction", ...}]}
+    Targets whose quantity did not change since they were last exported are skipped. Batches are written from a
+    background thread, batches queued for the same time are merged into one, so the algorithm never waits on the socket.
+    Targets of batches dropped while the receiver is down are exported again by the next send.
+
+    Usage:
+        export = DiscordSignalExport(signal = "MY_ALGORITHM")
+        self.signal_export.add_signal_export_providers(export)
+        self.insights_generated += export.on_insights_generated'''
+
+    def __init__(self, host = '127.0.0.1', port = 8765, signal = 'LEAN', max_queued_batches = 1000, timeout = 5):
+        '''Initializes a new instance of the DiscordSignalExport class
+        Args:
+            host: Host of the bot's signal receiver
+            port: Port of the bot's signal receiver
+            signal: Signal name the bot's channels subscribe to
+            max_queued_batches: Batches kept while the receiver is not reachable, newer batches are dropped once full
+            timeout: Seconds to wait when connecting and writing to the receiver'''
+        self.host = host
+        self.port = port
+        self.signal = signal
+        self.timeout = timeout
+        self.dropped_batches = 0
+        # last written and last queued quantity per symbol, shared with the writer thread
+        self._lock = threading.Lock()
+        self._written_targets = {}
+        self._queued_targets = {}
+        self._queue = queue.Queue(max_queued_batches)
+        self._socket = None
+        self._thread = threading.Thread(target=self._run, name='DiscordSignalExport', daemon=True)
+        self._thread.start()
+
+    def send(self, parameters):
+        '''Exports the targets that changed since they were last sent
+        Args:
+            parameters: SignalExportTargetParameters holding the targets and the algorithm
+        Returns:
+            False when the batch could not be queued'''
+        targets = []
+        exported = []
+        with self._lock:
+            for target in parameters.targets:
+                key = str(target.symbol.id)
+                quantity = float(target.quantity)
+                if self._queued_targets.get(key, self._written_targets.get(key)) == quantity:
+                    continue
+                self._queued_targets[key] = quantity
+                exported.append((key, quantity))
+                targets.append({ 'symbol': target.symbol.value, 'quantity': quantity })
+        if not targets:
+            return True
+        return self._enqueue(parameters.algorithm, targets, [], exported)
+
+    def on_insights_generated(self, algorithm, insights_collection):
+        '''Event handler for QCAlgorithm.insights_generated exporting the insights of the time slice'''
+        if not algorithm.live_mode:
+            return
+        insights = [{
+                'symbol': insight.symbol.value,
+                'direction': int(insight.direction),
+                'period': insight.period.total_seconds(),
+                'magnitude': insight.magnitude,
+                'confidence': insight.confidence,
+                'source_model': insight.source_model
+            } for insight in insights_collection.insights]
+        if insights:
+            self._enqueue(algorithm, [], insights, [])
+
+    def _enqueue(self, algorithm, targets, insights, exported):
+        batch = {
+            'algorithm': algorithm.name,
+            'signal': self.signal,
+            'time': algorithm.utc_time.isoformat(),
+            'targets': targets,
+            'insights': insights
+        }
+        try:
+            self._queue.put_nowait((batch, exported))
+        except queue.Full:
+            if self._dropped([exported]) == 1:
+                algorithm.debug(f'DiscordSignalExport: receiver at {self.host}:{self.port} is not keeping up, dropping batches')
+            return False
+        return True
+
+    def _dropped(self, exported):
+        '''Forgets the queued quantities of dropped batches so the targets are sent again
+        Args:
+            exported: (symbol id, quantity) targets of each dropped batch
+        Returns:
+            The number of batches dropped so far'''
+        with self._lock:
+            for targets in exported:
+                for key, quantity in targets:
+                    if self._queued_targets.get(key) == quantity:
+                        del self._queued_targets[key]
+            self.dropped_batches += len(exported)
+            return self.dropped_batches
+
+    def _written(self, exported):
+        with self._lock:
+            for targets in exported:
+                for key, quantity in targets:
+                    self._written_targets[key] = quantity
+                    if self._queued_targets.get(key) == quantity:
+                        del self._queued_targets[key]
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            # everything queued meanwhile goes out in the same write, merged per time slice
+            batches = [item[0]]
+            exported = [item[1]]
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    self._write(batches, exported)
+                    return
+                batch, last = item[0], batches[-1]
+                if batch['time'] == last['time'] and batch['algorithm'] == last['algorithm']:
+                    last['targets'] += batch['targets']
+                    last['insights'] += batch['insights']
+                    exported[-1] = exported[-1] + item[1]
+                else:
+                    batches.append(batch)
+                    exported.append(item[1])
+            self._write(batches, exported)
+
+    def _write(self, batches, exported):
+        data = ''.join(json.dumps(batch) + '\n' for batch in batches).encode()
+        for _ in range(2):
+            try:
+                if self._socket is None:
+                    self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+                self._socket.sendall(data)
+                self._written(exported)
+                return
+            except OSError:
+                # the receiver restarted or is not up yet, reconnect once
+                self._close_socket()
+        self._dropped(exported)
+
+    def _close_socket(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def dispose(self):
+        '''Writes the queued batches and closes the socket, e.g. from on_end_of_algorithm'''
+        self._queue.put(None)
+        self._thread.join(self.timeout)
+        self._close_socket()
@@ -12,7 +12,8 @@
 # limitations under the License.
 
 from AlgorithmImports import *
-from itertools import groupby
+from Risk.RiskStateEngine import HoldingsListener
+from collections import deque
 
 class MaximumSectorExposureRiskManagementModel(RiskManagementModel):
     '''Provides an implementation of IRiskManagementModel that that limits the sector exposure to the specified percentage'''
@@ -26,6 +27,13 @@ class MaximumSectorExposureRiskManagementModel(RiskManagementModel):
 
         self.maximum_sector_exposure = maximum_sector_exposure
         self.targets_collection = PortfolioTargetCollection()
+        # industry template code by symbol of the securities with fundamental data, refreshed by manage_risk once exposed
+        self.sector_by_symbol = {}
+        # securities of each sector with holdings or a target, the only ones adding to the sector exposure
+        self.exposed_by_sector = {}
+        # securities whose holdings changed, from the HoldingsListener of the algorithm
+        self._changed = deque()
+        self._listener = None
 
     def manage_risk(self, algorithm, targets):
         '''Manages the algorithm's risk at each time step
@@ -34,35 +42,49 @@ class MaximumSectorExposureRiskManagementModel(RiskManagementModel):
         maximum_sector_exposure_value = float(algorithm.portfolio.total_portfolio_value) * self.maximum_sector_exposure
 
         self.targets_collection.add_range(targets)
+        for target in targets:
+            if target.symbol in self.sector_by_symbol:
+                self._expose(algorithm.securities[target.symbol])
+        # holdings changed without a target, e.g. orders placed by the algorithm itself
+        while self._changed:
+            security = self._changed.popleft()
+            if security.symbol in self.sector_by_symbol and security.holdings.quantity != 0:
+                self._expose(security)
+        # the industry code comes from the fundamentals, which change over time
+        for exposed in list(self.exposed_by_sector.values()):
+            for security in list(exposed.values()):
+                self._expose(security)
 
         risk_targets = list()
 
-        # Group the securities by their sector
-        filtered = list(filter(lambda x: x.value.fundamentals is not None and x.value.fundamentals.has_fundamental_data, algorithm.universe_manager.active_securities))
-        filtered.sort(key = lambda x: x.value.fundamentals.company_reference.industry_template_code)
-        group_by_sector = groupby(filtered, lambda x: x.value.fundamentals.company_reference.industry_template_code)
-
-        for code, securities in group_by_sector:
+        for code in sorted(self.exposed_by_sector):
+            exposed = self.exposed_by_sector[code]
             # Compute the sector absolute holdings value
             # If the construction model has created a target, we consider that
             # value to calculate the security absolute holding value
             quantities = {}
             sector_absolute_holdings_value = 0
 
-            for security in securities:
-                symbol = security.value.symbol
-                quantities[symbol] = security.value.holdings.quantity
-                absolute_holdings_value = security.value.holdings.absolute_holdings_value
+            for symbol, security in list(exposed.items()):
+                quantities[symbol] = security.holdings.quantity
+                absolute_holdings_value = security.holdings.absolute_holdings_value
 
                 if self.targets_collection.contains_key(symbol):
                     quantities[symbol] = self.targets_collection[symbol].quantity
 
-                    absolute_holdings_value = (security.value.price * abs(quantities[symbol]) *
-                        security.value.symbol_properties.contract_multiplier *
-                        security.value.quote_currency.conversion_rate)
+                    absolute_holdings_value = (security.price * abs(quantities[symbol]) *
+                        security.symbol_properties.contract_multiplier *
+                        security.quote_currency.conversion_rate)
+
+                elif quantities[symbol] == 0:
+                    # closed without a target, it no longer adds to the exposure
+                    del exposed[symbol]
 
                 sector_absolute_holdings_value += absolute_holdings_value
 
+            if not exposed:
+                del self.exposed_by_sector[code]
+
             # If the ratio between the sector absolute holdings value and the maximum sector exposure value
             # exceeds the unity, it means we need to reduce each security of that sector by that ratio
             # Otherwise, it means that the sector exposure is below the maximum and there is nothing to do.
@@ -75,15 +97,53 @@ class MaximumSectorExposureRiskManagementModel(RiskManagementModel):
 
         return risk_targets
 
+    def _expose(self, security):
+        '''Adds the security to the exposure of its current sector, moving it if its industry code changed'''
+        symbol = security.symbol
+        fundamentals = security.fundamentals
+        code = None
+        if fundamentals is not None and fundamentals.has_fundamental_data:
+            code = fundamentals.company_reference.industry_template_code
+        previous = self.sector_by_symbol.get(symbol)
+        if code != previous:
+            exposed = self.exposed_by_sector.get(previous)
+            if exposed is not None:
+                exposed.pop(symbol, None)
+                if not exposed:
+                    del self.exposed_by_sector[previous]
+            if code is None:
+                del self.sector_by_symbol[symbol]
+                return
+            self.sector_by_symbol[symbol] = code
+        self.exposed_by_sector.setdefault(code, {})[symbol] = security
+
     def on_securities_changed(self, algorithm, changes):
         '''Event fired each time the we add/remove securities from the data feed
         Args:
             algorithm: The algorithm instance that experienced the change in securities
             changes: The security additions and removals from the algorithm'''
-        any_fundamental_data = any([
-            kvp.value.fundamentals is not None and
-            kvp.value.fundamentals.has_fundamental_data for kvp in algorithm.active_securities
-            ])
-
-        if not any_fundamental_data:
+        if self._listener is None:
+            self._listener = HoldingsListener.of(algorithm)
+            self._listener.register(self)
+
+        for security in changes.removed_securities:
+            self._listener.unsubscribe(security)
+            code = self.sector_by_symbol.pop(security.symbol, None)
+            if code is not None and code in self.exposed_by_sector:
+                self.exposed_by_sector[code].pop(security.symbol, None)
+                if not self.exposed_by_sector[code]:
+                    del self.exposed_by_sector[code]
+
+        for security in changes.added_securities:
+            self._listener.subscribe(security)
+            fundamentals = security.fundamentals
+            if fundamentals is None or not fundamentals.has_fundamental_data:
+                continue
+            code = fundamentals.company_reference.industry_template_code
+            self.sector_by_symbol[security.symbol] = code
+            # e.g. added back while still held
+            if security.holdings.quantity != 0 or self.targets_collection.contains_key(security.symbol):
+                self.exposed_by_sector.setdefault(code, {})[security.symbol] = security
+
+        if not self.sector_by_symbol:
             raise Exception("MaximumSectorExposureRiskManagementModel.on_securities_changed: Please select a portfolio selection model that selects securities with fundamental data.")
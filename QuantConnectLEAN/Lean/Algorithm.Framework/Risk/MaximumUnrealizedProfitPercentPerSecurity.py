@@ -12,6 +12,7 @@
 # limitations under the License.
 
 from AlgorithmImports import *
+from Risk.RiskStateEngine import RiskStateEngine
 
 class MaximumUnrealizedProfitPercentPerSecurity(RiskManagementModel):
     '''Provides an implementation of IRiskManagementModel that limits the unrealized profit per holding to the specified percentage'''
@@ -21,27 +22,30 @@ class MaximumUnrealizedProfitPercentPerSecurity(RiskManagementModel):
         Args:
             maximum_unrealized_profit_percent: The maximum percentage unrealized profit allowed for any single security holding, defaults to 5% drawdown per security'''
         self.maximum_unrealized_profit_percent = abs(maximum_unrealized_profit_percent)
+        # invested securities
+        self.positions = RiskStateEngine()
 
     def manage_risk(self, algorithm, targets):
         '''Manages the algorithm's risk at each time step
         Args:
             algorithm: The algorithm instance
             targets: The current portfolio targets to be assessed for risk'''
-        targets = []
-        for kvp in algorithm.securities:
-            security = kvp.value
+        invested, _, pnl = self.positions.update(algorithm, 'unrealized_profit_percent')
+        rows = np.flatnonzero(invested & (pnl[0] > self.maximum_unrealized_profit_percent))
+        if len(rows) == 0:
+            return []
 
-            if not security.invested:
-                continue
+        symbols = [self.positions.securities[row].symbol for row in rows.tolist()]
 
-            pnl = security.holdings.unrealized_profit_percent
-            if pnl > self.maximum_unrealized_profit_percent:
-                symbol = security.symbol
+        # Cancel insights
+        algorithm.insights.cancel(symbols)
 
-                # Cancel insights
-                algorithm.insights.cancel([ symbol ]);
+        # liquidate
+        return [PortfolioTarget(symbol, 0) for symbol in symbols]
 
-                # liquidate
-                targets.append(PortfolioTarget(symbol, 0))
-
-        return targets
+    def on_securities_changed(self, algorithm, changes):
+        '''Event fired each time the we add/remove securities from the data feed
+        Args:
+            algorithm: The algorithm instance that experienced the change in securities
+            changes: The security additions and removals from the algorithm'''
+        self.positions.on_securities_changed(algorithm, changes)
@@ -0,0 +1,179 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+from collections import deque
+from weakref import WeakSet
+
+# HoldingsListener of each algorithm
+_listeners = {}
+
+class HoldingsListener:
+    '''Listens to the holdings quantity changed event of the algorithm's securities once, for all its RiskStateEngines
+    and the risk models reading the changes themselves, through a _changed deque.
+    A composite of risk models adds a single handler per security, not one per model.
+    Engines are held weakly, the engine of a replaced model stops receiving changes once it is collected'''
+
+    def __init__(self):
+        self.engines = WeakSet()
+        self.securities = {}
+        # the same delegate is added and removed
+        self._handler = self._on_quantity_changed
+
+    @staticmethod
+    def of(algorithm):
+        '''The listener of the algorithm, created on first use'''
+        listener = _listeners.get(algorithm)
+        if listener is None:
+            listener = HoldingsListener()
+            _listeners[algorithm] = listener
+        return listener
+
+    def register(self, engine):
+        '''Adds an engine, it gets the securities listened to so far'''
+        self.engines.add(engine)
+        engine._changed.extend(self.securities.values())
+
+    def unregister(self, engine):
+        '''Removes an engine, it no longer gets the holdings changes'''
+        self.engines.discard(engine)
+
+    def subscribe(self, security):
+        if security.symbol in self.securities:
+            return
+        self.securities[security.symbol] = security
+        security.holdings.quantity_changed += self._handler
+        for engine in self.engines:
+            engine._changed.append(security)
+
+    def unsubscribe(self, security):
+        if self.securities.pop(security.symbol, None) is not None:
+            security.holdings.quantity_changed -= self._handler
+
+    def _on_quantity_changed(self, sender, args):
+        # raised by fills, maybe on another thread: the next update of each engine applies it
+        for engine in self.engines:
+            engine._changed.append(args.security)
+
+class RiskStateEngine:
+    '''Holdings of the securities an algorithm is positioned in, a row per security, for the per security risk models.
+    Securities are found through their holdings quantity changed event, listened to once per algorithm by a
+    HoldingsListener, instead of going over every security of the algorithm on each call. Each call reads only the
+    tracked rows and the models evaluate them as arrays. Also keeps the trailing high water mark of each row's
+    absolute holdings value, which is why every model has its own engine.'''
+
+    def __init__(self, capacity = 256):
+        '''Initializes a new instance of the RiskStateEngine class
+        Args:
+            capacity: Initial number of rows, grown as needed'''
+        self.securities = []
+        self._rows = {}
+        # NaN when the row has no trailing state
+        self._marks = np.full(capacity, np.nan)
+        self._longs = np.zeros(capacity, dtype=bool)
+        self._changed = deque()
+        self._listener = None
+
+    def __len__(self):
+        return len(self.securities)
+
+    def on_securities_changed(self, algorithm, changes):
+        '''Listens to the holdings of the added securities and stops listening to the removed ones. A removed
+        security still invested stays tracked until its position is closed'''
+        listener = self._listen(algorithm)
+        for security in changes.added_securities:
+            listener.subscribe(security)
+        for security in changes.removed_securities:
+            listener.unsubscribe(security)
+
+    def _listen(self, algorithm):
+        if self._listener is None:
+            self._listener = HoldingsListener.of(algorithm)
+            self._listener.register(self)
+            # securities held before the model was set
+            for kvp in algorithm.securities:
+                self._listener.subscribe(kvp.value)
+        return self._listener
+
+    def update(self, algorithm, *fields):
+        '''Tracks the securities whose holdings changed and reads the holdings of every tracked security.
+        Securities neither invested nor holding any quantity stop being tracked
+        Args:
+            algorithm: The algorithm instance
+            fields: Names of the SecurityHolding properties to read, e.g. 'absolute_holdings_value'
+        Returns:
+            (invested, quantities, values) arrays aligned with securities, values has a row per field'''
+        self._listen(algorithm)
+        while self._changed:
+            security = self._changed.popleft()
+            if security.symbol not in self._rows:
+                self._add(security)
+
+        count = len(self.securities)
+        holdings = [security.holdings for security in self.securities]
+        invested = np.fromiter((security.invested for security in self.securities), dtype=bool, count=count)
+        quantities = np.fromiter((float(x.quantity) for x in holdings), dtype=np.float64, count=count)
+        values = np.array([[float(getattr(x, field)) for x in holdings] for field in fields], dtype=np.float64).reshape(len(fields), count)
+
+        closed = ~invested & (quantities == 0)
+        if closed.any():
+            keep = ~closed
+            self._compact(keep)
+            invested, quantities, values = invested[keep], quantities[keep], values[:, keep]
+        return invested, quantities, values
+
+    def _add(self, security):
+        row = len(self.securities)
+        if row == len(self._marks):
+            self._marks = np.concatenate([self._marks, np.full(row, np.nan)])
+            self._longs = np.concatenate([self._longs, np.zeros(row, dtype=bool)])
+        self._rows[security.symbol] = row
+        self.securities.append(security)
+        self._marks[row] = np.nan
+
+    def _compact(self, keep):
+        count = len(self.securities)
+        kept = int(keep.sum())
+        self._marks[:kept] = self._marks[:count][keep]
+        self._longs[:kept] = self._longs[:count][keep]
+        self.securities = [security for security, k in zip(self.securities, keep) if k]
+        self._rows = { security.symbol: row for row, security in enumerate(self.securities) }
+
+    def trailing_drawdowns(self, invested, quantities, values):
+        '''Drawdown of each row's absolute holdings value from its trailing mark: the highest value of a long
+        position, the lowest of a short one. A new position, or one that changed side, trails from its absolute
+        holdings cost. Rows at a new mark have no drawdown, rows not invested lose their mark
+        Args:
+            invested, quantities: As returned by update
+            values: Absolute holdings value of each row
+        Returns:
+            Array of drawdowns, 0 for rows not invested'''
+        count = len(self.securities)
+        marks = self._marks[:count]
+        longs = quantities > 0
+
+        start = invested & (np.isnan(marks) | (longs != self._longs[:count]))
+        for row in np.flatnonzero(start).tolist():
+            marks[row] = float(self.securities[row].holdings.absolute_holdings_cost)
+        self._longs[:count] = longs
+        marks[~invested] = np.nan
+
+        improved = invested & np.where(longs, values > marks, values < marks)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = np.where(invested & ~improved, np.abs((marks - values) / marks), 0)
+        marks[improved] = values[improved]
+        return drawdowns
+
+    def reset_marks(self, rows):
+        '''Drops the trailing state of the rows, they trail from their holdings cost again on the next call'''
+        self._marks[rows] = np.nan
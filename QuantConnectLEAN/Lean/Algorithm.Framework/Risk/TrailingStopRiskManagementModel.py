@@ -12,6 +12,7 @@
 # limitations under the License.
 
 from AlgorithmImports import *
+from Risk.RiskStateEngine import RiskStateEngine
 
 class TrailingStopRiskManagementModel(RiskManagementModel):
     '''Provides an implementation of IRiskManagementModel that limits the maximum possible loss
@@ -21,53 +22,34 @@ class TrailingStopRiskManagementModel(RiskManagementModel):
         Args:
             maximum_drawdown_percent: The maximum percentage drawdown allowed for algorithm portfolio compared with the highest unrealized profit, defaults to 5% drawdown'''
         self.maximum_drawdown_percent = abs(maximum_drawdown_percent)
-        self.trailing_absolute_holdings_state = dict()
+        # invested securities and their trailing absolute holdings value
+        self.positions = RiskStateEngine()
 
     def manage_risk(self, algorithm, targets):
         '''Manages the algorithm's risk at each time step
         Args:
             algorithm: The algorithm instance
             targets: The current portfolio targets to be assessed for risk'''
-        risk_adjusted_targets = list()
+        invested, quantities, values = self.positions.update(algorithm, 'absolute_holdings_value')
 
-        for kvp in algorithm.securities:
-            symbol = kvp.key
-            security = kvp.value
+        # new max (for long position) or min (for short position) absolute holdings values have no drawdown
+        drawdowns = self.positions.trailing_drawdowns(invested, quantities, values[0])
+        rows = np.flatnonzero(drawdowns > self.maximum_drawdown_percent)
+        if len(rows) == 0:
+            return []
 
-            # Remove if not invested
-            if not security.invested:
-                self.trailing_absolute_holdings_state.pop(symbol, None)
-                continue
+        symbols = [self.positions.securities[row].symbol for row in rows.tolist()]
 
-            position = PositionSide.LONG if security.holdings.is_long else PositionSide.SHORT
-            absolute_holdings_value = security.holdings.absolute_holdings_value
-            trailing_absolute_holdings_state = self.trailing_absolute_holdings_state.get(symbol)
+        # Cancel insights
+        algorithm.insights.cancel(symbols)
 
-            # Add newly invested security (if doesn't exist) or reset holdings state (if position changed)
-            if trailing_absolute_holdings_state == None or position != trailing_absolute_holdings_state.position:
-                self.trailing_absolute_holdings_state[symbol] = trailing_absolute_holdings_state = self.HoldingsState(position, security.holdings.absolute_holdings_cost)
+        self.positions.reset_marks(rows)
+        # liquidate
+        return [PortfolioTarget(symbol, 0) for symbol in symbols]
 
-            trailing_absolute_holdings_value = trailing_absolute_holdings_state.absolute_holdings_value
-
-            # Check for new max (for long position) or min (for short position) absolute holdings value
-            if ((position == PositionSide.LONG and trailing_absolute_holdings_value < absolute_holdings_value) or
-                (position == PositionSide.SHORT and trailing_absolute_holdings_value > absolute_holdings_value)):
-                self.trailing_absolute_holdings_state[symbol].absolute_holdings_value = absolute_holdings_value
-                continue
-
-            drawdown = abs((trailing_absolute_holdings_value - absolute_holdings_value) / trailing_absolute_holdings_value)
-
-            if self.maximum_drawdown_percent < drawdown:
-                # Cancel insights
-                algorithm.insights.cancel([ symbol ]);
-
-                self.trailing_absolute_holdings_state.pop(symbol, None)
-                # liquidate
-                risk_adjusted_targets.append(PortfolioTarget(symbol, 0))
-
-        return risk_adjusted_targets
-
-    class HoldingsState:
-        def __init__(self, position, absolute_holdings_value):
-            self.position = position
-            self.absolute_holdings_value = absolute_holdings_value
+    def on_securities_changed(self, algorithm, changes):
+        '''Event fired each time the we add/remove securities from the data feed
+        Args:
+            algorithm: The algorithm instance that experienced the change in securities
+            changes: The security additions and removals from the algorithm'''
+        self.positions.on_securities_changed(algorithm, changes)
@@ -13,6 +13,8 @@
 
 from AlgorithmImports import *
 from Selection.FundamentalUniverseSelectionModel import FundamentalUniverseSelectionModel
+from Selection.EmaStateStore import EmaStateStore
+from Selection.Ranking import top_indices
 
 class EmaCrossUniverseSelectionModel(FundamentalUniverseSelectionModel):
     '''Provides an implementation of FundamentalUniverseSelectionModel that subscribes to
@@ -34,8 +36,8 @@ class EmaCrossUniverseSelectionModel(FundamentalUniverseSelectionModel):
         self.slow_period = slowPeriod
         self.universe_count = universeCount
         self.tolerance = 0.01
-        # holds our coarse fundamental indicators by symbol
-        self.averages = {}
+        # holds our coarse fundamental fast and slow averages, a row per symbol
+        self.averages = EmaStateStore((fastPeriod, slowPeriod))
 
     def select_coarse(self, algorithm: QCAlgorithm, fundamental: list[Fundamental]) -> list[Symbol]:
         '''Defines the coarse fundamental selection function.
@@ -44,46 +46,23 @@ class EmaCrossUniverseSelectionModel(FundamentalUniverseSelectionModel):
             fundamental: The coarse fundamental data used to perform filtering</param>
         Returns:
             An enumerable of symbols passing the filter'''
-        filtered = []
-
+        symbols = []
+        prices = []
         for cf in fundamental:
-            if cf.symbol not in self.averages:
-                self.averages[cf.symbol] = self.SelectionData(cf.symbol, self.fast_period, self.slow_period)
+            symbols.append(cf.symbol)
+            prices.append(cf.adjusted_price)
 
-            # grab th SelectionData instance for this symbol
-            avg = self.averages.get(cf.symbol)
+        # update every symbol's averages at once, they are ready once both periods are filled
+        rows = self.averages.rows(symbols)
+        ready = self.averages.update(rows, prices)
+        fast = self.averages.current(0, rows)
+        slow = self.averages.current(1, rows)
 
-            # Update returns true when the indicators are ready, so don't accept until they are
-            # and only pick symbols who have their fastPeriod-day ema over their slowPeriod-day ema
-            if avg.update(cf.end_time, cf.adjusted_price) and avg.fast > avg.slow * (1 + self.tolerance):
-                filtered.append(avg)
+        # only pick symbols who have their fastPeriod-day ema over their slowPeriod-day ema
+        filtered = np.flatnonzero(ready & (fast > slow * (1 + self.tolerance)))
 
         # prefer symbols with a larger delta by percentage between the two averages
-        filtered = sorted(filtered, key=lambda avg: avg.scaled_delta, reverse = True)
+        scaled_delta = (fast[filtered] - slow[filtered]) / ((fast[filtered] + slow[filtered]) / 2)
 
         # we only need to return the symbol and return 'universeCount' symbols
-        return [x.symbol for x in filtered[:self.universe_count]]
-
-    # class used to improve readability of the coarse selection function
-    class SelectionData:
-        def __init__(self, symbol, fast_period, slow_period):
-            self.symbol = symbol
-            self.fast_ema = ExponentialMovingAverage(fast_period)
-            self.slow_ema = ExponentialMovingAverage(slow_period)
-
-        @property
-        def fast(self):
-            return float(self.fast_ema.current.value)
-
-        @property
-        def slow(self):
-            return float(self.slow_ema.current.value)
-
-        # computes an object score of how much large the fast is than the slow
-        @property
-        def scaled_delta(self):
-            return (self.fast - self.slow) / ((self.fast + self.slow) / 2)
-
-        # updates the EMAFast and EMASlow indicators, returning true when they're both ready
-        def update(self, time, value):
-            return self.slow_ema.update(time, value) & self.fast_ema.update(time, value)
+        return [symbols[i] for i in filtered[top_indices(scaled_delta, self.universe_count)].tolist()]
@@ -0,0 +1,91 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+class EmaStateStore:
+    '''Exponential moving averages of many symbols for a set of periods, kept in arrays with a row per symbol.
+    Each average follows Lean's ExponentialMovingAverage: 0 until it has period samples, then the mean of the
+    first period values, then value * k + previous * (1 - k) with k = 2 / (period + 1).
+    A selection updates the rows of all its symbols in one step instead of an indicator update per symbol.'''
+
+    def __init__(self, periods, capacity = 1024):
+        '''Initializes a new instance of the EmaStateStore class
+        Args:
+            periods: Period of each average, e.g. (fast, slow)
+            capacity: Initial number of rows, grown as symbols are added'''
+        self.periods = tuple(periods)
+        self._rows = {}
+        self._samples = np.zeros(capacity, dtype=np.int64)
+        self._sums = np.zeros((len(self.periods), capacity))
+        self._current = np.zeros((len(self.periods), capacity))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def rows(self, keys):
+        '''Row of each key, adding the keys seen for the first time
+        Args:
+            keys: The symbols
+        Returns:
+            Array of row indices'''
+        rows = self._rows
+        result = np.fromiter((rows.setdefault(key, len(rows)) for key in keys), dtype=np.int64)
+        if len(rows) > len(self._samples):
+            self._grow(len(rows))
+        return result
+
+    def _grow(self, count):
+        capacity = max(count, 2 * len(self._samples))
+        self._samples = np.concatenate([self._samples, np.zeros(capacity - len(self._samples), dtype=np.int64)])
+        padding = np.zeros((len(self.periods), capacity - self._sums.shape[1]))
+        self._sums = np.hstack([self._sums, padding])
+        self._current = np.hstack([self._current, padding])
+
+    def update(self, rows, values):
+        '''Updates the averages of the rows with a value each
+        Args:
+            rows: Row indices returned by rows, without duplicates
+            values: The new value of each row
+        Returns:
+            Boolean array, true where every average of the row is ready'''
+        values = np.asarray(values, dtype=np.float64)
+        samples = self._samples[rows] + 1
+        self._samples[rows] = samples
+        for i, period in enumerate(self.periods):
+            k = 2 / (period + 1)
+            # the first period values are summed for the initial mean
+            sums = self._sums[i, rows] + np.where(samples <= period, values, 0)
+            self._sums[i, rows] = sums
+            current = self._current[i, rows]
+            self._current[i, rows] = np.where(samples > period, values * k + current * (1 - k),
+                                              np.where(samples == period, sums / period, 0))
+        return samples >= max(self.periods)
+
+    def current(self, period_index, rows):
+        '''Current value of an average for the rows
+        Args:
+            period_index: Index of the period in periods
+            rows: Row indices'''
+        return self._current[period_index, rows]
+
+    def samples(self, rows):
+        '''Number of values each row was updated with'''
+        return self._samples[rows]
+
+    def reset(self):
+        '''Drops every symbol'''
+        self.__init__(self.periods, len(self._samples))
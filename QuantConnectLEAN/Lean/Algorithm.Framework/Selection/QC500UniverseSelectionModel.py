@@ -13,7 +13,8 @@
 
 from AlgorithmImports import *
 from Selection.FundamentalUniverseSelectionModel import FundamentalUniverseSelectionModel
-from itertools import groupby
+from Selection.Ranking import top_indices
+from heapq import nlargest
 from math import ceil
 
 class QC500UniverseSelectionModel(FundamentalUniverseSelectionModel):
@@ -36,10 +37,12 @@ class QC500UniverseSelectionModel(FundamentalUniverseSelectionModel):
         if algorithm.time.month == self.last_month:
             return Universe.UNCHANGED
 
-        sorted_by_dollar_volume = sorted([x for x in fundamental if x.has_fundamental_data and x.volume > 0 and x.price > 0],
-                                     key = lambda x: x.dollar_volume, reverse=True)[:self.number_of_symbols_coarse]
+        # read every attribute once, then keep the top dollar volumes without sorting the whole universe
+        selected = [x for x in fundamental if x.has_fundamental_data and x.volume > 0 and x.price > 0]
+        dollar_volumes = np.array([x.dollar_volume for x in selected], dtype=float)
+        top = top_indices(dollar_volumes, self.number_of_symbols_coarse)
 
-        self.dollar_volume_by_symbol = {x.Symbol:x.dollar_volume for x in sorted_by_dollar_volume}
+        self.dollar_volume_by_symbol = {selected[i].symbol:dollar_volumes[i] for i in top.tolist()}
 
         # If no security has met the QC500 criteria, the universe is unchanged.
         # A new selection will be attempted on the next trading day as self.lastMonth is not updated
@@ -56,13 +59,18 @@ class QC500UniverseSelectionModel(FundamentalUniverseSelectionModel):
         At least half a year since its initial public offering
         The stock's market cap must be greater than 500 million'''
 
-        sorted_by_sector = sorted([x for x in fundamental if x.company_reference.country_id == "USA"
-                                        and x.company_reference.primary_exchange_id in ["NYS","NAS"]
-                                        and (algorithm.time - x.security_reference.ipo_date).days > 180
-                                        and x.market_cap > 5e8],
-                               key = lambda x: x.company_reference.industry_template_code)
-
-        count = len(sorted_by_sector)
+        # dollar volumes of the filtered stocks by industry, in fundamental order
+        by_industry = {}
+        count = 0
+        for x in fundamental:
+            company_reference = x.company_reference
+            if (company_reference.country_id == "USA"
+                    and company_reference.primary_exchange_id in ("NYS", "NAS")
+                    and (algorithm.time - x.security_reference.ipo_date).days > 180
+                    and x.market_cap > 5e8):
+                symbol = x.symbol
+                by_industry.setdefault(company_reference.industry_template_code, []).append((self.dollar_volume_by_symbol[symbol], symbol))
+                count += 1
 
         # If no security has met the QC500 criteria, the universe is unchanged.
         # A new selection will be attempted on the next trading day as self.lastMonth is not updated
@@ -73,13 +81,11 @@ class QC500UniverseSelectionModel(FundamentalUniverseSelectionModel):
         self.last_month = algorithm.time.month
 
         percent = self.number_of_symbols_fine / count
-        sorted_by_dollar_volume = []
+        top_by_industry = []
 
         # select stocks with top dollar volume in every single sector
-        for code, g in groupby(sorted_by_sector, lambda x: x.company_reference.industry_template_code):
-            y = sorted(g, key = lambda x: self.dollar_volume_by_symbol[x.Symbol], reverse = True)
-            c = ceil(len(y) * percent)
-            sorted_by_dollar_volume.extend(y[:c])
+        for code in sorted(by_industry):
+            y = by_industry[code]
+            top_by_industry.extend(nlargest(ceil(len(y) * percent), y, key = lambda x: x[0]))
 
-        sorted_by_dollar_volume = sorted(sorted_by_dollar_volume, key = lambda x: self.dollar_volume_by_symbol[x.Symbol], reverse=True)
-        return [x.Symbol for x in sorted_by_dollar_volume[:self.number_of_symbols_fine]]
+        return [symbol for _, symbol in nlargest(self.number_of_symbols_fine, top_by_industry, key = lambda x: x[0])]
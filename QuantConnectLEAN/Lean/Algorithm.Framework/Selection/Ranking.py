@@ -0,0 +1,27 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+def top_indices(values, count):
+    '''Indices of the count largest values, largest first, equal values in index order like a stable
+    sorted(reverse = True)[:count], selected with a partition instead of a full sort'''
+    values = np.asarray(values)
+    indices = np.arange(len(values))
+    if count <= 0:
+        return indices[:0]
+    if len(values) > count:
+        kth = np.partition(values, -count)[-count]
+        above = np.flatnonzero(values > kth)
+        indices = np.concatenate([above, np.flatnonzero(values == kth)[:count - len(above)]])
+    return indices[np.lexsort((indices, -values[indices]))]
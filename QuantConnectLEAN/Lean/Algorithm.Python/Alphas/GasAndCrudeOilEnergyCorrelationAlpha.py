@@ -27,6 +27,7 @@
 '''
 
 from AlgorithmImports import *
+from Alphas.RollingCorrelation import RollingCorrelation
 
 class GasAndCrudeOilEnergyCorrelationAlpha(QCAlgorithm):
 
@@ -80,6 +81,9 @@ class PairsAlphaModel:
         self.difference_trigger = kwargs.get('difference_trigger', 0.75)
         self._symbol_data_by_symbol = {}
         self.next_update = None
+        self.correlation = None
+        ## Daily returns by end time until every symbol has the day's return
+        self._daily_returns = {}
 
     def update(self, algorithm, data):
 
@@ -98,24 +102,32 @@ class PairsAlphaModel:
         return []
 
     def correlation_pairs_selection(self):
-        ## Get returns for each natural gas/oil ETF
+        ## Calculate the pair with highest historical correlation
+        labels = set(self.correlation.labels)
+        best = self.correlation.max_pair([x for x in self.leading if x in labels], [x for x in self.following if x in labels])
+        if best is not None:
+            self.pairs = (self._symbol_data_by_symbol[best[0]], self._symbol_data_by_symbol[best[1]])
+
+    def reset_correlation(self):
+        ## Kendall correlation of the daily returns, warmed up with the returns every symbol has
         daily_return = {}
         for symbol, symbol_data in self._symbol_data_by_symbol.items():
             daily_return[symbol] = symbol_data.daily_return_array
+        daily_return = pd.DataFrame.from_dict(daily_return).dropna().sort_index()
 
-        ## Estimate coefficients of different correlation measures
-        tau = pd.DataFrame.from_dict(daily_return).corr(method='kendall')
+        self.correlation = RollingCorrelation(self.history_days, daily_return.columns, 'kendall')
+        self.correlation.update_many(daily_return.values)
+        self._daily_returns = {}
 
-        ## Calculate the pair with highest historical correlation
-        max_corr = -1
-        for x in self.leading:
-            df = tau[[x]].loc[self.following]
-            corr = float(df.max())
-            if corr > max_corr:
-                self.pairs = (
-                    self._symbol_data_by_symbol[x],
-                    self._symbol_data_by_symbol[df.idxmax()[0]])
-                max_corr = corr
+    def on_daily_return(self, symbol, point):
+        ## Update the correlation once each symbol has the return of the day
+        if self.correlation is None: return
+        returns = self._daily_returns.setdefault(point.end_time, {})
+        returns[symbol] = point.value
+        if any(x not in returns for x in self.correlation.labels): return
+
+        self.correlation.update([returns[x] for x in self.correlation.labels])
+        self._daily_returns = { time: value for time, value in self._daily_returns.items() if time > point.end_time }
 
     def on_securities_changed(self, algorithm, changes):
         '''Event fired each time the we add/remove securities from the data feed
@@ -136,9 +148,10 @@ class PairsAlphaModel:
         for ticker in tickers:
             symbol = SymbolCache.get_symbol(ticker)
             if symbol not in self._symbol_data_by_symbol:
-                symbol_data = SymbolData(symbol, self.history_days, self.lookback, self.resolution, algorithm)
+                symbol_data = SymbolData(symbol, self.history_days, self.lookback, self.resolution, algorithm, self.on_daily_return)
                 self._symbol_data_by_symbol[symbol] = symbol_data
                 symbol_data.update_daily_rate_of_change(history.loc[ticker])
+        self.reset_correlation()
 
         history = algorithm.history(symbols, self.lookback, self.resolution)
         if history.empty: return
@@ -149,7 +162,7 @@ class PairsAlphaModel:
 
 class SymbolData:
     '''Contains data specific to a symbol required by this model'''
-    def __init__(self, symbol, daily_lookback, lookback, resolution, algorithm):
+    def __init__(self, symbol, daily_lookback, lookback, resolution, algorithm, on_daily_return):
         self.symbol = symbol
 
         self.daily_return = RateOfChangePercent(f'{symbol}.daily_rocp({1})', 1)
@@ -158,6 +171,7 @@ class SymbolData:
 
         def updatedaily_return_history(s, e):
             self.daily_return_history.add(e)
+            on_daily_return(symbol, e)
 
         self.daily_return.updated += updatedaily_return_history
         algorithm.register_indicator(symbol, self.daily_return, self.daily_consolidator)
@@ -0,0 +1,98 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from AlgorithmImports import *
+from Execution.StandardDeviationExecutionModel import StandardDeviationExecutionModel
+from Execution.VolumeWeightedAveragePriceExecutionModel import VolumeWeightedAveragePriceExecutionModel
+from time import perf_counter
+
+class BatchedExecutionBenchmark(QCAlgorithm):
+    '''Daily 500 target rebalances through the Python execution models. The 'model' parameter picks 'std' or 'vwap'
+    and the 'batched' parameter picks the batched execute or the per target loop the models used before; compare the
+    execute time logged at the end of each run'''
+
+    def initialize(self):
+        self.set_start_date(2018, 1, 1)
+        self.set_end_date(2018, 3, 1)
+        self.set_cash(10000000)
+        self.universe_settings.resolution = Resolution.MINUTE
+
+        self.set_universe_selection(FundamentalUniverseSelectionModel(self.select))
+        self.set_alpha(ConstantAlphaModel(InsightType.PRICE, InsightDirection.UP, timedelta(1)))
+        self.set_portfolio_construction(EqualWeightingPortfolioConstructionModel())
+
+        vwap = self.get_parameter("model", "std") == "vwap"
+        batched = self.get_parameter("batched", "true") == "true"
+        model = (VolumeWeightedAveragePriceExecutionModel if vwap else StandardDeviationExecutionModel)()
+        self.timer = TimedExecutionModel(model, batched)
+        self.set_execution(self.timer)
+        self._selected = None
+
+    def select(self, fundamental):
+        # the same 500 symbols for the whole run
+        if self._selected is None:
+            self._selected = [x.symbol for x in sorted([x for x in fundamental if x.has_fundamental_data and x.price > 5],
+                key=lambda x: x.dollar_volume, reverse=True)[:500]]
+        return self._selected
+
+    def on_end_of_algorithm(self):
+        timer = self.timer
+        self.log(f'{type(timer.model).__name__} {"batched" if timer.batched else "per target"}: {timer.calls} calls with targets, '
+                 f'{timer.targets} targets, {timer.seconds:.3f}s, {timer.seconds / max(timer.calls, 1) * 1000:.2f} ms per call')
+
+class TimedExecutionModel(ExecutionModel):
+    '''Times the execute calls of a model holding targets, with its batched execute or the previous per target loop'''
+
+    def __init__(self, model, batched):
+        self.model = model
+        self.batched = batched
+        self.calls = 0
+        self.targets = 0
+        self.seconds = 0
+
+    def execute(self, algorithm, targets):
+        start = perf_counter()
+        if self.batched:
+            self.model.execute(algorithm, targets)
+        else:
+            self.execute_per_target(algorithm, targets)
+        if not self.model.targets_collection.is_empty or len(targets) > 0:
+            self.calls += 1
+            self.targets += len(targets)
+            self.seconds += perf_counter() - start
+
+    def execute_per_target(self, algorithm, targets):
+        model = self.model
+        symbol_data = model.symbol_data if isinstance(model, VolumeWeightedAveragePriceExecutionModel) else model._symbol_data
+        model.targets_collection.add_range(targets)
+        if model.targets_collection.is_empty:
+            return
+        for target in model.targets_collection.order_by_margin_impact(algorithm):
+            symbol = target.symbol
+            unordered_quantity = OrderSizing.get_unordered_quantity(algorithm, target)
+            data = symbol_data.get(symbol, None)
+            if data is None: continue
+
+            if isinstance(model, VolumeWeightedAveragePriceExecutionModel):
+                if model.price_is_favorable(data, unordered_quantity):
+                    order_size = OrderSizing.get_order_size_for_percent_volume(data.security, model.maximum_order_quantity_percent_volume, unordered_quantity)
+                    if order_size != 0:
+                        algorithm.market_order(symbol, order_size)
+            elif data.std.is_ready and model.price_is_favorable(data, unordered_quantity):
+                order_size = OrderSizing.get_order_size_for_maximum_value(data.security, model.maximum_order_value, unordered_quantity)
+                if order_size != 0:
+                    algorithm.market_order(symbol, order_size)
+        model.targets_collection.clear_fulfilled(algorithm)
+
+    def on_securities_changed(self, algorithm, changes):
+        self.model.on_securities_changed(algorithm, changes)
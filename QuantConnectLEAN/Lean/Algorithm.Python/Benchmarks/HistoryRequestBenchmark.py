@@ -12,15 +12,18 @@
 # limitations under the License.
 
 from AlgorithmImports import *
+from CallbackProfiler import CallbackProfiler, profiled_callback
 
 class HistoryRequestBenchmark(QCAlgorithm):
 
     def initialize(self):
+        self.callback_profiler = CallbackProfiler(self)
         self.set_start_date(2010, 1, 1)
         self.set_end_date(2018, 1, 1)
         self.set_cash(10000)
         self._symbol = self.add_equity("SPY").symbol
 
+    @profiled_callback()
     def on_end_of_day(self, symbol):
         minute_history = self.history([self._symbol], 60, Resolution.MINUTE)
         last_hour_high = 0
@@ -32,3 +35,6 @@ class HistoryRequestBenchmark(QCAlgorithm):
         daily_history_high = daily_history["high"]
         daily_history_low = daily_history["low"]
         daily_history_open = daily_history["open"]
+
+    def on_end_of_algorithm(self):
+        self.callback_profiler.log_report()
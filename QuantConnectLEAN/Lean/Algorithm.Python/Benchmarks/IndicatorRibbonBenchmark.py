@@ -12,11 +12,13 @@
 # limitations under the License.
 
 from AlgorithmImports import *
+from CallbackProfiler import CallbackProfiler, profiled_callback
 
 class IndicatorRibbonBenchmark(QCAlgorithm):
 
     # Initialise the data and resolution required, as well as the cash and start-end dates for your algorithm. All algorithms must initialized.
     def initialize(self):
+        self.callback_profiler = CallbackProfiler(self)
         self.set_start_date(2010, 1, 1)  #Set Start Date
         self.set_end_date(2018, 1, 1)    #Set End Date
         self.spy = self.add_equity("SPY", Resolution.MINUTE).symbol
@@ -36,8 +38,12 @@ class IndicatorRibbonBenchmark(QCAlgorithm):
             self.register_indicator(self.spy, delayed_sma, Resolution.DAILY)
             self.ribbon.append(delayed_sma)
 
+    @profiled_callback()
     def on_data(self, data):
         # wait for our entire ribbon to be ready
         if not all(x.is_ready for x in self.ribbon): return
         for x in self.ribbon:
             value = x.current.value
+
+    def on_end_of_algorithm(self):
+        self.callback_profiler.log_report()
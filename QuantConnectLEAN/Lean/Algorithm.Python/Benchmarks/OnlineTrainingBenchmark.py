@@ -0,0 +1,68 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from AlgorithmImports import *
+from OnlineLearning import OnlineLearner, OnlineTrainer
+from sklearn.linear_model import LinearRegression
+from time import perf_counter
+
+class OnlineTrainingBenchmark(QCAlgorithm):
+    '''Daily retraining of a linear model over 13 symbols: requesting the full lookback and fitting a model per symbol
+    every day, like ScikitLearnLinearRegressionAlgorithm did, against the OnlineTrainer requesting only the new day
+    and fitting every symbol at once'''
+
+    def initialize(self):
+        self.set_start_date(2015, 1, 1)
+        self.set_end_date(2018, 1, 1)
+        self.set_cash(100000)
+        self.lookback = 60
+        tickers = ["AAPL", "AIG", "BAC", "IBM", "SPY", "QQQ", "IWM", "EEM", "USO", "WM", "BNO", "FB", "GOOG"]
+        self._symbols = [self.add_equity(ticker, Resolution.DAILY).symbol for ticker in tickers]
+
+        self.trainer = OnlineTrainer(self, SlopeLearner(), self.lookback, 'close', Resolution.DAILY)
+        self.full_seconds = 0
+        self.online_seconds = 0
+        self.max_difference = 0
+        self.schedule.on(self.date_rules.every_day("SPY"), self.time_rules.after_market_open("SPY", 10), self.train)
+
+    def train(self):
+        start = perf_counter()
+        history = self.history(self._symbols, self.lookback, Resolution.DAILY)
+        slopes = {}
+        for symbol in self._symbols:
+            prices = history.loc[symbol].close.values
+            X = np.arange(len(prices)).reshape(-1, 1)
+            slopes[symbol] = LinearRegression().fit(X, prices).coef_[0]
+        self.full_seconds += perf_counter() - start
+
+        start = perf_counter()
+        self.trainer.train(self._symbols)
+        self.online_seconds += perf_counter() - start
+
+        for symbol, slope in zip(self._symbols, self.trainer.learner.slopes):
+            self.max_difference = max(self.max_difference, abs(slopes[symbol] - slope))
+
+    def on_end_of_algorithm(self):
+        self.log(f'Full retraining: {self.full_seconds:.3f}s, online training: {self.online_seconds:.3f}s, '
+                 f'speedup {self.full_seconds / self.online_seconds:.1f}x, largest slope difference {self.max_difference:.2e}')
+        self.log(self.trainer.report())
+
+class SlopeLearner(OnlineLearner):
+    '''Slope of the closes of every symbol against time, one multi-output regression'''
+
+    def __init__(self):
+        self.slopes = None
+
+    def partial_fit(self, values, new_rows):
+        X = np.arange(len(values)).reshape(-1, 1)
+        self.slopes = LinearRegression().fit(X, values).coef_[:, 0]
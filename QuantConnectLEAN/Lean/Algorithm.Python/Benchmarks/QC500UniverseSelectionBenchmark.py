@@ -0,0 +1,108 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from AlgorithmImports import *
+from Selection.QC500UniverseSelectionModel import QC500UniverseSelectionModel
+from itertools import groupby
+from math import ceil
+from time import perf_counter
+
+class QC500UniverseSelectionBenchmark(QCAlgorithm):
+    '''QC500 selection over the full coarse universe every day: the sort based selection QC500UniverseSelectionModel
+    used to do, against its heap based top N with the fine attributes read in a single pass'''
+
+    def initialize(self):
+        self.set_start_date(2014, 3, 24)
+        self.set_end_date(2014, 4, 7)
+        self.set_cash(100000)
+        self.universe_settings.resolution = Resolution.DAILY
+        self.set_universe_selection(TimedQC500UniverseSelectionModel())
+
+    def on_end_of_algorithm(self):
+        model = self.universe_selection
+        self.log(f'{model.selections} selections. Coarse: sorted {model.legacy_coarse_seconds:.3f}s, heap {model.coarse_seconds:.3f}s. '
+                 f'Fine: sorted {model.legacy_fine_seconds:.3f}s, single pass {model.fine_seconds:.3f}s. Differences: {model.differences}')
+
+class TimedQC500UniverseSelectionModel(QC500UniverseSelectionModel):
+    '''Times each selection against the previous implementation, selecting every day instead of every month.
+    The first one to read the Fundamental objects of the day pays for loading their data, so the two take turns'''
+
+    def __init__(self):
+        super().__init__()
+        self.selections = 0
+        self.differences = 0
+        self.coarse_seconds = 0
+        self.legacy_coarse_seconds = 0
+        self.fine_seconds = 0
+        self.legacy_fine_seconds = 0
+
+    def timed(self, legacy_select, select):
+        '''Runs both selections, the legacy one first every other day
+        Returns:
+            The legacy and the current results along with their durations'''
+        if self.selections % 2 == 0:
+            start = perf_counter()
+            legacy = legacy_select()
+            middle = perf_counter()
+            result = select()
+            return legacy, result, middle - start, perf_counter() - middle
+        start = perf_counter()
+        result = select()
+        middle = perf_counter()
+        legacy = legacy_select()
+        return legacy, result, perf_counter() - middle, middle - start
+
+    def select_coarse(self, algorithm, fundamental):
+        self.last_month = -1
+        legacy, result, legacy_seconds, seconds = self.timed(lambda: self.legacy_select_coarse(fundamental),
+                                                             lambda: super(TimedQC500UniverseSelectionModel, self).select_coarse(algorithm, fundamental))
+        self.legacy_coarse_seconds += legacy_seconds
+        self.coarse_seconds += seconds
+        if result != Universe.UNCHANGED and result != legacy:
+            self.differences += 1
+        return result
+
+    def select_fine(self, algorithm, fundamental):
+        legacy, result, legacy_seconds, seconds = self.timed(lambda: self.legacy_select_fine(algorithm, fundamental),
+                                                             lambda: super(TimedQC500UniverseSelectionModel, self).select_fine(algorithm, fundamental))
+        self.legacy_fine_seconds += legacy_seconds
+        self.fine_seconds += seconds
+        self.selections += 1
+        if result != Universe.UNCHANGED and result != legacy:
+            self.differences += 1
+        return result
+
+    def legacy_select_coarse(self, fundamental):
+        sorted_by_dollar_volume = sorted([x for x in fundamental if x.has_fundamental_data and x.volume > 0 and x.price > 0],
+                                     key = lambda x: x.dollar_volume, reverse=True)[:self.number_of_symbols_coarse]
+        return [x.symbol for x in sorted_by_dollar_volume]
+
+    def legacy_select_fine(self, algorithm, fundamental):
+        sorted_by_sector = sorted([x for x in fundamental if x.company_reference.country_id == "USA"
+                                        and x.company_reference.primary_exchange_id in ["NYS","NAS"]
+                                        and (algorithm.time - x.security_reference.ipo_date).days > 180
+                                        and x.market_cap > 5e8],
+                               key = lambda x: x.company_reference.industry_template_code)
+        count = len(sorted_by_sector)
+        if count == 0:
+            return Universe.UNCHANGED
+
+        percent = self.number_of_symbols_fine / count
+        sorted_by_dollar_volume = []
+        for code, g in groupby(sorted_by_sector, lambda x: x.company_reference.industry_template_code):
+            y = sorted(g, key = lambda x: self.dollar_volume_by_symbol[x.symbol], reverse = True)
+            c = ceil(len(y) * percent)
+            sorted_by_dollar_volume.extend(y[:c])
+
+        sorted_by_dollar_volume = sorted(sorted_by_dollar_volume, key = lambda x: self.dollar_volume_by_symbol[x.symbol], reverse=True)
+        return [x.symbol for x in sorted_by_dollar_volume[:self.number_of_symbols_fine]]
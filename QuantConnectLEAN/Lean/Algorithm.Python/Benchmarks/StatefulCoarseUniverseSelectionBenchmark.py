@@ -12,17 +12,19 @@
 # limitations under the License.
 
 from AlgorithmImports import *
+from CallbackProfiler import CallbackProfiler, profiled_callback
 
 class StatefulCoarseUniverseSelectionBenchmark(QCAlgorithm):
 
     def initialize(self):
+        self.callback_profiler = CallbackProfiler(self)
         self.universe_settings.resolution = Resolution.DAILY
 
         self.set_start_date(2017, 1, 1)
         self.set_end_date(2019, 1, 1)
         self.set_cash(50000)
 
-        self.add_universe(self.coarse_selection_function)
+        self.add_universe(self.callback_profiler.wrap(self.coarse_selection_function))
         self.number_of_symbols = 250
         self._black_list = []
 
@@ -36,6 +38,7 @@ class StatefulCoarseUniverseSelectionBenchmark(QCAlgorithm):
         # return the symbol objects of the top entries from our sorted collection
         return [ x.symbol for x in sorted_by_dollar_volume[:self.number_of_symbols] if not (x.symbol in self._black_list) ]
 
+    @profiled_callback()
     def on_data(self, slice):
         if slice.has_data:
             symbol = slice.keys()[0]
@@ -44,6 +47,7 @@ class StatefulCoarseUniverseSelectionBenchmark(QCAlgorithm):
                     self._black_list.pop(0)
                 self._black_list.append(symbol)
 
+    @profiled_callback()
     def on_securities_changed(self, changes):
         # if we have no changes, do nothing
         if changes is None: return
@@ -55,3 +59,6 @@ class StatefulCoarseUniverseSelectionBenchmark(QCAlgorithm):
 
         for security in changes.added_securities:
             self.set_holdings(security.symbol, 0.001)
+
+    def on_end_of_algorithm(self):
+        self.callback_profiler.log_report()
@@ -12,17 +12,19 @@
 # limitations under the License.
 
 from AlgorithmImports import *
+from CallbackProfiler import CallbackProfiler, profiled_callback
 
 class StatelessCoarseUniverseSelectionBenchmark(QCAlgorithm):
 
     def initialize(self):
+        self.callback_profiler = CallbackProfiler(self)
         self.universe_settings.resolution = Resolution.DAILY
 
         self.set_start_date(2017, 1, 1)
         self.set_end_date(2019, 1, 1)
         self.set_cash(50000)
 
-        self.add_universe(self.coarse_selection_function)
+        self.add_universe(self.callback_profiler.wrap(self.coarse_selection_function))
         self.number_of_symbols = 250
 
     # sort the data by daily dollar volume and take the top 'NumberOfSymbols'
@@ -35,6 +37,7 @@ class StatelessCoarseUniverseSelectionBenchmark(QCAlgorithm):
         # return the symbol objects of the top entries from our sorted collection
         return [ x.symbol for x in sorted_by_dollar_volume[:self.number_of_symbols] ]
 
+    @profiled_callback()
     def on_securities_changed(self, changes):
         # if we have no changes, do nothing
         if changes is None: return
@@ -46,3 +49,6 @@ class StatelessCoarseUniverseSelectionBenchmark(QCAlgorithm):
 
         for security in changes.added_securities:
             self.set_holdings(security.symbol, 0.001)
+
+    def on_end_of_algorithm(self):
+        self.callback_profiler.log_report()
@@ -0,0 +1,59 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from AlgorithmImports import *
+from Portfolio.SignalExports.DiscordSignalExport import DiscordSignalExport
+
+### <summary>
+### This algorithm streams its portfolio targets and insights to the Discord bot's signal receiver every time slice.
+### Run the bot with a "signal_export" section in its config.json, e.g. {"host": "127.0.0.1", "port": 8765}, and
+### subscribe a channel to the EMA_CROSS signal. Signals are only sent in live mode.
+### </summary>
+### <meta name="tag" content="using data" />
+### <meta name="tag" content="securities and portfolio" />
+class DiscordSignalExportDemonstrationAlgorithm(QCAlgorithm):
+
+    def initialize(self):
+        ''' Initialize the date and add the equities whose targets are streamed to the bot '''
+
+        self.set_start_date(2013, 10, 7)   #Set Start Date
+        self.set_end_date(2013, 10, 11)    #Set End Date
+        self.set_cash(100000)             #Set Strategy Cash
+
+        self._symbols = [self.add_equity(ticker).symbol for ticker in ["SPY", "AAPL", "IBM"]]
+        self.fast = { symbol: self.ema(symbol, 10) for symbol in self._symbols }
+        self.slow = { symbol: self.ema(symbol, 100) for symbol in self._symbols }
+
+        # Set the Discord export provider, a single provider exports targets and insights
+        self.discord_export = DiscordSignalExport(signal = "EMA_CROSS")
+        self.signal_export.add_signal_export_providers(self.discord_export)
+        self.insights_generated += self.discord_export.on_insights_generated
+
+        self.set_warm_up(100)
+
+    def on_data(self, data):
+        ''' Emits an insight per symbol each minute and sends the whole target portfolio. Only the targets that
+        changed since the last minute are streamed to the bot '''
+        if self.is_warming_up: return
+
+        insights = []
+        targets = []
+        for symbol in self._symbols:
+            direction = InsightDirection.UP if self.fast[symbol].current.value > self.slow[symbol].current.value else InsightDirection.DOWN
+            insights.append(Insight.price(symbol, timedelta(minutes=1), direction))
+            targets.append(PortfolioTarget(symbol, 0.3 if direction == InsightDirection.UP else 0))
+        self.emit_insights(*insights)
+        self.signal_export.set_target_portfolio(targets)
+
+    def on_end_of_algorithm(self):
+        self.discord_export.dispose()
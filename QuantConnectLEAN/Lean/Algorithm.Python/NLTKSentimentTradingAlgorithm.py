@@ -13,9 +13,32 @@
 
 from AlgorithmImports import *
 
+import csv
 import nltk
 # for details of NLTK, please visit https://www.nltk.org/index.html
 
+class HeadlineIndex:
+    '''Tokens of the headlines of each day, tokenized once when the index is built'''
+
+    def __init__(self, rows, tokenize):
+        '''Initializes a new instance of the HeadlineIndex class
+        Args:
+            rows: (date, headline) pairs, dates as year-month-day text
+            tokenize: Function splitting a headline into tokens'''
+        tokens = {}
+        for day, headline in rows:
+            year, month, date_of_month = (int(x) for x in day.split('-'))
+            # several headlines on a day share one token set
+            tokens.setdefault(date(year, month, date_of_month), set()).update(tokenize(headline))
+        self._tokens = { day: frozenset(words) for day, words in tokens.items() }
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def tokens(self, day):
+        '''Tokens of the day's headlines, empty when there is no headline that day'''
+        return self._tokens.get(day, frozenset())
+
 class NLTKSentimentTradingAlgorithm(QCAlgorithm):
 
     def initialize(self):
@@ -24,40 +47,36 @@ class NLTKSentimentTradingAlgorithm(QCAlgorithm):
         self.set_cash(100000)  # Set Strategy Cash
         
         spy = self.add_equity("SPY", Resolution.MINUTE)
-        self.text = self.get_text() # Get custom text data for creating trading signals
         self._symbols = [spy.symbol] # This can be extended to multiple symbols
+
+        # users should decide their own positive and negative words, per symbol
+        self._keywords = { symbol: (frozenset(['Up']), frozenset(['Down'])) for symbol in self._symbols }
         
         # for what extra models needed to download, please use code nltk.download()
         nltk.download('punkt')
+        self.text = self.get_text() # Get custom text data for creating trading signals
         self.schedule.on(self.date_rules.every_day("SPY"), self.time_rules.after_market_open("SPY", 30), self.trade)
     
     def trade(self):
-        current_time = f'{self.time.year}-{self.time.month}-{self.time.day}'
-        current_text = self.text.loc[current_time][0]
-        words = nltk.word_tokenize(current_text)
-        
-        # users should decide their own positive and negative words
-        positive_word = 'Up'
-        negative_word = 'Down'
-        
-        for holding in self.portfolio.values:
+        words = self.text.tokens(self.time.date())
+        if not words:
+            return
+
+        for symbol, (positive_words, negative_words) in self._keywords.items():
             # liquidate if it contains negative words
-            if negative_word in words and holding.invested:
-                self.liquidate(holding.symbol)
+            if self.portfolio[symbol].invested and words & negative_words:
+                self.liquidate(symbol)
             
             # buy if it contains positive words
-            if positive_word in words and not holding.invested:
-                self.set_holdings(holding.symbol, 1 / len(self._symbols))
+            if not self.portfolio[symbol].invested and words & positive_words:
+                self.set_holdings(symbol, 1 / len(self._symbols))
         
     def get_text(self):
         # import custom data
         # Note: dl must be 1, or it will not download automatically
         url = 'https://www.dropbox.com/s/7xgvkypg6uxp6xl/EconomicNews.csv?dl=1'
-        data = self.download(url).split('\n')
-
-        headline = [x.split(',')[1] for x in data][1:]
-        date = [x.split(',')[0] for x in data][1:]
+        rows = csv.reader(self.download(url).splitlines())
+        next(rows, None)  # header
         
-        # create a pd dataframe with 1st col being date and 2nd col being headline (content of the text)
-        df = pd.DataFrame(headline, index = date, columns = ['headline'])
-        return df
+        # 1st col being date and 2nd col being headline (content of the text), tokenized once here
+        return HeadlineIndex(((row[0], row[1]) for row in rows if len(row) > 1), nltk.word_tokenize)
@@ -12,7 +12,7 @@
 # limitations under the License.
 
 from AlgorithmImports import *
-from io import StringIO
+from ColumnarStore import ColumnarStore, exponential_moving_average
 
 class ObjectStoreExampleAlgorithm(QCAlgorithm):
     '''This algorithm showcases some features of the IObjectStore feature.
@@ -22,6 +22,8 @@ class ObjectStoreExampleAlgorithm(QCAlgorithm):
     trained and then saving the model weights in the object store.
     '''
     spy_close_object_store_key = "spy_close"
+    # version of the saved columns, bump it when they change so stale data is fetched again
+    spy_close_schema = 1
     spy_close_history = RollingWindow[IndicatorDataPoint](252)
     spy_close_ema10_history = RollingWindow[IndicatorDataPoint](252)
     spy_close_ema50_history = RollingWindow[IndicatorDataPoint](252)
@@ -41,16 +43,20 @@ class ObjectStoreExampleAlgorithm(QCAlgorithm):
         self.spy_close_ema10.updated += lambda _, args: self.spy_close_ema10_history.add(args)
         self.spy_close_ema50.updated += lambda _, args: self.spy_close_ema50_history.add(args)
 
-        if self.object_store.contains_key(self.spy_close_object_store_key):
+        store = ColumnarStore(self.object_store)
+        columns = store.load(self.spy_close_object_store_key, self.spy_close_schema)
+        if columns is not None:
             # our object store has our historical data saved, read the data
             # and push it through the indicators to warm everything up
-            values = self.object_store.read(self.spy_close_object_store_key)
             self.debug(f'{self.spy_close_object_store_key} key exists in object store.')
 
-            history = pd.read_csv(StringIO(values), header=None, index_col=0, squeeze=True)
-            history.index = pd.to_datetime(history.index)
-            for time, close in history.items():
+            # Lean's indicators can't be seeded with a value, their state is only reachable through update,
+            # so the stored closes are replayed. Averages kept in arrays instead of indicators, e.g. one per
+            # symbol of a large universe, can be set in one step with exponential_moving_average
+            for time, close in zip(columns['time'].astype(datetime), columns['close'].tolist()):
                 self.spy_close.update(time, close)
+            self.debug(f'EMA10 {self.spy_close_ema10.current.value:.4f}, from the columns in one step '
+                       f'{exponential_moving_average(columns["close"], 10):.4f}')
 
         else:
             self.debug(f'{self.spy_close_object_store_key} key does not exist in object store. Fetching history...')
@@ -62,12 +68,14 @@ class ObjectStoreExampleAlgorithm(QCAlgorithm):
             for time, close in history.items():
                 self.spy_close.update(time, close)
 
-            # save our warm up data so next time we don't need to issue the history request
-            self.object_store.save(self.spy_close_object_store_key,
-                '\n'.join(reversed([f'{x.end_time},{x.value}' for x in self.spy_close_history])))
-
-            # Can also use ObjectStore.save_bytes(key, byte[])
-            # and to read  ObjectStore.read_bytes(key) => byte[]
+            # save our warm up data so next time we don't need to issue the history request.
+            # the columns are stored as raw arrays with ObjectStore.save_bytes(key, byte[]) and read back
+            # with ObjectStore.read_bytes(key) => byte[], no text parsing
+            points = list(reversed(list(self.spy_close_history)))
+            store.save(self.spy_close_object_store_key, {
+                'time': np.array([x.end_time for x in points], dtype='datetime64[us]'),
+                'close': np.array([x.value for x in points], dtype=np.float64)
+            }, self.spy_close_schema)
 
             # we can also get a file path for our data. some ML libraries require model
             # weights to be loaded directly from a file path. The object store can provide
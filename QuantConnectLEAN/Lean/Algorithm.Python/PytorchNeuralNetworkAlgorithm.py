@@ -12,6 +12,7 @@
 # limitations under the License.
 
 from AlgorithmImports import *
+from OnlineLearning import OnlineLearner, OnlineTrainer
 import torch
 import torch.nn.functional as F
 
@@ -28,56 +29,29 @@ class PytorchNeuralNetworkAlgorithm(QCAlgorithm):
         self._symbols = [spy.symbol] # using a list can extend to condition for multiple symbols
         
         self.lookback = 30 # days of historical data (look back)
+
+        # keeps the daily open prices and the networks between trainings, only the new days are requested
+        # and the networks are trained further instead of from scratch. Pass a key to save them in the ObjectStore
+        self.trainer = OnlineTrainer(self, NetLearner(), self.lookback + 1, 'open', Resolution.DAILY)
+        
+        # dicts that store prices for sell and buy
+        self.sell_prices = {}
+        self.buy_prices = {}
         
         self.schedule.on(self.date_rules.every_day("SPY"), self.time_rules.after_market_open("SPY", 28), self.net_train) # train the NN
         self.schedule.on(self.date_rules.every_day("SPY"), self.time_rules.after_market_open("SPY", 30), self.trade)
     
     def net_train(self):
-        # Daily historical data is used to train the machine learning model
-        history = self.history(self._symbols, self.lookback + 1, Resolution.DAILY)
+        # Daily historical data is used to train the machine learning model, every symbol at once
+        self.trainer.train(self._symbols)
         
-        # dicts that store prices for training
-        self.prices_x = {} 
-        self.prices_y = {}
+        learner = self.trainer.learner
+        if learner.buy_prices is None:
+            return
         
-        # dicts that store prices for sell and buy
-        self.sell_prices = {}
-        self.buy_prices = {}
-        
-        for symbol in self._symbols:
-            if not history.empty:
-                # x: preditors; y: response
-                self.prices_x[symbol] = list(history.loc[symbol.value]['open'])[:-1]
-                self.prices_y[symbol] = list(history.loc[symbol.value]['open'])[1:]
-                
-        for symbol in self._symbols:
-            # if this symbol has historical data
-            if symbol in self.prices_x:
-                
-                net = Net(n_feature=1, n_hidden=10, n_output=1)     # define the network
-                optimizer = torch.optim.SGD(net.parameters(), lr=0.2)
-                loss_func = torch.nn.MSELoss()  # this is for regression mean squared loss
-                
-                for t in range(200):
-                    # Get data and do preprocessing
-                    x = torch.from_numpy(np.array(self.prices_x[symbol])).float()
-                    y = torch.from_numpy(np.array(self.prices_y[symbol])).float()
-                    
-                    # unsqueeze data (see pytorch doc for details)
-                    x = x.unsqueeze(1) 
-                    y = y.unsqueeze(1)
-                
-                    prediction = net(x)     # input x and predict based on x
-
-                    loss = loss_func(prediction, y)     # must be (1. nn output, 2. target)
-
-                    optimizer.zero_grad()   # clear gradients for next train
-                    loss.backward()         # backpropagation, compute gradients
-                    optimizer.step()        # apply gradients
-            
-            # Follow the trend    
-            self.buy_prices[symbol] = net(y)[-1] + np.std(y.data.numpy())
-            self.sell_prices[symbol] = net(y)[-1] - np.std(y.data.numpy())
+        # Follow the trend
+        self.buy_prices = dict(zip(self._symbols, learner.buy_prices))
+        self.sell_prices = dict(zip(self._symbols, learner.sell_prices))
         
     def trade(self):
         ''' 
@@ -85,12 +59,17 @@ class PytorchNeuralNetworkAlgorithm(QCAlgorithm):
         Liquidate if the open price is below the sell price and buy if the open price is above the buy price 
         ''' 
         for holding in self.portfolio.values():
+            if holding.symbol not in self.buy_prices:
+                continue
+            
             if self.current_slice[holding.symbol].open < self.sell_prices[holding.symbol] and holding.invested:
                 self.liquidate(holding.symbol)
             
             if self.current_slice[holding.symbol].open > self.buy_prices[holding.symbol] and not holding.invested:
                 self.set_holdings(holding.symbol, 1 / len(self._symbols))
 
+    def on_end_of_algorithm(self):
+        self.log(self.trainer.report())
             
         
 # class for Pytorch NN model
@@ -104,3 +83,74 @@ class Net(torch.nn.Module):
         x = F.relu(self.hidden(x))      # activation function for hidden layer
         x = self.predict(x)             # linear output
         return x
+
+# a Net per symbol, trained together: the weights of the networks are stacked and applied with batched matrix products
+class BatchedNet(torch.nn.Module):
+    def __init__(self, n_models, n_feature, n_hidden, n_output):
+        super(BatchedNet, self).__init__()
+        # same initialization as a torch.nn.Linear layer per model
+        nets = [Net(n_feature, n_hidden, n_output) for _ in range(n_models)]
+        self.hidden_weight = torch.nn.Parameter(torch.stack([net.hidden.weight.data.t() for net in nets]))
+        self.hidden_bias = torch.nn.Parameter(torch.stack([net.hidden.bias.data.unsqueeze(0) for net in nets]))
+        self.predict_weight = torch.nn.Parameter(torch.stack([net.predict.weight.data.t() for net in nets]))
+        self.predict_bias = torch.nn.Parameter(torch.stack([net.predict.bias.data.unsqueeze(0) for net in nets]))
+    
+    def forward(self, x):
+        # x: (models, samples, features)
+        x = F.relu(torch.baddbmm(self.hidden_bias, x, self.hidden_weight))
+        return torch.baddbmm(self.predict_bias, x, self.predict_weight)
+
+class NetLearner(OnlineLearner):
+    '''Trains a network per symbol on the open prices: the first training runs the full number of epochs,
+    the following ones start from the trained weights and run a few epochs over the updated window'''
+
+    def __init__(self, epochs = 200, warm_epochs = 20, learning_rate = 0.2):
+        self.epochs = epochs
+        self.warm_epochs = warm_epochs
+        self.learning_rate = learning_rate
+        self.net = None
+        self.buy_prices = None
+        self.sell_prices = None
+
+    def reset(self, symbols):
+        self.net = None
+
+    def partial_fit(self, values, new_rows):
+        # (symbols, days, 1) tensor built once per training, x: predictors; y: response
+        prices = torch.from_numpy(values.T.copy()).float().unsqueeze(2)
+        x = prices[:, :-1]
+        y = prices[:, 1:]
+
+        epochs = self.warm_epochs
+        if self.net is None:
+            self.net = BatchedNet(prices.shape[0], n_feature=1, n_hidden=10, n_output=1)
+            epochs = self.epochs
+        optimizer = torch.optim.SGD(self.net.parameters(), lr=self.learning_rate)
+
+        for t in range(epochs):
+            prediction = self.net(x)     # input x and predict based on x
+
+            # mean squared loss of each symbol, summed so every network gets the gradient it would get alone
+            loss = ((prediction - y) ** 2).mean(dim=(1, 2)).sum()
+
+            optimizer.zero_grad()   # clear gradients for next train
+            loss.backward()         # backpropagation, compute gradients
+            optimizer.step()        # apply gradients
+
+        with torch.no_grad():
+            last = self.net(y)[:, -1, 0]
+            deviation = y.std(dim=1, unbiased=False)[:, 0]
+        self.buy_prices = (last + deviation).numpy()
+        self.sell_prices = (last - deviation).numpy()
+
+    def get_state(self):
+        if self.net is None:
+            return None
+        return { name: value.numpy() for name, value in self.net.state_dict().items() }
+
+    def set_state(self, state):
+        if state is None:
+            self.net = None
+            return
+        self.net = BatchedNet(state['hidden_weight'].shape[0], state['hidden_weight'].shape[1], state['hidden_weight'].shape[2], state['predict_weight'].shape[2])
+        self.net.load_state_dict({ name: torch.from_numpy(value) for name, value in state.items() })
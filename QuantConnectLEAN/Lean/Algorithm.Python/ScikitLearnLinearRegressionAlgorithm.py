@@ -12,6 +12,7 @@
 # limitations under the License.
 
 from AlgorithmImports import *
+from OnlineLearning import OnlineLearner, OnlineTrainer
 from sklearn.linear_model import LinearRegression
 
 class ScikitLearnLinearRegressionAlgorithm(QCAlgorithm):
@@ -27,54 +28,29 @@ class ScikitLearnLinearRegressionAlgorithm(QCAlgorithm):
 
         self.symbols = [ spy.symbol ] # In the future, we can include more symbols to the list in this way
 
-        self.schedule.on(self.date_rules.every_day("SPY"), self.time_rules.after_market_open("SPY", 28), self.regression)
-        self.schedule.on(self.date_rules.every_day("SPY"), self.time_rules.after_market_open("SPY", 30), self.trade)
+        # keeps the daily open prices between trainings, only the new days are requested. Pass a key to save them in the ObjectStore
+        self.trainer = OnlineTrainer(self, LinearRegressionLearner(self.lookback), self.lookback, 'open', Resolution.DAILY)
 
-
-    def regression(self):
-        # Daily historical data is used to train the machine learning model
-        history = self.history(self.symbols, self.lookback, Resolution.DAILY)
-
-        # price dictionary:    key: symbol; value: historical price
-        self.prices = {}
         # slope dictionary:    key: symbol; value: slope
         self.slopes = {}
 
-        for symbol in self.symbols:
-            if not history.empty:
-                # get historical open price
-                self.prices[symbol] = list(history.loc[symbol.value]['open'])
-
-        # A is the design matrix
-        A = range(self.lookback + 1)
-
-        for symbol in self.symbols:
-            if symbol in self.prices:
-                # response
-                Y = self.prices[symbol]
-                # features
-                X = np.column_stack([np.ones(len(A)), A])
-
-                # data preparation
-                length = min(len(X), len(Y))
-                X = X[-length:]
-                Y = Y[-length:]
-                A = A[-length:]
+        self.schedule.on(self.date_rules.every_day("SPY"), self.time_rules.after_market_open("SPY", 28), self.regression)
+        self.schedule.on(self.date_rules.every_day("SPY"), self.time_rules.after_market_open("SPY", 30), self.trade)
 
-                # fit the linear regression
-                reg = LinearRegression().fit(X, Y)
 
-                # run linear regression y = ax + b
-                b = reg.intercept_
-                a = reg.coef_[1]
+    def regression(self):
+        # Daily historical data is used to train the machine learning model
+        self.trainer.train(self.symbols)
 
-                # store slopes for symbols
-                self.slopes[symbol] = a/b
+        slopes = self.trainer.learner.slopes
+        if slopes is not None:
+            # store slopes for symbols
+            self.slopes = dict(zip(self.symbols, slopes))
 
 
     def trade(self):
         # if there is no open price
-        if not self.prices:
+        if not self.slopes:
             return
 
         thod_buy = 0.001 # threshold of slope to buy
@@ -90,3 +66,34 @@ class ScikitLearnLinearRegressionAlgorithm(QCAlgorithm):
             # buy when slope larger than thod_buy
             if self.slopes[symbol] > thod_buy:
                 self.set_holdings(symbol, 1 / len(self.symbols))
+
+    def on_end_of_algorithm(self):
+        self.log(self.trainer.report())
+
+class LinearRegressionLearner(OnlineLearner):
+    '''Fits the open prices of every symbol against time in a single multi-output regression.
+    The regression is over a fixed window, so each training refits it on the updated window'''
+
+    def __init__(self, lookback):
+        self.lookback = lookback
+        self.slopes = None
+
+    def partial_fit(self, values, new_rows):
+        # A is the design matrix
+        A = np.arange(self.lookback + 1)[-len(values):]
+        # features
+        X = np.column_stack([np.ones(len(A)), A])
+
+        # fit the linear regression, a response column per symbol
+        reg = LinearRegression().fit(X, values)
+
+        # run linear regression y = ax + b
+        b = reg.intercept_
+        a = reg.coef_[:, 1]
+        self.slopes = a / b
+
+    def get_state(self):
+        return self.slopes
+
+    def set_state(self, state):
+        self.slopes = state
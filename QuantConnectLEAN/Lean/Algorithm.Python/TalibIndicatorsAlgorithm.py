@@ -13,6 +13,7 @@
 
 from AlgorithmImports import *
 import talib
+from RollingFrame import RollingFrame
 
 class CalibratedResistanceAtmosphericScrubbers(QCAlgorithm):
 
@@ -22,11 +23,11 @@ class CalibratedResistanceAtmosphericScrubbers(QCAlgorithm):
         self.set_cash(100000) 
         self.add_equity("SPY", Resolution.HOUR)
         
-        self.rolling_window = pd.DataFrame()
         self.dema_period = 3
         self.sma_period = 3
         self.wma_period = 3
         self.window_size = self.dema_period * 2
+        self.rolling_window = RollingFrame(self.window_size, ['close', 'DEMA', 'EMA', 'WMA'])
         self.set_warm_up(self.window_size)
         
     def on_data(self, data):
@@ -34,34 +35,27 @@ class CalibratedResistanceAtmosphericScrubbers(QCAlgorithm):
             return
         
         close = data["SPY"].close
+
+        # Add latest close to rolling window, the indicator columns of the row are set below
+        self.rolling_window.append({"close": close}, data.time)
+        closes = self.rolling_window['close']
         
         if self.is_warming_up:
-            # Add latest close to rolling window
-            row = pd.DataFrame({"close": [close]}, index=[data.time])
-            self.rolling_window = pd.concat([self.rolling_window, row]).iloc[-self.window_size:]
-            
             # If we have enough closing data to start calculating indicators...
-            if self.rolling_window.shape[0] == self.window_size:
-                closes = self.rolling_window['close'].values
-                
-                # Add indicator columns to DataFrame
+            if self.rolling_window.is_ready:
+                # Add indicator columns to the rolling window
                 self.rolling_window['DEMA'] = talib.DEMA(closes, self.dema_period)
                 self.rolling_window['EMA'] = talib.EMA(closes, self.sma_period)
                 self.rolling_window['WMA'] = talib.WMA(closes, self.wma_period)
             return
         
-        closes = np.append(self.rolling_window['close'].values, close)[-self.window_size:]
-        
         # Update talib indicators time series with the latest close
-        row = pd.DataFrame({"close": close,
-                            "DEMA" : talib.DEMA(closes, self.dema_period)[-1],
-                            "EMA"  : talib.EMA(closes, self.sma_period)[-1],
-                            "WMA"  : talib.WMA(closes, self.wma_period)[-1]},
-                            index=[data.time])
-        
-        self.rolling_window = pd.concat([self.rolling_window, row]).iloc[-self.window_size:]
+        self.rolling_window.set_last('DEMA', talib.DEMA(closes, self.dema_period)[-1])
+        self.rolling_window.set_last('EMA', talib.EMA(closes, self.sma_period)[-1])
+        self.rolling_window.set_last('WMA', talib.WMA(closes, self.wma_period)[-1])
 
         
     def on_end_of_algorithm(self):
-        self.log(f"\nRolling Window:\n{self.rolling_window.to_string()}\n")
-        self.log(f"\nLatest Values:\n{self.rolling_window.iloc[-1].to_string()}\n")
+        rolling_window = self.rolling_window.to_pandas()
+        self.log(f"\nRolling Window:\n{rolling_window.to_string()}\n")
+        self.log(f"\nLatest Values:\n{rolling_window.iloc[-1].to_string()}\n")
@@ -13,7 +13,9 @@
  * limitations under the License.
 */
 
+using Python.Runtime;
 using QuantConnect.Interfaces;
+using QuantConnect.Python;
 using QuantConnect.Securities;
 using System.Collections.Generic;
 
@@ -62,6 +64,22 @@ namespace QuantConnect.Algorithm.Framework.Portfolio.SignalExports
             _signalExports.AddRange(signalExports);
         }
 
+        /// <summary>
+        /// Adds one or more new signal exports providers, which can be defined in Python
+        /// </summary>
+        /// <param name="signalExports">One or more signal export provider</param>
+        public void AddSignalExportProviders(params PyObject[] signalExports)
+        {
+            foreach (var signalExport in signalExports)
+            {
+                if (!signalExport.TryConvert(out ISignalExportTarget target))
+                {
+                    target = new SignalExportTargetPythonWrapper(signalExport);
+                }
+                AddSignalExportProviders(target);
+            }
+        }
+
         /// <summary>
         /// Sets the portfolio targets from the algorihtm's Portfolio and sends them with the
         /// algorithm being ran to the signal exports providers already set
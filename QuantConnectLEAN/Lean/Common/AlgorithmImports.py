@@ -13,6 +13,8 @@
 
 import os
 import sys
+from importlib import import_module
+from importlib.util import find_spec
 
 # The runtimeconfig.json is stored alongside start.py, but start.py may be a
 # symlink and the directory start.py is stored in is not necessarily the
@@ -28,72 +30,183 @@ for file in os.listdir(path):
     if file.endswith(".dll") and file.startswith("QuantConnect."):
         AddReference(file.replace(".dll", ""))
 
-from System import *
-from System.Drawing import *
-
-from QuantConnect import *
-from QuantConnect.Api import *
-from QuantConnect.Util import *
-from QuantConnect.Data import *
-from QuantConnect.Orders import *
-from QuantConnect.Python import *
-from QuantConnect.Storage import *
-from QuantConnect.Research import *
-from QuantConnect.Algorithm import *
-from QuantConnect.Statistics import *
-from QuantConnect.Parameters import *
-from QuantConnect.Benchmarks import *
-from QuantConnect.Brokerages import *
-from QuantConnect.Securities import *
-from QuantConnect.Indicators import *
-from QuantConnect.Interfaces import *
-from QuantConnect.Scheduling import *
-from QuantConnect.DataSource import *
-from QuantConnect.Orders.Fees import *
-from QuantConnect.Data.Custom import *
-from QuantConnect.Data.Market import *
-from QuantConnect.Lean.Engine import *
-from QuantConnect.Orders.Fills import *
-from QuantConnect.Configuration import *
-from QuantConnect.Notifications import *
-from QuantConnect.Data.Auxiliary import *
-from QuantConnect.Data.Shortable import *
-from QuantConnect.Orders.Slippage import *
-from QuantConnect.Securities.Forex import *
-from QuantConnect.Data.Fundamental import *
-from QuantConnect.Securities.Crypto import *
-from QuantConnect.Securities.Option import *
-from QuantConnect.Securities.Equity import *
-from QuantConnect.Securities.Future import *
-from QuantConnect.Data.Consolidators import *
-from QuantConnect.Orders.TimeInForces import *
-from QuantConnect.Algorithm.Framework import *
-from QuantConnect.Algorithm.Selection import *
-from QuantConnect.Securities.Positions import *
-from QuantConnect.Orders.OptionExercise import *
-from QuantConnect.Securities.Volatility import *
-from QuantConnect.Securities.Interfaces import *
-from QuantConnect.Data.UniverseSelection import *
-from QuantConnect.Data.Custom.IconicTypes import *
-from QuantConnect.Securities.CryptoFuture import *
-from QuantConnect.Algorithm.Framework.Risk import *
-from QuantConnect.Algorithm.Framework.Alphas import *
-from QuantConnect.Algorithm.Framework.Execution import *
-from QuantConnect.Algorithm.Framework.Portfolio import *
-from QuantConnect.Algorithm.Framework.Portfolio.SignalExports import *
-from QuantConnect.Algorithm.Framework.Selection import *
-
-try:
-    import numpy as np
-    import pandas as pd
-    import matplotlib.pyplot as plt
-except:
-    pass
+# Namespaces exported by this module, in import order: names of later namespaces take precedence
+_NAMESPACES = [
+    "System",
+    "System.Drawing",
+    "QuantConnect",
+    "QuantConnect.Api",
+    "QuantConnect.Util",
+    "QuantConnect.Data",
+    "QuantConnect.Orders",
+    "QuantConnect.Python",
+    "QuantConnect.Storage",
+    "QuantConnect.Research",
+    "QuantConnect.Algorithm",
+    "QuantConnect.Statistics",
+    "QuantConnect.Parameters",
+    "QuantConnect.Benchmarks",
+    "QuantConnect.Brokerages",
+    "QuantConnect.Securities",
+    "QuantConnect.Indicators",
+    "QuantConnect.Interfaces",
+    "QuantConnect.Scheduling",
+    "QuantConnect.DataSource",
+    "QuantConnect.Orders.Fees",
+    "QuantConnect.Data.Custom",
+    "QuantConnect.Data.Market",
+    "QuantConnect.Lean.Engine",
+    "QuantConnect.Orders.Fills",
+    "QuantConnect.Configuration",
+    "QuantConnect.Notifications",
+    "QuantConnect.Data.Auxiliary",
+    "QuantConnect.Data.Shortable",
+    "QuantConnect.Orders.Slippage",
+    "QuantConnect.Securities.Forex",
+    "QuantConnect.Data.Fundamental",
+    "QuantConnect.Securities.Crypto",
+    "QuantConnect.Securities.Option",
+    "QuantConnect.Securities.Equity",
+    "QuantConnect.Securities.Future",
+    "QuantConnect.Data.Consolidators",
+    "QuantConnect.Orders.TimeInForces",
+    "QuantConnect.Algorithm.Framework",
+    "QuantConnect.Algorithm.Selection",
+    "QuantConnect.Securities.Positions",
+    "QuantConnect.Orders.OptionExercise",
+    "QuantConnect.Securities.Volatility",
+    "QuantConnect.Securities.Interfaces",
+    "QuantConnect.Data.UniverseSelection",
+    "QuantConnect.Data.Custom.IconicTypes",
+    "QuantConnect.Securities.CryptoFuture",
+    "QuantConnect.Algorithm.Framework.Risk",
+    "QuantConnect.Algorithm.Framework.Alphas",
+    "QuantConnect.Algorithm.Framework.Execution",
+    "QuantConnect.Algorithm.Framework.Portfolio",
+    "QuantConnect.Algorithm.Framework.Portfolio.SignalExports",
+    "QuantConnect.Algorithm.Framework.Selection"
+]
+
+# Lazy mode: namespaces, numpy and pandas are resolved on first attribute access through the module __getattr__,
+# e.g. `import AlgorithmImports as ai; ai.QCAlgorithm` or `from AlgorithmImports import QCAlgorithm, Resolution`.
+# A star import only sees the names resolved so far, so algorithms using `from AlgorithmImports import *` need the default mode
+_lazy = os.environ.get('LEAN_LAZY_IMPORTS', '').lower() in ('1', 'true', 'yes')
+
+class _LazyModule:
+    '''Stands in for a module until one of its attributes is used, so e.g. matplotlib is only imported when plotting'''
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}'>"
+
+# matplotlib is the slowest of the scientific imports and rarely used in backtests, defer it in both modes
+if find_spec("matplotlib") is not None:
+    plt = _LazyModule("matplotlib.pyplot")
+
+if not _lazy:
+    from System import *
+    from System.Drawing import *
+    from QuantConnect import *
+    from QuantConnect.Api import *
+    from QuantConnect.Util import *
+    from QuantConnect.Data import *
+    from QuantConnect.Orders import *
+    from QuantConnect.Python import *
+    from QuantConnect.Storage import *
+    from QuantConnect.Research import *
+    from QuantConnect.Algorithm import *
+    from QuantConnect.Statistics import *
+    from QuantConnect.Parameters import *
+    from QuantConnect.Benchmarks import *
+    from QuantConnect.Brokerages import *
+    from QuantConnect.Securities import *
+    from QuantConnect.Indicators import *
+    from QuantConnect.Interfaces import *
+    from QuantConnect.Scheduling import *
+    from QuantConnect.DataSource import *
+    from QuantConnect.Orders.Fees import *
+    from QuantConnect.Data.Custom import *
+    from QuantConnect.Data.Market import *
+    from QuantConnect.Lean.Engine import *
+    from QuantConnect.Orders.Fills import *
+    from QuantConnect.Configuration import *
+    from QuantConnect.Notifications import *
+    from QuantConnect.Data.Auxiliary import *
+    from QuantConnect.Data.Shortable import *
+    from QuantConnect.Orders.Slippage import *
+    from QuantConnect.Securities.Forex import *
+    from QuantConnect.Data.Fundamental import *
+    from QuantConnect.Securities.Crypto import *
+    from QuantConnect.Securities.Option import *
+    from QuantConnect.Securities.Equity import *
+    from QuantConnect.Securities.Future import *
+    from QuantConnect.Data.Consolidators import *
+    from QuantConnect.Orders.TimeInForces import *
+    from QuantConnect.Algorithm.Framework import *
+    from QuantConnect.Algorithm.Selection import *
+    from QuantConnect.Securities.Positions import *
+    from QuantConnect.Orders.OptionExercise import *
+    from QuantConnect.Securities.Volatility import *
+    from QuantConnect.Securities.Interfaces import *
+    from QuantConnect.Data.UniverseSelection import *
+    from QuantConnect.Data.Custom.IconicTypes import *
+    from QuantConnect.Securities.CryptoFuture import *
+    from QuantConnect.Algorithm.Framework.Risk import *
+    from QuantConnect.Algorithm.Framework.Alphas import *
+    from QuantConnect.Algorithm.Framework.Execution import *
+    from QuantConnect.Algorithm.Framework.Portfolio import *
+    from QuantConnect.Algorithm.Framework.Portfolio.SignalExports import *
+    from QuantConnect.Algorithm.Framework.Selection import *
+
+    try:
+        import numpy as np
+        import pandas as pd
+    except:
+        pass
 
 from datetime import date, time, datetime, timedelta
 from typing import *
 import math
 import json
 
-QCAlgorithmFramework = QCAlgorithm
-QCAlgorithmFrameworkBridge = QCAlgorithm
+if not _lazy:
+    QCAlgorithmFramework = QCAlgorithm
+    QCAlgorithmFrameworkBridge = QCAlgorithm
+else:
+    _LAZY_MODULES = { "np": "numpy", "pd": "pandas" }
+    _ALIASES = { "QCAlgorithmFramework": "QCAlgorithm", "QCAlgorithmFrameworkBridge": "QCAlgorithm" }
+
+    def __getattr__(name):
+        '''Resolves the name on first access and stores it in the module so the next access is a plain lookup'''
+        if name.startswith("_"):
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        if name in _LAZY_MODULES:
+            value = import_module(_LAZY_MODULES[name])
+        elif name in _ALIASES:
+            value = __getattr__(_ALIASES[name])
+        else:
+            for namespace in reversed(_NAMESPACES):
+                module = import_module(namespace)
+                value = getattr(module, name, None)
+                if value is not None:
+                    break
+            else:
+                raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_MODULES) | set(_ALIASES))
@@ -0,0 +1,177 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Lean Python Callback Profiler
+Opt-in latency instrumentation of the Python callbacks the engine invokes: framework model methods,
+universe selection functions and algorithm event handlers. Timings are accumulated into log2 latency
+histograms so the per call overhead stays constant, and reported once when the algorithm ends.
+
+Enable it with the 'profile-callbacks' algorithm parameter (e.g. --parameters profile-callbacks:true)
+or the LEAN_PROFILE_CALLBACKS environment variable. Event handlers decorated with profiled_callback are bound
+by the engine before initialize reads the parameter, they are only wrapped when the environment variable is set.
+When disabled nothing is wrapped.
+'''
+
+import os
+from inspect import isfunction
+from functools import wraps
+from time import perf_counter_ns
+
+# Framework model methods instrumented by CallbackProfiler.instrument
+MODEL_CALLBACKS = [
+    'update',                   # AlphaModel
+    'create_targets',           # PortfolioConstructionModel
+    'execute',                  # ExecutionModel
+    'manage_risk',              # RiskManagementModel
+    'select',                   # UniverseSelectionModel
+    'select_coarse',            # FundamentalUniverseSelectionModel
+    'select_fine',
+    'on_securities_changed'
+]
+
+def enabled_by_environment():
+    '''True when the LEAN_PROFILE_CALLBACKS environment variable turns profiling on'''
+    return os.environ.get('LEAN_PROFILE_CALLBACKS', '').lower() in ('1', 'true', 'yes')
+
+class CallbackHistogram:
+    '''Latency histogram with power of two microsecond buckets: bucket k holds calls that took [2^(k-1), 2^k) us'''
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * 40
+
+    def add(self, elapsed_ns):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[min((elapsed_ns // 1000).bit_length(), 39)] += 1
+
+    def percentile(self, percent):
+        '''Upper bound, in microseconds, of the bucket holding the given percentile'''
+        target = self.count * percent / 100
+        cumulative = 0
+        for index, bucket in enumerate(self.buckets):
+            cumulative += bucket
+            if cumulative >= target and bucket > 0:
+                return 1 << index
+        return 0
+
+    def summary(self, name):
+        mean_us = self.total_ns / self.count / 1000 if self.count else 0
+        return (f'{name}: calls {self.count} total {self.total_ns / 1e9:.3f}s mean {mean_us:.1f}us '
+                f'p50 <{self.percentile(50)}us p90 <{self.percentile(90)}us p99 <{self.percentile(99)}us max {self.max_ns / 1000:.1f}us')
+
+    def bars(self, width=40):
+        '''Text histogram lines of the non empty buckets'''
+        largest = max(self.buckets)
+        lines = []
+        for index, bucket in enumerate(self.buckets):
+            if bucket == 0:
+                continue
+            lower = 0 if index == 0 else 1 << (index - 1)
+            lines.append(f'    [{lower:>9}us, {1 << index:>9}us) {"#" * max(1, bucket * width // largest):<{width}} {bucket}')
+        return lines
+
+class CallbackProfiler:
+    '''Times Python callbacks invoked by the engine and logs a per callback latency histogram'''
+
+    def __init__(self, algorithm, enabled = None):
+        '''Initializes a new instance of the CallbackProfiler class
+        Args:
+            algorithm: The algorithm instance, used to read the 'profile-callbacks' parameter and to log the report
+            enabled: Forces the profiler on or off. By default it follows the parameter or environment variable'''
+        self.algorithm = algorithm
+        if enabled is None:
+            value = algorithm.get_parameter('profile-callbacks') or ''
+            enabled = value.lower() in ('1', 'true', 'yes') or enabled_by_environment()
+        self.enabled = enabled
+        self.histograms = {}
+
+    def wrap(self, function, name = None):
+        '''Returns a timed version of the function, or the function itself when profiling is disabled
+        Args:
+            function: The callable to time, e.g. a universe selection function
+            name: Name used in the report, defaults to the function's qualified name'''
+        if not self.enabled:
+            return function
+
+        histogram = self.histograms.setdefault(name or getattr(function, '__qualname__', repr(function)), CallbackHistogram())
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.add(perf_counter_ns() - start)
+        return timed
+
+    def instrument(self, model):
+        '''Replaces the known framework callbacks of the model instance with timed versions.
+        Must be called before the model is handed to the algorithm, e.g. self.set_alpha(profiler.instrument(MyAlphaModel()))
+        Args:
+            model: Python alpha, portfolio construction, execution, risk management or universe selection model
+        Returns:
+            The same model instance'''
+        if not self.enabled:
+            return model
+        model_name = type(model).__name__
+        for method_name in MODEL_CALLBACKS:
+            # only Python implementations, the inherited .NET defaults are not Python callbacks
+            if isfunction(getattr(type(model), method_name, None)):
+                setattr(model, method_name, self.wrap(getattr(model, method_name), f'{model_name}.{method_name}'))
+        return model
+
+    def report(self):
+        '''Gets the report lines, callbacks sorted by total time spent'''
+        lines = []
+        for name, histogram in sorted(self.histograms.items(), key=lambda x: x[1].total_ns, reverse=True):
+            lines.append(histogram.summary(name))
+            lines.extend(histogram.bars())
+        return lines
+
+    def log_report(self):
+        '''Logs the report through the algorithm. Call it from on_end_of_algorithm'''
+        if not self.enabled:
+            return
+        self.algorithm.log('CallbackProfiler: Python callback latencies')
+        for line in self.report():
+            self.algorithm.log(line)
+
+def profiled_callback(name = None):
+    '''Decorator for algorithm event handlers such as on_data, which the engine binds before initialize runs.
+    Times the handler with the algorithm's 'callback_profiler' attribute when it is set and enabled. The handler
+    is left as is, without any per call cost, unless the LEAN_PROFILE_CALLBACKS environment variable is set'''
+    def decorator(function):
+        if not enabled_by_environment():
+            return function
+        callback_name = name or function.__name__
+        @wraps(function)
+        def wrapped(self, *args, **kwargs):
+            profiler = getattr(self, 'callback_profiler', None)
+            if profiler is None or not profiler.enabled:
+                return function(self, *args, **kwargs)
+            histogram = profiler.histograms.get(callback_name)
+            if histogram is None:
+                histogram = profiler.histograms[callback_name] = CallbackHistogram()
+            start = perf_counter_ns()
+            try:
+                return function(self, *args, **kwargs)
+            finally:
+                histogram.add(perf_counter_ns() - start)
+        return wrapped
+    return decorator
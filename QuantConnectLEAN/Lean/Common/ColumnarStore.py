@@ -0,0 +1,148 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+'''
+Lean Columnar Store
+Saves named NumPy columns in the ObjectStore as a single blob of raw column buffers behind a JSON header,
+instead of text. Reading a blob back is a buffer view per column, no parsing. The header carries a schema
+version chosen by the caller, blobs written with another version are ignored so the caller rebuilds them.
+exponential_moving_average gives the warmed up value of many exponential moving averages at once from such columns,
+for averages kept in arrays: Lean's indicators can't be seeded and are warmed up through update.
+
+Usage:
+    from ColumnarStore import ColumnarStore
+    store = ColumnarStore(self.object_store)
+    store.save('spy-close', { 'time': times, 'close': closes }, schema = 1)
+    columns = store.load('spy-close', schema = 1)   # None when missing or of another schema
+'''
+
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'LCOL'
+FORMAT_VERSION = 1
+# column buffers start on multiples of 8 bytes
+_ALIGNMENT = 8
+
+def to_bytes(columns, schema = 0, metadata = None):
+    '''Serializes columns to a blob
+    Args:
+        columns: Dictionary of column name to NumPy array, object arrays are not supported
+        schema: Version of the layout of the columns, chosen by the caller
+        metadata: Optional JSON serializable value stored with the columns
+    Returns:
+        The blob bytes'''
+    arrays = {}
+    for name, column in columns.items():
+        array = np.ascontiguousarray(column)
+        if array.dtype.hasobject:
+            raise ValueError(f'ColumnarStore: column {name} holds objects, only numeric, datetime and fixed size text columns are supported')
+        arrays[name] = array
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'schema': schema,
+        'metadata': metadata,
+        'columns': [[name, array.dtype.str, list(array.shape)] for name, array in arrays.items()]
+    }).encode()
+    start = len(MAGIC) + 4 + len(header)
+    padding = -start % _ALIGNMENT
+    parts = [MAGIC, struct.pack('<I', len(header) + padding), header, b' ' * padding]
+    for array in arrays.values():
+        parts.append(array.tobytes())
+        parts.append(b'\0' * (-array.nbytes % _ALIGNMENT))
+    return b''.join(parts)
+
+def from_bytes(data):
+    '''Deserializes a blob written by to_bytes
+    Args:
+        data: The blob bytes
+    Returns:
+        (columns, schema, metadata), the columns are read only views of the data'''
+    data = memoryview(data)
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError('ColumnarStore: not a columnar blob')
+    length, = struct.unpack_from('<I', data, len(MAGIC))
+    offset = len(MAGIC) + 4
+    header = json.loads(bytes(data[offset:offset + length]))
+    if header['format'] != FORMAT_VERSION:
+        raise ValueError(f"ColumnarStore: unsupported format {header['format']}")
+
+    offset += length
+    columns = {}
+    for name, dtype, shape in header['columns']:
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        columns[name] = np.frombuffer(data, dtype, count, offset).reshape(shape)
+        offset += count * dtype.itemsize
+        offset += -offset % _ALIGNMENT
+    return columns, header['schema'], header['metadata']
+
+class ColumnarStore:
+    '''Columns saved in an ObjectStore with save_bytes and read back with read_bytes'''
+
+    def __init__(self, object_store):
+        '''Initializes a new instance of the ColumnarStore class
+        Args:
+            object_store: The algorithm's object store'''
+        self.object_store = object_store
+
+    def save(self, key, columns, schema = 0, metadata = None):
+        '''Saves the columns under the key, see to_bytes'''
+        return self.object_store.save_bytes(key, to_bytes(columns, schema, metadata))
+
+    def load(self, key, schema = 0):
+        '''Columns saved under the key
+        Args:
+            key: The object store key
+            schema: Expected schema version
+        Returns:
+            Dictionary of column name to read only array, None when the key is missing, is not a columnar
+            blob or was saved with another schema version'''
+        result = self.load_with_metadata(key, schema)
+        return None if result is None else result[0]
+
+    def load_with_metadata(self, key, schema = 0):
+        '''(columns, metadata) saved under the key, None like load'''
+        if not self.object_store.contains_key(key):
+            return None
+        try:
+            columns, saved_schema, metadata = from_bytes(bytes(self.object_store.read_bytes(key)))
+        except (ValueError, KeyError, struct.error):
+            return None
+        if saved_schema != schema:
+            return None
+        return columns, metadata
+
+def exponential_moving_average(values, period):
+    '''Current value of Lean's ExponentialMovingAverage after updating it with the values, for many series at once:
+    the mean of the first period values, then value * k + previous * (1 - k) with k = 2 / (period + 1)
+    Args:
+        values: (updates, series) matrix, oldest first, or a single series
+        period: The period of the average
+    Returns:
+        The value per series, 0 like the indicator when there are fewer than period values'''
+    values = np.asarray(values, dtype=np.float64)
+    count = values.shape[0]
+    if count < period:
+        return np.zeros(values.shape[1:])
+    k = 2 / (period + 1)
+    # weight of the initial average and of each later value in the final one
+    decay = (1 - k) ** np.arange(count - period, -1, -1)
+    weights = np.empty(count)
+    weights[:period] = decay[0] / period
+    weights[period:] = k * decay[1:]
+    return weights @ values
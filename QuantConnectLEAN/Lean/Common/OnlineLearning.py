@@ -0,0 +1,178 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Lean Online Learning
+Scaffold for algorithms retraining a model on a schedule. Instead of requesting the whole lookback of history
+and fitting new models every time, OnlineTrainer keeps a rolling matrix of a data field for all the symbols
+(a row per bar, a column per symbol), requests only the bars added since the last training, and hands the
+matrix to an OnlineLearner that keeps its state between trainings. The matrix and the learner state are saved
+in the ObjectStore, an algorithm restarted with the same symbols resumes from them.
+
+Usage:
+    from OnlineLearning import OnlineLearner, OnlineTrainer
+    self.trainer = OnlineTrainer(self, MyLearner(), 30, 'close', key = 'my-model')
+    self.trainer.train(self._symbols)
+'''
+
+import pickle
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from QuantConnect import Resolution
+
+class OnlineLearner:
+    '''Model trained by an OnlineTrainer, all the symbols at once. Subclasses keep their state between calls to partial_fit'''
+
+    def reset(self, symbols):
+        '''Drops the state, called before the first training and when the symbols change
+        Args:
+            symbols: The symbols, in the order of the columns of the values'''
+        pass
+
+    def partial_fit(self, values, new_rows):
+        '''Updates the model
+        Args:
+            values: (bars, symbols) matrix of the field, oldest bar first
+            new_rows: Number of rows at the end of values added since the last call, all of them after a reset'''
+        raise NotImplementedError
+
+    def get_state(self):
+        '''Picklable state saved in the ObjectStore'''
+        return None
+
+    def set_state(self, state):
+        '''Restores the state returned by get_state'''
+        pass
+
+class OnlineTrainer:
+    '''Keeps the history of a field for a set of symbols up to date with incremental history requests and trains
+    an OnlineLearner on it. Reports the time spent requesting history and training'''
+
+    STATE_VERSION = 1
+
+    def __init__(self, algorithm, learner, size, field = 'close', resolution = Resolution.DAILY, key = None):
+        '''Initializes a new instance of the OnlineTrainer class
+        Args:
+            algorithm: The algorithm instance
+            learner: The OnlineLearner trained on the history
+            size: Number of bars kept per symbol
+            field: Column of the history data frame, e.g. 'open' or 'close'
+            resolution: Resolution of the history
+            key: ObjectStore key the state is saved under, None to not persist it'''
+        self.algorithm = algorithm
+        self.learner = learner
+        self.size = size
+        self.field = field
+        self.resolution = resolution
+        self.key = key
+        self.symbol_ids = None
+        self.times = None
+        self.values = None
+        self.trainings = 0
+        self.history_seconds = 0
+        self.training_seconds = 0
+        self._loaded = False
+
+    def train(self, symbols):
+        '''Appends the bars since the last training and trains the learner on the window
+        Args:
+            symbols: The symbols to train on, the columns of the values
+        Returns:
+            The number of new bars'''
+        if not self._loaded:
+            self._loaded = True
+            self.load()
+
+        start = perf_counter()
+        symbol_ids = [str(symbol.id) for symbol in symbols]
+        if symbol_ids != self.symbol_ids:
+            # a new universe starts from the full lookback
+            self.symbol_ids = symbol_ids
+            self.times = self.values = None
+            self.learner.reset(symbols)
+
+        if self.values is None:
+            history = self.algorithm.history(symbols, self.size, self.resolution)
+        else:
+            history = self.algorithm.history(symbols, pd.Timestamp(self.times[-1]).to_pydatetime(), self.algorithm.time, self.resolution)
+        new_rows = self._append(history, symbols)
+        self.history_seconds += perf_counter() - start
+
+        if new_rows > 0:
+            start = perf_counter()
+            self.learner.partial_fit(self.values, min(new_rows, len(self.values)))
+            self.training_seconds += perf_counter() - start
+            self.trainings += 1
+            self.save()
+        return new_rows
+
+    def _append(self, history, symbols):
+        if history.empty or self.field not in history:
+            return 0
+        frame = history[self.field].unstack(level=0)
+        # a column per symbol in the given order, rows where a symbol has no data yet are dropped
+        frame = frame.reindex(columns=list(symbols)).ffill().dropna()
+        times = frame.index.values.astype('datetime64[ns]')
+        values = frame.values.astype(np.float64)
+        if self.times is not None:
+            newer = times > self.times[-1]
+            times, values = times[newer], values[newer]
+            times = np.concatenate([self.times, times])
+            values = np.concatenate([self.values, values])
+        new_rows = len(times) - (len(self.times) if self.times is not None else 0)
+        self.times, self.values = times[-self.size:], values[-self.size:]
+        return new_rows
+
+    def save(self):
+        '''Saves the history and learner state in the ObjectStore'''
+        if self.key is None:
+            return
+        state = {
+            'version': self.STATE_VERSION,
+            'symbols': self.symbol_ids,
+            'times': self.times,
+            'values': self.values,
+            'learner': self.learner.get_state()
+        }
+        self.algorithm.object_store.save_bytes(self.key, pickle.dumps(state))
+
+    def load(self):
+        '''Restores the state saved in the ObjectStore, used once the symbols of the next training match. A state
+        holding bars after the algorithm time is ignored
+        Returns:
+            True if a state was restored'''
+        if self.key is None or not self.algorithm.object_store.contains_key(self.key):
+            return False
+        try:
+            state = pickle.loads(bytes(self.algorithm.object_store.read_bytes(self.key)))
+        except Exception as e:
+            self.algorithm.debug(f'OnlineTrainer: ignoring unreadable state {self.key}: {e}')
+            return False
+        if state.get('version') != self.STATE_VERSION:
+            return False
+        times = state['times']
+        if times is not None and len(times) > 0 and times[-1] > np.datetime64(pd.Timestamp(self.algorithm.time), 'ns'):
+            # saved by a run that went past the current time, e.g. an earlier backtest
+            self.algorithm.debug(f'OnlineTrainer: ignoring state {self.key} saved at {pd.Timestamp(times[-1])}, after the algorithm time')
+            return False
+        self.symbol_ids = state['symbols']
+        self.times = state['times']
+        self.values = state['values']
+        self.learner.set_state(state['learner'])
+        return True
+
+    def report(self):
+        return (f'OnlineTrainer: {self.trainings} trainings, {self.history_seconds:.3f}s requesting history, '
+                f'{self.training_seconds:.3f}s training, {self.values.shape[1] if self.values is not None else 0} symbols')
@@ -19,26 +19,60 @@ Allowing support for indexing of Lean created Indexes with tickers like "SPY", S
 '''
 
 import pandas as pd
+from collections import OrderedDict
 from pandas.core.indexes.frozen import FrozenList as pdFrozenList
 
 from clr import AddReference
 AddReference("QuantConnect.Common")
 from QuantConnect import *
 
+# Bounded LRU of Symbol -> SID string. Reading the SID crosses the .NET boundary, which dominates indexing cost in
+# tight loops. Tickers aren't cached, SymbolCache can map a ticker to a different Symbol at any time
+_cache_size = 4096
+_sid_cache = OrderedDict()
+_reserved = frozenset(['high', 'low', 'open', 'close'])
+
+def set_cache_size(size):
+    '''Sets the maximum number of cached key mappings. Zero disables the cache'''
+    global _cache_size
+    _cache_size = max(0, int(size))
+    while len(_sid_cache) > _cache_size:
+        _sid_cache.popitem(last=False)
+
+def clear_cache():
+    '''Clears all cached key mappings'''
+    _sid_cache.clear()
+
+def _map_symbol_key(key, keyType):
+    '''Resolves a Symbol or ticker to its SID string, None if the ticker is unknown'''
+    if keyType is Symbol:
+        return str(key.ID)
+    kvp = SymbolCache.TryGetSymbol(key, None)
+    if kvp[0]:
+        return str(kvp[1].ID)
+    return None
+
 def mapper(key):
     '''Maps a Symbol object or a Symbol Ticker (string) to the string representation of
     Symbol SecurityIdentifier.If cannot map, returns the object
     '''
     keyType = type(key)
-    if keyType is Symbol:
-        return str(key.ID)
-    if keyType is str:
-        reserved = ['high', 'low', 'open', 'close']
-        if key in reserved:
-            return key
-        kvp = SymbolCache.TryGetSymbol(key, None)
-        if kvp[0]:
-            return str(kvp[1].ID)
+    if keyType is Symbol or keyType is str:
+        if keyType is str:
+            if key in _reserved:
+                return key
+            sid = _map_symbol_key(key, keyType)
+            return key if sid is None else sid
+        try:
+            sid = _sid_cache[key]
+            _sid_cache.move_to_end(key)
+        except KeyError:
+            sid = _map_symbol_key(key, keyType)
+            if _cache_size > 0:
+                _sid_cache[key] = sid
+                if len(_sid_cache) > _cache_size:
+                    _sid_cache.popitem(last=False)
+        return sid
     if keyType is list:
         return [mapper(x) for x in key]
     if keyType is tuple:
@@ -47,17 +81,60 @@ def mapper(key):
         return { k: mapper(v) for k, v in key.items()}
     return key
 
-def wrap_keyerror_function(f):
+def _is_unchanged(original, mapped):
+    '''True if mapping did not replace any of the top level arguments'''
+    if type(original) is dict:
+        return all(mapped[k] is v for k, v in original.items())
+    return all(m is o for m, o in zip(mapped, original))
+
+# Key types mapper() can translate, any other key is passed to pandas untouched
+_mappable_types = frozenset([str, Symbol, list, tuple, dict])
+
+def _has_mappable_key(args, kwargs):
+    '''True if any of the arguments after the wrapped instance could need mapping'''
+    if kwargs:
+        return True
+    for arg in args[1:]:
+        if type(arg) in _mappable_types:
+            return True
+    return False
+
+def may_hold_sids(index):
+    '''True if the index could contain Lean SID strings. Lean indexes store SIDs as strings, so indexes
+    without a string-like level (integer, float, datetime...) never need their keys mapped
+    '''
+    if isinstance(index, pd.MultiIndex):
+        return any(level.dtype.kind == 'O' for level in index.levels)
+    return index.dtype.kind == 'O'
+
+def _frame_needs_mapping(frame):
+    return may_hold_sids(frame.columns)
+
+def _indexer_needs_mapping(indexer):
+    # positional indexers (iloc, iat) never take labels
+    if indexer.name[0] == 'i':
+        return False
+    obj = indexer.obj
+    if may_hold_sids(obj.index):
+        return True
+    return obj.ndim > 1 and may_hold_sids(obj.columns)
+
+def wrap_keyerror_function(f, needs_mapping=None):
     '''Wraps function f with wrapped_function, used for functions that throw KeyError when not found.
     wrapped_function converts the args / kwargs to use alternative index keys and then calls the function. 
     If this fails we fall back to the original key and try it as well, if they both fail we throw our error.
+    needs_mapping receives the wrapped instance, when it returns False f is called directly
     '''
     def wrapped_function(*args, **kwargs):
+        # Fast path for keys that can't be mapped (timestamps, ints, slices...) and for pandas objects
+        # that can't hold Lean keys, e.g. user frames with integer or datetime indexes
+        if not _has_mappable_key(args, kwargs) or (needs_mapping is not None and not needs_mapping(args[0])):
+            return f(*args, **kwargs)
+
         # Map args & kwargs and execute function
+        newargs = args
+        newkwargs = kwargs
         try:
-            newargs = args
-            newkwargs = kwargs
-
             if len(args) > 1:
                 newargs = mapper(args)
             if len(kwargs) > 0:
@@ -67,21 +144,24 @@ def wrap_keyerror_function(f):
         except KeyError as e:
             mKey = [arg for arg in newargs if isinstance(arg, str)]
 
-        # Execute original
+        # Execute original, unless nothing was mapped and it would raise the same error
         # Allows for df, Series, etc indexing for keys like 'SPY' if they exist
-        try:
-            return f(*args, **kwargs)
-        except KeyError as e:
-            oKey = [arg for arg in args if isinstance(arg, str)]
-            raise KeyError(f"No key found for either mapped or original key. Mapped Key: {mKey}; Original Key: {oKey}")
+        if not (_is_unchanged(args, newargs) and _is_unchanged(kwargs, newkwargs)):
+            try:
+                return f(*args, **kwargs)
+            except KeyError as e:
+                pass
+        oKey = [arg for arg in args if isinstance(arg, str)]
+        raise KeyError(f"No key found for either mapped or original key. Mapped Key: {mKey}; Original Key: {oKey}")
 
     wrapped_function.__name__ = f.__name__
     return wrapped_function
 
-def wrap_bool_function(f):
+def wrap_bool_function(f, needs_mapping=None):
     '''Wraps function f with wrapped_function, used for functions that reply true/false if key is found.
     wrapped_function attempts with the original args, if its false, it converts the args / kwargs to use
     alternative index keys and then attempts with the mapped args.
+    needs_mapping receives the wrapped instance, when it returns False the original result is returned as is
     '''
     def wrapped_function(*args, **kwargs):
 
@@ -90,6 +170,9 @@ def wrap_bool_function(f):
         if originalResult:
             return originalResult
 
+        if not _has_mappable_key(args, kwargs) or (needs_mapping is not None and not needs_mapping(args[0])):
+            return originalResult
+
         # Try our mapped args; return this result regardless
         newargs = args
         newkwargs = kwargs
@@ -99,6 +182,10 @@ def wrap_bool_function(f):
         if len(kwargs) > 0:
             newkwargs = mapper(kwargs)
 
+        # Nothing was mapped, don't repeat the lookup
+        if _is_unchanged(args, newargs) and _is_unchanged(kwargs, newkwargs):
+            return originalResult
+
         return f(*newargs, **newkwargs)
 
     wrapped_function.__name__ = f.__name__
@@ -106,21 +193,22 @@ def wrap_bool_function(f):
 
 
 # Wrap all core indexing functions that are shared, yet still throw key errors if index not found
-pd.core.indexing._LocationIndexer.__getitem__ = wrap_keyerror_function(pd.core.indexing._LocationIndexer.__getitem__)
-pd.core.indexing._ScalarAccessIndexer.__getitem__ = wrap_keyerror_function(pd.core.indexing._ScalarAccessIndexer.__getitem__)
-pd.core.indexes.base.Index.get_loc = wrap_keyerror_function(pd.core.indexes.base.Index.get_loc)
+# Each wrapper checks the indexes involved first and skips mapping entirely when they can't hold Lean SIDs
+pd.core.indexing._LocationIndexer.__getitem__ = wrap_keyerror_function(pd.core.indexing._LocationIndexer.__getitem__, _indexer_needs_mapping)
+pd.core.indexing._ScalarAccessIndexer.__getitem__ = wrap_keyerror_function(pd.core.indexing._ScalarAccessIndexer.__getitem__, _indexer_needs_mapping)
+pd.core.indexes.base.Index.get_loc = wrap_keyerror_function(pd.core.indexes.base.Index.get_loc, may_hold_sids)
 
 # Wrap our DF _getitem__ as well, even though most pathways go through the above functions
 # There are cases like indexing with an array that need to be mapped earlier to stop KeyError from arising 
-pd.core.frame.DataFrame.__getitem__ = wrap_keyerror_function(pd.core.frame.DataFrame.__getitem__)
+pd.core.frame.DataFrame.__getitem__ = wrap_keyerror_function(pd.core.frame.DataFrame.__getitem__, _frame_needs_mapping)
 
 # For older version of pandas we may need to wrap extra functions
 if (int(pd.__version__.split('.')[0]) < 1):
-    pd.core.indexes.base.Index.get_value = wrap_keyerror_function(pd.core.indexes.base.Index.get_value)
+    pd.core.indexes.base.Index.get_value = wrap_keyerror_function(pd.core.indexes.base.Index.get_value, may_hold_sids)
 
 # Special cases where we need to wrap a function that won't throw a keyerror when not found but instead returns true or false
 # Wrap __contains__ to support Python syntax like 'SPY' in DataFrame 
-pd.core.indexes.base.Index.__contains__ = wrap_bool_function(pd.core.indexes.base.Index.__contains__)
+pd.core.indexes.base.Index.__contains__ = wrap_bool_function(pd.core.indexes.base.Index.__contains__, may_hold_sids)
 
 # For compatibility with PandasData.cs usage of this module (Previously wrapped classes)
 FrozenList = pdFrozenList
@@ -0,0 +1,57 @@
+/*
+ * QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+ * Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+*/
+
+using Python.Runtime;
+using QuantConnect.Algorithm.Framework.Portfolio.SignalExports;
+using QuantConnect.Interfaces;
+
+namespace QuantConnect.Python
+{
+    /// <summary>
+    /// Provides an implementation of <see cref="ISignalExportTarget"/> that wraps a <see cref="PyObject"/> object
+    /// </summary>
+    public class SignalExportTargetPythonWrapper : BasePythonWrapper<ISignalExportTarget>, ISignalExportTarget
+    {
+        /// <summary>
+        /// Constructor for initialising the <see cref="SignalExportTargetPythonWrapper"/> class with wrapped <see cref="PyObject"/> object
+        /// </summary>
+        /// <param name="signalExport">Python signal export provider</param>
+        public SignalExportTargetPythonWrapper(PyObject signalExport)
+            : base(signalExport)
+        {
+        }
+
+        /// <summary>
+        /// Sends user's positions to the 3rd party API using the method defined in the Python class
+        /// </summary>
+        /// <param name="parameters">Holdings the user have defined to be sent to certain 3rd party API and the algorithm being ran</param>
+        /// <returns>True if the positions were sent correctly, false otherwise</returns>
+        public bool Send(SignalExportTargetParameters parameters)
+        {
+            return InvokeMethod<bool>(nameof(Send), parameters);
+        }
+
+        /// <summary>
+        /// Releases the resources of the Python signal export provider, if it defines a dispose method
+        /// </summary>
+        public void Dispose()
+        {
+            if (HasAttr(nameof(Dispose)))
+            {
+                InvokeMethod(nameof(Dispose));
+            }
+        }
+    }
+}
@@ -0,0 +1,141 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Lean Rolling Frame
+Fixed capacity window of rows with named columns backed by NumPy arrays, a replacement for growing a DataFrame
+with pd.concat on every bar, which copies the whole frame each time.
+
+Every row is written twice, at its slot and at its slot plus the capacity, so the rows of the window are
+always one contiguous slice of each column: appending is O(1) and columns are handed to talib or NumPy as
+views without copying.
+
+Usage:
+    from RollingFrame import RollingFrame
+    self.window = RollingFrame(20, ['close', 'sma'])
+    self.window.append({'close': bar.close}, bar.end_time)
+    self.window.set_last('sma', talib.SMA(self.window['close'], 10)[-1])
+    self.window.to_pandas()
+'''
+
+import numpy as np
+
+class RollingFrame:
+    '''Rolling window of float64 rows with named columns, oldest row first'''
+
+    def __init__(self, capacity, columns):
+        '''Initializes a new instance of the RollingFrame class
+        Args:
+            capacity: Number of rows kept, the oldest row is dropped when a row is appended to a full frame
+            columns: Column names'''
+        if capacity < 1:
+            raise ValueError(f'RollingFrame: capacity must be positive, got {capacity}')
+        self.capacity = capacity
+        self.columns = list(columns)
+        self._column_index = { name: i for i, name in enumerate(self.columns) }
+        # a row per column, each twice the capacity long
+        self._data = np.full((len(self.columns), 2 * capacity), np.nan)
+        self._times = np.full(2 * capacity, np.datetime64('NaT'), dtype='datetime64[ns]')
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def is_ready(self):
+        '''True when the frame holds capacity rows'''
+        return self._count == self.capacity
+
+    def _window(self):
+        start = self._next if self._count == self.capacity else 0
+        return start, start + self._count
+
+    def append(self, values, time = None):
+        '''Adds a row, dropping the oldest one when the frame is full
+        Args:
+            values: Sequence of values in column order, or a dictionary of column values where missing columns are NaN
+            time: Optional time of the row, the index of to_pandas'''
+        if isinstance(values, dict):
+            row = np.full(len(self.columns), np.nan)
+            for name, value in values.items():
+                row[self._column_index[name]] = value
+        else:
+            row = values
+        position = self._next
+        self._data[:, position] = row
+        self._data[:, position + self.capacity] = row
+        if time is not None:
+            time = np.datetime64(time, 'ns')
+        self._times[position] = self._times[position + self.capacity] = time if time is not None else np.datetime64('NaT')
+        self._next = (position + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def __getitem__(self, column):
+        '''Read-only contiguous view of the column's values, oldest first. It changes with the frame, copy it to keep it'''
+        start, stop = self._window()
+        view = self._data[self._column_index[column], start:stop]
+        view.flags.writeable = False
+        return view
+
+    def __setitem__(self, column, values):
+        '''Sets the values of a column for every row of the frame, e.g. the output of a talib function'''
+        index = self._column_index[column]
+        start, stop = self._window()
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), (stop - start,))
+        # write the mirrored slots too
+        positions = np.arange(start, stop) % self.capacity
+        self._data[index, positions] = values
+        self._data[index, positions + self.capacity] = values
+
+    def set_last(self, column, value):
+        '''Sets a column of the latest row'''
+        if self._count == 0:
+            raise IndexError('RollingFrame: the frame is empty')
+        index = self._column_index[column]
+        position = (self._next - 1) % self.capacity
+        self._data[index, position] = self._data[index, position + self.capacity] = value
+
+    def last(self, column):
+        '''Value of the column in the latest row'''
+        if self._count == 0:
+            raise IndexError('RollingFrame: the frame is empty')
+        return self._data[self._column_index[column], (self._next - 1) % self.capacity]
+
+    @property
+    def values(self):
+        '''Read-only view of the rows, shape (rows, columns)'''
+        start, stop = self._window()
+        view = self._data[:, start:stop].T
+        view.flags.writeable = False
+        return view
+
+    @property
+    def times(self):
+        '''Read-only view of the row times, oldest first'''
+        start, stop = self._window()
+        view = self._times[start:stop]
+        view.flags.writeable = False
+        return view
+
+    def clear(self):
+        self._data[:] = np.nan
+        self._times[:] = np.datetime64('NaT')
+        self._next = 0
+        self._count = 0
+
+    def to_pandas(self):
+        '''Copy of the frame as a pandas DataFrame indexed by the row times'''
+        import pandas as pd
+        start, stop = self._window()
+        return pd.DataFrame(self._data[:, start:stop].T.copy(), index=pd.DatetimeIndex(self._times[start:stop]), columns=self.columns)
@@ -0,0 +1,293 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Memoizing layer for QuantBook history requests. Results are kept in memory and spilled to disk so repeated
+# requests, also in later sessions, skip reading and converting the data again.
+#
+# Usage:
+#   cache = HistoryCache(qb)
+#   history = cache.history(["SPY", "AAPL"], 360, Resolution.DAILY)
+#   print(cache.report())
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import logging
+from datetime import date
+from collections import OrderedDict
+
+import pandas as pd
+from QuantConnect import Symbol, SecurityIdentifier, SymbolCache
+
+try:
+    import pyarrow
+    _SPILL_FORMAT = 'parquet'
+except ImportError:
+    _SPILL_FORMAT = 'pickle'
+
+class HistoryCache:
+    '''Caches QuantBook history data frames keyed by the request: symbols, range, resolution, normalization
+    and the other history arguments, along with the subscription settings of the securities that arguments left
+    out default to. Requests relative to the current time (bar count or time span) include the QuantBook time in the key'''
+
+    def __init__(self, qb, folder = None, max_bytes = 1 << 30, memory_items = 32):
+        '''Initializes a new instance of the HistoryCache class
+        Args:
+            qb: The QuantBook instance
+            folder: Spill folder, defaults to 'history-cache' in the working directory. An empty string keeps the frames in memory only
+            max_bytes: Size bound of the spill folder, least recently used entries are evicted first
+            memory_items: Number of data frames kept in memory, least recently used first out'''
+        self.qb = qb
+        self.folder = folder if folder is not None else os.path.join(os.getcwd(), 'history-cache')
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        # sid strings to the Symbol objects seen in this session
+        self._symbols = {}
+        self._index = self._load_index()
+
+    def _index_path(self):
+        return os.path.join(self.folder, 'index.json')
+
+    def _load_index(self):
+        if not self.folder or not os.path.exists(self._index_path()):
+            return {}
+        with open(self._index_path(), 'r') as f:
+            return json.load(f)
+
+    def _save_index(self):
+        path = self._index_path()
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self._index, f)
+        os.replace(path + '.tmp', path)
+
+    def _describe(self, value, tickers = False):
+        '''Stable text of a history argument, tickers are case insensitive'''
+        if isinstance(value, Symbol):
+            return str(value.ID)
+        if isinstance(value, str):
+            return value.upper() if tickers else value
+        if isinstance(value, type):
+            return f'{value.__module__}.{value.__qualname__}'
+        if hasattr(value, '__iter__'):
+            return '[' + ','.join(self._describe(item, tickers) for item in value) + ']'
+        return str(value)
+
+    def _symbols_argument(self, args, kwargs):
+        '''The tickers or symbols of the request, after the data type when there is one. None for the overloads
+        requesting every security, e.g. history(360, Resolution.DAILY)'''
+        if 'symbols' in kwargs or 'tickers' in kwargs:
+            return kwargs.get('symbols', kwargs.get('tickers'))
+        values = [arg for arg in args if not isinstance(arg, type)]
+        if values and (isinstance(values[0], (str, Symbol)) or hasattr(values[0], '__iter__')):
+            return values[0]
+        return None
+
+    def _subscription_settings(self, symbols):
+        '''Settings of the securities' subscriptions a request uses for the arguments it leaves out, the universe
+        settings for symbols that are not subscribed'''
+        if isinstance(symbols, (str, Symbol)):
+            symbols = [symbols]
+        parts = []
+        for symbol in symbols if hasattr(symbols, '__iter__') else []:
+            if isinstance(symbol, str):
+                found, symbol = SymbolCache.try_get_symbol(symbol, None)
+                symbol = symbol if found else None
+            elif not isinstance(symbol, Symbol):
+                continue
+            if symbol is not None and self.qb.securities.contains_key(symbol):
+                configs = self.qb.securities[symbol].subscriptions
+            else:
+                configs = [self.qb.universe_settings]
+            for config in configs:
+                parts.append(','.join(str(getattr(config, name, None)) for name in ('resolution', 'data_normalization_mode',
+                    'data_mapping_mode', 'contract_depth_offset', 'fill_data_forward', 'fill_forward', 'extended_market_hours')))
+        return '[' + ';'.join(parts) + ']'
+
+    def key(self, *args, **kwargs):
+        '''Cache key of a history request'''
+        symbols = self._symbols_argument(args, kwargs)
+        parts = [self._describe(arg, symbols is not None and arg is symbols) for arg in args]
+        parts += [f'{name}={self._describe(value, symbols is not None and value is symbols)}' for name, value in sorted(kwargs.items())]
+        if symbols is None:
+            # the request covers the securities of the QuantBook
+            symbols = sorted((kvp.key for kvp in self.qb.securities), key=lambda symbol: str(symbol.ID))
+            parts.append(f'securities={self._describe(symbols)}')
+        parts.append(f'subscriptions={self._subscription_settings(symbols)}')
+        # requests without a start and end (bar count or time span) are relative to the current time
+        if not any(isinstance(value, date) for value in list(args) + list(kwargs.values())):
+            parts.append(f'time={self.qb.time}')
+        return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+    def history(self, *args, **kwargs):
+        '''Same arguments as QuantBook.history, returns a copy of the cached data frame when the request was seen before'''
+        key = self.key(*args, **kwargs)
+
+        frame = self._memory.get(key)
+        if frame is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return frame.copy()
+
+        frame = self._read(key)
+        if frame is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            frame = self.qb.history(*args, **kwargs)
+            if not isinstance(frame, pd.DataFrame):
+                # e.g. a generator of slices, not a data frame
+                return frame
+            self._remember_symbols(frame)
+            self._write(key, frame)
+
+        self._memory[key] = frame
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+        return frame.copy()
+
+    def _remember_symbols(self, frame):
+        for level in range(frame.index.nlevels):
+            values = frame.index.get_level_values(level)
+            if values.dtype == object and len(values) > 0 and isinstance(values[0], Symbol):
+                for symbol in values.unique():
+                    self._symbols[str(symbol.ID)] = symbol
+
+    def _to_symbol(self, sid, value = None):
+        '''Symbol of a spilled sid, value being the Symbol's value when it was spilled'''
+        symbol = self._symbols.get(sid)
+        if symbol is None:
+            if value is not None:
+                found, cached = SymbolCache.try_get_symbol(value, None)
+                if found and str(cached.ID) == sid:
+                    symbol = cached
+            if symbol is None:
+                # the first token of the sid is the ticker at listing, older spills did not store the value
+                symbol = Symbol(SecurityIdentifier.parse(sid), value if value is not None else sid.split(' ')[0])
+            self._symbols[sid] = symbol
+        return symbol
+
+    def _write(self, key, frame):
+        '''Spills the frame with Symbol index levels as sid strings'''
+        if not self.folder:
+            return
+        levels = []
+        # sid to value of the Symbols, the sid alone does not give the current ticker
+        values_by_sid = {}
+        stored = frame
+        for level in range(frame.index.nlevels):
+            values = frame.index.get_level_values(level)
+            if values.dtype == object and len(values) > 0 and isinstance(values[0], Symbol):
+                levels.append(level)
+                values_by_sid.update((str(symbol.ID), symbol.value) for symbol in values.unique())
+        if levels:
+            stored = frame.copy(deep=False)
+            if stored.index.nlevels == 1:
+                stored.index = pd.Index([str(symbol.ID) for symbol in stored.index], name=stored.index.name)
+            else:
+                stored.index = stored.index.set_levels([[str(symbol.ID) for symbol in stored.index.levels[level]] for level in levels], level=levels)
+
+        os.makedirs(self.folder, exist_ok=True)
+        path = os.path.join(self.folder, f'{key}.{_SPILL_FORMAT}')
+        try:
+            if _SPILL_FORMAT == 'parquet':
+                stored.to_parquet(path + '.tmp')
+            else:
+                stored.to_pickle(path + '.tmp')
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            # e.g. columns holding .NET objects, the frame stays cached in memory only
+            logging.warning(f'HistoryCache: could not spill {key}: {e}')
+            if os.path.exists(path + '.tmp'):
+                os.remove(path + '.tmp')
+            return
+
+        self._index[key] = { 'size': os.path.getsize(path), 'used': time.time(), 'symbol_levels': levels, 'symbols': values_by_sid, 'format': _SPILL_FORMAT }
+        self._evict()
+        self._save_index()
+
+    def _read(self, key):
+        entry = self._index.get(key)
+        if entry is None or entry['format'] != _SPILL_FORMAT:
+            return None
+        path = os.path.join(self.folder, f'{key}.{_SPILL_FORMAT}')
+        try:
+            frame = pd.read_parquet(path) if _SPILL_FORMAT == 'parquet' else pd.read_pickle(path)
+        except (OSError, ValueError, pickle.UnpicklingError) as e:
+            logging.warning(f'HistoryCache: dropping unreadable {key}: {e}')
+            self._index.pop(key)
+            self._save_index()
+            return None
+
+        levels = entry['symbol_levels']
+        values_by_sid = entry.get('symbols', {})
+        if levels:
+            if frame.index.nlevels == 1:
+                frame.index = pd.Index([self._to_symbol(sid, values_by_sid.get(sid)) for sid in frame.index], name=frame.index.name, dtype=object)
+            else:
+                frame.index = frame.index.set_levels([pd.Index([self._to_symbol(sid, values_by_sid.get(sid)) for sid in frame.index.levels[level]], dtype=object)
+                    for level in levels], level=levels)
+        entry['used'] = time.time()
+        self._save_index()
+        return frame
+
+    def _evict(self):
+        '''Removes the least recently used spilled frames until the folder fits max_bytes'''
+        total = sum(entry['size'] for entry in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda x: x[1]['used']):
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.folder, f"{key}.{entry['format']}")
+            if os.path.exists(path):
+                os.remove(path)
+            total -= entry['size']
+            del self._index[key]
+
+    @property
+    def hit_rate(self):
+        requests = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / requests if requests else 0
+
+    def stats(self):
+        return {
+            'requests': self.memory_hits + self.disk_hits + self.misses,
+            'memory-hits': self.memory_hits,
+            'disk-hits': self.disk_hits,
+            'misses': self.misses,
+            'hit-rate': self.hit_rate,
+            'memory-items': len(self._memory),
+            'disk-items': len(self._index),
+            'disk-bytes': sum(entry['size'] for entry in self._index.values())
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"HistoryCache: {stats['requests']} requests, hit rate {stats['hit-rate']:.1%} "
+                f"({stats['memory-hits']} memory, {stats['disk-hits']} disk, {stats['misses']} misses), "
+                f"{stats['memory-items']} frames in memory, {stats['disk-items']} on disk using {stats['disk-bytes'] / (1 << 20):.1f}MB")
+
+    def clear(self):
+        '''Drops every cached frame, in memory and on disk'''
+        self._memory.clear()
+        for key, entry in self._index.items():
+            path = os.path.join(self.folder, f"{key}.{entry['format']}")
+            if os.path.exists(path):
+                os.remove(path)
+        self._index = {}
+        if self.folder and os.path.isdir(self.folder):
+            self._save_index()
@@ -0,0 +1,196 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Pool of pre-warmed research kernels. Every kernel runs start.py when it starts (IPython profile startup
+# file), which loads CoreCLR, resets the configuration and initializes the engine handlers. The pool starts
+# kernels ahead of time so a new notebook gets one that already went through it.
+#
+# Kernels are separate processes started ahead of time rather than forked from a warmed parent: the .NET
+# runtime's threads do not survive a fork.
+#
+# Usage with JupyterLab, from the folder holding start.py:
+#   jupyter lab --ServerApp.kernel_manager_class=kernel_pool.PooledMappingKernelManager --PooledMappingKernelManager.pool_size=2
+#
+# Pooled kernels start in the server root folder and read its config.json, they are moved to the notebook's
+# folder when handed out.
+
+import asyncio
+import logging
+from collections import deque
+
+async def execute(kernel_manager, kernel_id, code = None, timeout = 300):
+    '''Waits for the kernel to be ready, which happens once the startup files ran, then runs the code
+    Args:
+        kernel_manager: Multi kernel manager holding the kernel
+        kernel_id: Id of the kernel
+        code: Optional code to run silently
+        timeout: Seconds to wait for the kernel
+    Returns:
+        The execute reply, None when there was no code to run'''
+    client = kernel_manager.get_kernel(kernel_id).client()
+    client.start_channels()
+    try:
+        await client.wait_for_ready(timeout=timeout)
+        if code:
+            return await client.execute_interactive(code, silent=True, store_history=False, timeout=timeout)
+    finally:
+        client.stop_channels()
+
+class KernelPool:
+    '''Keeps a number of warm kernels of a multi kernel manager ready to be handed out'''
+
+    def __init__(self, kernel_manager, kernel_name = 'python3', size = 2, startup_code = None, start_kernel = None, timeout = 300):
+        '''Initializes a new instance of the KernelPool class
+        Args:
+            kernel_manager: jupyter_client AsyncMultiKernelManager (or Jupyter server mapping kernel manager)
+            kernel_name: Kernel spec of the pooled kernels
+            size: Number of warm kernels to keep ready
+            startup_code: Optional code run once in each pooled kernel, e.g. '%run /Lean/Launcher/bin/Debug/start.py'
+                when start.py is not an IPython startup file
+            start_kernel: Coroutine function starting a kernel, defaults to the kernel manager's start_kernel
+            timeout: Seconds to wait for a kernel to be ready'''
+        self.kernel_manager = kernel_manager
+        self.kernel_name = kernel_name
+        self.size = size
+        self.startup_code = startup_code
+        self.timeout = timeout
+        self._start_kernel = start_kernel or kernel_manager.start_kernel
+        self._ready = deque()
+        self._starting = set()
+        self._warming = set()
+
+    @property
+    def kernel_ids(self):
+        '''Ids of the kernels owned by the pool, ready or still warming up'''
+        return set(self._ready) | self._warming
+
+    def fill(self):
+        '''Starts kernels in the background until the pool holds its size. Must be called from the event loop'''
+        while len(self._ready) + len(self._starting) < self.size:
+            task = asyncio.ensure_future(self._warm())
+            self._starting.add(task)
+            task.add_done_callback(self._warmed)
+
+    async def _warm(self):
+        kernel_id = await self._start_kernel(kernel_name=self.kernel_name)
+        self._warming.add(kernel_id)
+        try:
+            await execute(self.kernel_manager, kernel_id, self.startup_code, self.timeout)
+        except:
+            self._warming.discard(kernel_id)
+            await self.kernel_manager.shutdown_kernel(kernel_id, now=True)
+            raise
+        return kernel_id
+
+    def _warmed(self, task):
+        self._starting.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logging.error(f'KernelPool: failed to warm a kernel: {task.exception()}')
+            return
+        self._ready.append(task.result())
+        self._warming.discard(task.result())
+
+    async def wait(self):
+        '''Waits until the kernels being started are ready'''
+        while self._starting:
+            await asyncio.wait(set(self._starting))
+
+    async def take(self, path = None):
+        '''Hands out a warm kernel, waiting for one still warming up if none is ready
+        Args:
+            path: Optional folder to move the kernel to
+        Returns:
+            The kernel id, None when the pool is empty'''
+        self.fill()
+        while True:
+            while not self._ready and self._starting:
+                await asyncio.wait(set(self._starting), return_when=asyncio.FIRST_COMPLETED)
+            if not self._ready:
+                return None
+            kernel_id = self._ready.popleft()
+            if await self.kernel_manager.get_kernel(kernel_id).is_alive():
+                break
+            await self.kernel_manager.shutdown_kernel(kernel_id, now=True)
+
+        # replenish in the background
+        self.fill()
+        if path:
+            await execute(self.kernel_manager, kernel_id, f'import os\nos.chdir({path!r})', self.timeout)
+        return kernel_id
+
+    async def shutdown(self):
+        '''Stops the kernels owned by the pool'''
+        for task in list(self._starting):
+            task.cancel()
+        while self._ready:
+            await self.kernel_manager.shutdown_kernel(self._ready.popleft(), now=True)
+
+try:
+    from traitlets import Integer, Unicode
+    from jupyter_server.services.kernels.kernelmanager import AsyncMappingKernelManager
+except ImportError:
+    AsyncMappingKernelManager = None
+
+if AsyncMappingKernelManager is not None:
+
+    class PooledMappingKernelManager(AsyncMappingKernelManager):
+        '''Jupyter server kernel manager serving new kernels of the pooled kernel spec from a KernelPool'''
+
+        pool_size = Integer(2, config=True, help='Number of warm kernels kept ready')
+        pool_kernel_name = Unicode('python3', config=True, help='Kernel spec of the pooled kernels')
+        pool_startup_code = Unicode('', config=True, help='Code run once in each pooled kernel')
+
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self._pool = None
+
+        def _ensure_pool(self):
+            '''Creates and fills the pool once the server's event loop runs'''
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return None
+            if self._pool is None:
+                self._pool = KernelPool(self, self.pool_kernel_name, self.pool_size, self.pool_startup_code or None,
+                    start_kernel=lambda **kwargs: AsyncMappingKernelManager.start_kernel(self, **kwargs))
+            self._pool.fill()
+            return self._pool
+
+        async def start_kernel(self, *, kernel_id = None, path = None, **kwargs):
+            pool = self._ensure_pool()
+            kernel_name = kwargs.get('kernel_name') or self.default_kernel_name
+            # custom environments or ids can't be served from warmed kernels
+            if pool is not None and kernel_id is None and kernel_name == self.pool_kernel_name and not kwargs.get('env'):
+                pooled = await pool.take(self.cwd_for_path(path) if path is not None else None)
+                if pooled is not None:
+                    self.log.info(f'Using warm kernel {pooled} from the pool')
+                    return pooled
+            return await super().start_kernel(kernel_id=kernel_id, path=path, **kwargs)
+
+        def list_kernels(self):
+            pool = self._ensure_pool()
+            pooled = pool.kernel_ids if pool is not None else set()
+            return [kernel for kernel in super().list_kernels() if kernel['id'] not in pooled]
+
+        async def cull_kernel_if_idle(self, kernel_id):
+            # idle pooled kernels are waiting to be used
+            if self._pool is not None and kernel_id in self._pool.kernel_ids:
+                return
+            return await super().cull_kernel_if_idle(kernel_id)
+
+        async def shutdown_all(self, now = False):
+            if self._pool is not None:
+                await self._pool.shutdown()
+            return await super().shutdown_all(now=now)
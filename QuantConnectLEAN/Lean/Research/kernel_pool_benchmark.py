@@ -0,0 +1,74 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Measures the time to first cell of research kernels: from asking for a kernel until the first QuantBook
+# cell completes, for cold kernels and for kernels handed out by a KernelPool.
+#
+# Usage, from the folder holding start.py and config.json:
+#   python kernel_pool_benchmark.py --samples 5
+
+import time
+import asyncio
+import argparse
+import statistics
+from jupyter_client import AsyncMultiKernelManager
+from kernel_pool import KernelPool, execute
+
+FIRST_CELL = '''qb = QuantBook()
+spy = qb.add_equity("SPY").symbol
+history = qb.history(spy, 10, Resolution.DAILY)'''
+
+async def time_to_first_cell(kernel_manager, get_kernel, code, timeout):
+    start = time.perf_counter()
+    kernel_id = await get_kernel()
+    reply = await execute(kernel_manager, kernel_id, code, timeout)
+    elapsed = time.perf_counter() - start
+    if reply['content']['status'] != 'ok':
+        raise RuntimeError(f'First cell failed: {reply["content"].get("evalue")}')
+    await kernel_manager.shutdown_kernel(kernel_id, now=True)
+    return elapsed
+
+async def main(arguments):
+    kernel_manager = AsyncMultiKernelManager()
+    startup_code = f'%run {arguments.start}' if arguments.start else None
+
+    async def cold_kernel():
+        kernel_id = await kernel_manager.start_kernel(kernel_name=arguments.kernel)
+        if startup_code:
+            await execute(kernel_manager, kernel_id, startup_code, arguments.timeout)
+        return kernel_id
+
+    cold = [await time_to_first_cell(kernel_manager, cold_kernel, arguments.code, arguments.timeout) for _ in range(arguments.samples)]
+
+    # a kernel per sample warmed upfront, without replenishing so warm ups don't compete with the measurements
+    pool = KernelPool(kernel_manager, arguments.kernel, arguments.samples, startup_code, timeout=arguments.timeout)
+    pool.fill()
+    await pool.wait()
+    pool.size = 0
+    warm = [await time_to_first_cell(kernel_manager, pool.take, arguments.code, arguments.timeout) for _ in range(arguments.samples)]
+
+    await kernel_manager.shutdown_all(now=True)
+
+    print(f'{"kernel":<8}{"median s":>10}{"min s":>10}{"max s":>10}')
+    for name, values in [('cold', cold), ('pooled', warm)]:
+        print(f'{name:<8}{statistics.median(values):>10.2f}{min(values):>10.2f}{max(values):>10.2f}')
+    print(f'time to first cell {statistics.median(cold) / statistics.median(warm):.1f}x faster with the pool')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time to first cell of cold and pooled research kernels')
+    parser.add_argument('--samples', type=int, default=5)
+    parser.add_argument('--kernel', default='python3', help='kernel spec name')
+    parser.add_argument('--start', default=None, help='path of start.py when it is not an IPython profile startup file')
+    parser.add_argument('--code', default=FIRST_CELL, help='first cell to run')
+    parser.add_argument('--timeout', type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,57 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Cold startup benchmark of AlgorithmImports: every sample imports it in a fresh interpreter, in the default
+(eager) mode and with LEAN_LAZY_IMPORTS, then uses the names a typical algorithm needs.
+
+Run it with the Python environment Lean uses, from the build output folder holding AlgorithmImports.py and
+the QuantConnect Dlls (or pass that folder as first argument):
+    python Python/AlgorithmImportsStartupBenchmark.py [folder] [samples]
+'''
+
+import os
+import sys
+import statistics
+import subprocess
+
+folder = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+samples = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+scenarios = {
+    "eager star import": ("", "from AlgorithmImports import *\n"
+                              "names = [QCAlgorithm, Resolution, Symbol, OrderStatus, np, pd]"),
+    "lazy named import": ("1", "from AlgorithmImports import QCAlgorithm, Resolution, Symbol, OrderStatus, np, pd"),
+    "lazy module access": ("1", "import AlgorithmImports as ai\n"
+                                "names = [ai.QCAlgorithm, ai.Resolution, ai.Symbol, ai.OrderStatus, ai.np, ai.pd]"),
+}
+
+# the first statement starts the clock, interpreter startup itself is the same for every scenario
+template = "import time\nstart = time.perf_counter()\n{code}\nprint(time.perf_counter() - start)"
+
+def run(lazy, code):
+    environment = dict(os.environ, LEAN_LAZY_IMPORTS=lazy)
+    output = subprocess.run([sys.executable, "-c", template.format(code=code)], cwd=folder, env=environment,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+results = {}
+for name, (lazy, code) in scenarios.items():
+    run(lazy, code)  # warm the OS file cache
+    results[name] = [run(lazy, code) for _ in range(samples)]
+
+baseline = statistics.median(results["eager star import"])
+print(f'{"scenario":<24}{"median s":>10}{"min s":>10}{"max s":>10}{"speedup":>10}')
+for name, values in results.items():
+    median = statistics.median(values)
+    print(f'{name:<24}{median:>10.3f}{min(values):>10.3f}{max(values):>10.3f}{baseline / median:>9.2f}x')
@@ -0,0 +1,66 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Micro-benchmark of indexing throughput of Lean DataFrames through PandasMapper, with the key mapping
+cache disabled (previous behavior, every lookup goes through SymbolCache) and enabled.
+
+Run it like PandasMapperTests.py, loading the QuantConnect Dlls with the code documented there.
+'''
+
+from clr import AddReference
+AddReference("QuantConnect.Common")
+AddReference("QuantConnect.Tests")
+
+from QuantConnect import *
+from QuantConnect.Python import PandasConverter
+from QuantConnect.Tests import Symbols
+from QuantConnect.Tests.Python import PythonTestingUtils
+
+import PandasMapper
+import pandas as pd
+from timeit import repeat
+
+spy = Symbols.SPY
+aapl = Symbols.AAPL
+SymbolCache.Set("SPY", spy)
+SymbolCache.Set("AAPL", aapl)
+
+pdConverter = PandasConverter()
+df = pd.concat([pdConverter.GetDataFrame(PythonTestingUtils.GetSlices(spy)),
+                pdConverter.GetDataFrame(PythonTestingUtils.GetSlices(aapl))])
+close = df['close'].unstack(level=0)
+last = close.index[-1]
+
+workloads = {
+    "df.loc[ticker]": lambda: df.loc["SPY"],
+    "df.loc[Symbol]": lambda: df.loc[spy],
+    "df.at[(ticker, time)]": lambda: close.at[last, "SPY"],
+    "Series[ticker]": lambda: close.iloc[-1]["AAPL"],
+    "df[column]": lambda: df["close"],
+    "ticker in index": lambda: "SPY" in close.columns,
+    "missing in index": lambda: "XYZ" in close.columns,
+}
+
+def run(number):
+    return { name: number / min(repeat(workload, number=number, repeat=5)) for name, workload in workloads.items() }
+
+number = 2000
+PandasMapper.set_cache_size(0)
+uncached = run(number)
+PandasMapper.set_cache_size(4096)
+cached = run(number)
+
+print(f'{"workload":<24}{"uncached ops/s":>16}{"cached ops/s":>16}{"speedup":>10}')
+for name in workloads:
+    print(f'{name:<24}{uncached[name]:>16.0f}{cached[name]:>16.0f}{cached[name] / uncached[name]:>9.2f}x')
@@ -0,0 +1,60 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Measures the overhead PandasMapper adds to common pandas workloads on plain (non Lean) DataFrames.
+Every workload is timed with the unpatched pandas functions first, then again after importing PandasMapper.
+
+Run it like PandasMapperTests.py, loading the QuantConnect Dlls with the code documented there.
+'''
+
+import numpy as np
+import pandas as pd
+from timeit import repeat
+
+dates = pd.date_range('2020-01-01', periods=10000, freq='min')
+datetime_frame = pd.DataFrame(np.random.rand(10000, 4), index=dates, columns=['open', 'high', 'low', 'close'])
+integer_frame = pd.DataFrame(np.random.rand(10000, 4), columns=[0, 1, 2, 3])
+string_frame = pd.DataFrame(np.random.rand(500, 4), index=[f'key{i}' for i in range(500)], columns=['a', 'b', 'c', 'd'])
+timestamp = dates[5000]
+
+workloads = {
+    "datetime df.loc[timestamp]": lambda: datetime_frame.loc[timestamp],
+    "datetime df.loc[slice]": lambda: datetime_frame.loc[dates[100]:dates[200]],
+    "datetime df.at[timestamp, column]": lambda: datetime_frame.at[timestamp, 'close'],
+    "datetime df[column]": lambda: datetime_frame['close'],
+    "datetime timestamp in index": lambda: timestamp in datetime_frame.index,
+    "integer df.loc[int]": lambda: integer_frame.loc[5000],
+    "integer df[int]": lambda: integer_frame[2],
+    "integer df.iloc[int]": lambda: integer_frame.iloc[5000],
+    "integer rolling mean": lambda: integer_frame[0].rolling(20).mean(),
+    "string df.loc[key]": lambda: string_frame.loc['key250'],
+    "string key in index": lambda: 'key250' in string_frame.index,
+}
+
+def run(number):
+    # in microseconds per call
+    return { name: min(repeat(workload, number=number, repeat=5)) / number * 1e6 for name, workload in workloads.items() }
+
+number = 2000
+baseline = run(number)
+
+from clr import AddReference
+AddReference("QuantConnect.Common")
+import PandasMapper
+
+patched = run(number)
+
+print(f'{"workload":<36}{"pandas us":>12}{"mapper us":>12}{"overhead":>10}')
+for name in workloads:
+    print(f'{name:<36}{baseline[name]:>12.2f}{patched[name]:>12.2f}{patched[name] / baseline[name] - 1:>9.1%}')
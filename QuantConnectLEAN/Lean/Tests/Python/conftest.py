@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the tests import the framework models and the Common modules the way algorithms do
+LEAN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+for folder in ('Algorithm.Framework', 'Common'):
+    sys.path.insert(0, os.path.normpath(os.path.join(LEAN, folder)))
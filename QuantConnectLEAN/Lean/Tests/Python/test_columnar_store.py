@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from ColumnarStore import ColumnarStore, exponential_moving_average, from_bytes, to_bytes
+
+
+class DictObjectStore:
+    def __init__(self):
+        self.values = {}
+
+    def contains_key(self, key):
+        return key in self.values
+
+    def save_bytes(self, key, data):
+        self.values[key] = bytes(data)
+        return True
+
+    def read_bytes(self, key):
+        return self.values[key]
+
+
+class TestColumnarStore(unittest.TestCase):
+    def test_round_trip(self):
+        columns = {
+            'time': np.arange('2013-10-01', '2013-10-11', dtype='datetime64[D]').astype('datetime64[us]'),
+            'close': np.linspace(140, 150, 10),
+            'volume': np.arange(10, dtype=np.int32),
+            'matrix': np.arange(12, dtype=np.float32).reshape(3, 4),
+            'ticker': np.array(['spy', 'aapl']),
+        }
+        result, schema, metadata = from_bytes(to_bytes(columns, 3, {'symbols': ['SPY']}))
+        self.assertEqual(schema, 3)
+        self.assertEqual(metadata, {'symbols': ['SPY']})
+        self.assertEqual(list(result), list(columns))
+        for name, column in columns.items():
+            self.assertEqual(result[name].dtype, column.dtype)
+            np.testing.assert_array_equal(result[name], column)
+
+    def test_object_columns_are_rejected(self):
+        with self.assertRaises(ValueError):
+            to_bytes({'symbols': np.array([object()])})
+
+    def test_store_schema(self):
+        store = ColumnarStore(DictObjectStore())
+        self.assertIsNone(store.load('close'))
+        store.save('close', {'close': np.ones(5)}, schema=1)
+        np.testing.assert_array_equal(store.load('close', schema=1)['close'], np.ones(5))
+        # another schema version or a blob of another kind is ignored
+        self.assertIsNone(store.load('close', schema=2))
+        store.object_store.save_bytes('text', b'2013-10-07,145.0')
+        self.assertIsNone(store.load('text'))
+
+    def test_exponential_moving_average(self):
+        values = np.random.default_rng(5).normal(size=(120, 3)).cumsum(axis=0)
+        for period in (1, 10, 50):
+            expected = values[:period].mean(axis=0)
+            k = 2 / (period + 1)
+            for row in values[period:]:
+                expected = row * k + expected * (1 - k)
+            np.testing.assert_allclose(exponential_moving_average(values, period), expected, atol=1e-10)
+        np.testing.assert_array_equal(exponential_moving_average(values[:5], 10), np.zeros(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from Selection.EmaStateStore import EmaStateStore
+from Selection.Ranking import top_indices
+
+
+def lean_ema(values, period):
+    """Values of Lean's ExponentialMovingAverage after each update"""
+    result = []
+    current = 0.0
+    k = 2 / (period + 1)
+    for samples, value in enumerate(values, 1):
+        if samples == period:
+            current = sum(values[:period]) / period
+        elif samples > period:
+            current = value * k + current * (1 - k)
+        result.append(current)
+    return result
+
+
+class TestEmaStateStore(unittest.TestCase):
+    def test_matches_indicator(self):
+        rng = np.random.default_rng(11)
+        prices = 100 + rng.normal(size=(40, 6)).cumsum(axis=0)
+        # symbols missing on some days are not updated
+        present = rng.random(size=prices.shape) < 0.8
+        store = EmaStateStore((3, 7), capacity=2)
+        symbols = [f'S{i}' for i in range(6)]
+        for day in range(len(prices)):
+            columns = np.flatnonzero(present[day])
+            rows = store.rows([symbols[i] for i in columns])
+            ready = store.update(rows, prices[day, columns])
+            np.testing.assert_array_equal(ready, store.samples(rows) >= 7)
+
+        self.assertEqual(len(store), 6)
+        rows = store.rows(symbols)
+        for i in range(6):
+            values = prices[present[:, i], i].tolist()
+            for period_index, period in enumerate(store.periods):
+                self.assertAlmostEqual(store.current(period_index, rows[i]), lean_ema(values, period)[-1], places=10)
+
+    def test_top_indices(self):
+        values = np.array([3.0, 1.0, 5.0, 3.0, 5.0, 2.0, 3.0])
+        for count in range(0, 9):
+            expected = sorted(range(len(values)), key=lambda i: values[i], reverse=True)[:count]
+            self.assertEqual(top_indices(values, count).tolist(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from Risk.RiskStateEngine import HoldingsListener, RiskStateEngine
+
+
+class Event:
+    def __init__(self):
+        self.handlers = []
+
+    def __iadd__(self, handler):
+        self.handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        self.handlers.remove(handler)
+        return self
+
+
+class Holdings:
+    def __init__(self, security):
+        self.security = security
+        self.quantity = 0
+        self.average_price = 0
+        self.quantity_changed = Event()
+
+    def set_holdings(self, average_price, quantity):
+        self.average_price, self.quantity = average_price, quantity
+        for handler in self.quantity_changed.handlers:
+            handler(self, SimpleNamespace(security=self.security))
+
+    @property
+    def absolute_holdings_cost(self):
+        return abs(self.quantity) * self.average_price
+
+    @property
+    def absolute_holdings_value(self):
+        return abs(self.quantity) * self.security.price
+
+
+class Security:
+    def __init__(self, symbol, price):
+        self.symbol = symbol
+        self.price = price
+        self.holdings = Holdings(self)
+
+    @property
+    def invested(self):
+        return self.holdings.quantity != 0
+
+
+class Algorithm:
+    def __init__(self, securities):
+        self.securities = [SimpleNamespace(key=x.symbol, value=x) for x in securities]
+
+
+def make_algorithm(securities):
+    return Algorithm(securities)
+
+
+class TestRiskStateEngine(unittest.TestCase):
+    def test_tracks_holdings_changes(self):
+        securities = [Security(f'S{i}', 10.0) for i in range(5)]
+        securities[1].holdings.set_holdings(10.0, 3)
+        algorithm = make_algorithm(securities)
+        engine = RiskStateEngine(capacity=1)
+
+        # held before the first call
+        invested, quantities, values = engine.update(algorithm, 'absolute_holdings_value')
+        self.assertEqual([x.symbol for x in engine.securities], ['S1'])
+        np.testing.assert_array_equal(values[0], [30.0])
+
+        added = Security('S5', 20.0)
+        engine.on_securities_changed(algorithm, SimpleNamespace(added_securities=[added], removed_securities=[]))
+        added.holdings.set_holdings(20.0, -2)
+        securities[3].holdings.set_holdings(10.0, 1)
+        securities[1].holdings.set_holdings(10.0, 0)
+        invested, quantities, values = engine.update(algorithm, 'absolute_holdings_value')
+        self.assertEqual(sorted(x.symbol for x in engine.securities), ['S3', 'S5'])
+        self.assertEqual(len(engine), 2)
+        self.assertTrue(invested.all())
+
+    def test_engines_share_one_handler(self):
+        securities = [Security(f'S{i}', 10.0) for i in range(3)]
+        algorithm = make_algorithm(securities)
+        first, second = RiskStateEngine(), RiskStateEngine()
+        first.update(algorithm, 'absolute_holdings_value')
+        second.update(algorithm, 'absolute_holdings_value')
+        self.assertTrue(all(len(x.holdings.quantity_changed.handlers) == 1 for x in securities))
+
+        securities[0].holdings.set_holdings(10.0, 1)
+        self.assertEqual([x.symbol for x in first.securities + second.securities], [])
+        first.update(algorithm, 'absolute_holdings_value')
+        second.update(algorithm, 'absolute_holdings_value')
+        self.assertEqual([x.symbol for x in first.securities + second.securities], ['S0', 'S0'])
+
+        # removed securities are no longer listened to
+        changes = SimpleNamespace(added_securities=[], removed_securities=securities[1:])
+        first.on_securities_changed(algorithm, changes)
+        second.on_securities_changed(algorithm, changes)
+        self.assertEqual([len(x.holdings.quantity_changed.handlers) for x in securities], [1, 0, 0])
+        self.assertEqual(list(HoldingsListener.of(algorithm).securities), ['S0'])
+
+    def test_replaced_engine_stops_receiving_changes(self):
+        securities = [Security(f'S{i}', 10.0) for i in range(2)]
+        algorithm = make_algorithm(securities)
+        first, second = RiskStateEngine(), RiskStateEngine()
+        first.update(algorithm, 'absolute_holdings_value')
+        second.update(algorithm, 'absolute_holdings_value')
+        listener = HoldingsListener.of(algorithm)
+
+        listener.unregister(second)
+        del first
+        self.assertEqual(len(listener.engines), 0)
+        securities[0].holdings.set_holdings(10.0, 1)
+        self.assertEqual(len(second._changed), 0)
+
+    def test_trailing_drawdowns(self):
+        long, short = Security('L', 100.0), Security('S', 50.0)
+        long.holdings.set_holdings(100.0, 1)
+        short.holdings.set_holdings(50.0, -1)
+        algorithm = make_algorithm([long, short])
+        engine = RiskStateEngine()
+
+        drawdowns = []
+        for long.price, short.price in [(100.0, 50.0), (110.0, 45.0), (104.5, 47.25), (99.0, 50.0)]:
+            invested, quantities, values = engine.update(algorithm, 'absolute_holdings_value')
+            drawdowns.append(engine.trailing_drawdowns(invested, quantities, values[0]).tolist())
+        rows = {security.symbol: row for row, security in enumerate(engine.securities)}
+        np.testing.assert_allclose([[d[rows['L']], d[rows['S']]] for d in drawdowns],
+                                   [[0, 0], [0, 0], [0.05, 0.05], [0.1, 50 / 45 - 1]])
+
+        # a dropped mark trails from the holdings cost again
+        engine.reset_marks([rows['L']])
+        invested, quantities, values = engine.update(algorithm, 'absolute_holdings_value')
+        self.assertAlmostEqual(engine.trailing_drawdowns(invested, quantities, values[0])[rows['L']], 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Alphas.RollingCorrelation import RollingCorrelation
+
+LABELS = list('abcdef')
+
+
+def make_returns(count):
+    rng = np.random.default_rng(7)
+    returns = rng.normal(size=(count, len(LABELS)))
+    # ties, which kendall tau-b accounts for
+    returns[:, 2] = np.round(returns[:, 2])
+    returns[:, 4] = 0.5 * returns[:, 3] + 0.1 * rng.normal(size=count)
+    return returns
+
+
+class TestRollingCorrelation(unittest.TestCase):
+    def test_matches_dataframe_corr(self):
+        returns = make_returns(80)
+        for method in RollingCorrelation.METHODS:
+            correlation = RollingCorrelation(25, LABELS, method)
+            for t, row in enumerate(returns):
+                correlation.update(row)
+                # while filling, full and wrapped around several times
+                if t in (5, 24, 40, 79):
+                    expected = pd.DataFrame(returns[max(0, t - 24):t + 1]).corr(method=method).values
+                    np.testing.assert_allclose(correlation.correlation(), expected, atol=1e-12, err_msg=f'{method} {t}')
+            self.assertTrue(correlation.is_ready)
+            self.assertEqual(correlation.samples, 25)
+
+    def test_max_pair(self):
+        correlation = RollingCorrelation(50, LABELS)
+        correlation.update_many(make_returns(50))
+        self.assertEqual(correlation.max_pair()[:2], ('d', 'e'))
+        row, column, value = correlation.max_pair(['a', 'b'], ['c', 'd', 'e', 'f'])
+        self.assertIn(row, ['a', 'b'])
+        self.assertAlmostEqual(value, correlation.get(row, column))
+        self.assertEqual(value, correlation.correlation()[np.ix_([0, 1], [2, 3, 4, 5])].max())
+
+    def test_constant_series(self):
+        correlation = RollingCorrelation(10, ['a', 'b'], 'kendall')
+        correlation.update_many(np.column_stack([np.arange(10.0), np.ones(10)]))
+        self.assertTrue(np.isnan(correlation.get('a', 'b')))
+        self.assertIsNone(correlation.max_pair())
+
+    def test_unsupported_method(self):
+        with self.assertRaises(ValueError):
+            RollingCorrelation(10, LABELS, 'spearman')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from RollingFrame import RollingFrame
+
+START = datetime(2020, 1, 2, 9, 31)
+
+
+class TestRollingFrame(unittest.TestCase):
+    def test_matches_concat(self):
+        frame = RollingFrame(4, ['close', 'volume'])
+        expected = pd.DataFrame()
+        for i in range(11):
+            time = START + timedelta(minutes=i)
+            frame.append([i, 10 * i], time)
+            expected = pd.concat([expected, pd.DataFrame({'close': [float(i)], 'volume': [10.0 * i]}, index=[time])]).iloc[-4:]
+            np.testing.assert_array_equal(frame['close'], expected['close'].values)
+            pd.testing.assert_frame_equal(frame.to_pandas(), expected, check_index_type=False, check_freq=False)
+        self.assertTrue(frame.is_ready)
+        self.assertEqual(len(frame), 4)
+
+    def test_views_are_contiguous_and_read_only(self):
+        frame = RollingFrame(3, ['close'])
+        for i in range(5):
+            frame.append([i])
+            view = frame['close']
+            self.assertTrue(view.flags['C_CONTIGUOUS'])
+            self.assertFalse(view.flags['WRITEABLE'])
+        with self.assertRaises(ValueError):
+            frame['close'][0] = 1
+        np.testing.assert_array_equal(frame.values, [[2], [3], [4]])
+
+    def test_set_columns(self):
+        frame = RollingFrame(3, ['close', 'sma'])
+        for i in range(4):
+            frame.append({'close': i})
+        self.assertTrue(np.isnan(frame['sma']).all())
+        frame['sma'] = [1, 2, 3]
+        frame.append({'close': 4})
+        frame.set_last('sma', 4)
+        np.testing.assert_array_equal(frame['sma'], [2, 3, 4])
+        self.assertEqual(frame.last('close'), 4)
+
+    def test_empty(self):
+        frame = RollingFrame(2, ['close'])
+        self.assertEqual(len(frame['close']), 0)
+        with self.assertRaises(IndexError):
+            frame.last('close')
+        with self.assertRaises(ValueError):
+            RollingFrame(0, ['close'])
+
+
+if __name__ == '__main__':
+    unittest.main()
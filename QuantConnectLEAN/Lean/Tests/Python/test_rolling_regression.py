@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+
+from Alphas.RollingRegression import RollingRegression
+
+LABELS = list('abcde')
+
+
+def make_prices(count):
+    rng = np.random.default_rng(3)
+    return 100 + rng.normal(size=(count, len(LABELS))).cumsum(axis=0)
+
+
+class TestRollingRegression(unittest.TestCase):
+    def test_matches_polyfit(self):
+        prices = make_prices(100)
+        for offset in (0, 1):
+            regression = RollingRegression(30, LABELS, offset)
+            for t, row in enumerate(prices):
+                regression.update(row)
+                if t in (1, 12, 29, 47, 99):
+                    window = prices[max(0, t - 29):t + 1]
+                    slopes, intercepts = np.polyfit(np.arange(len(window)) + offset, window, 1)
+                    np.testing.assert_allclose(regression.slopes, slopes, atol=1e-10, err_msg=f'{offset} {t}')
+                    np.testing.assert_allclose(regression.intercepts, intercepts, atol=1e-8, err_msg=f'{offset} {t}')
+            self.assertTrue(regression.is_ready)
+            self.assertEqual(regression.samples, 30)
+
+    def test_get_and_reset(self):
+        regression = RollingRegression(10, LABELS)
+        self.assertTrue(np.isnan(regression.slopes).all())
+        # a line per series
+        regression.update_many(np.arange(20)[:, None] * np.arange(1, 6) + 7.0)
+        slope, intercept = regression.get('c')
+        self.assertAlmostEqual(slope, 3)
+        self.assertAlmostEqual(intercept, 7 + 3 * 10)
+        regression.reset()
+        self.assertEqual(regression.samples, 0)
+        self.assertFalse(regression.is_ready)
+
+
+if __name__ == '__main__':
+    unittest.main()
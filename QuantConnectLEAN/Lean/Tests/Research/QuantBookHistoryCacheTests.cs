@@ -0,0 +1,143 @@
+/*
+ * QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+ * Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+*/
+
+using System;
+using System.IO;
+using NUnit.Framework;
+using Python.Runtime;
+using QuantConnect.Logging;
+using QuantConnect.Securities;
+
+namespace QuantConnect.Tests.Research
+{
+    [TestFixture]
+    public class QuantBookHistoryCacheTests
+    {
+        private ILogHandler _logHandler;
+        private string _folder;
+        dynamic _module;
+
+        [OneTimeSetUp]
+        public void Setup()
+        {
+            // Store initial handler
+            _logHandler = Log.LogHandler;
+
+            SymbolCache.Clear();
+            MarketHoursDatabase.Reset();
+
+            using (Py.GIL())
+            {
+                _module = Py.Import("Test_QuantBookHistoryCache");
+            }
+        }
+
+        [SetUp]
+        public void CreateFolder()
+        {
+            _folder = Path.Combine(Path.GetTempPath(), Guid.NewGuid().ToString());
+        }
+
+        [TearDown]
+        public void DeleteFolder()
+        {
+            if (Directory.Exists(_folder))
+            {
+                Directory.Delete(_folder, true);
+            }
+        }
+
+        [OneTimeTearDown]
+        public void OneTimeTearDown()
+        {
+            // Reset to initial handler
+            Log.LogHandler = _logHandler;
+        }
+
+        [TestCase(2013, 10, 11, SecurityType.Equity, "SPY")]
+        [TestCase(2014, 5, 9, SecurityType.Forex, "EURUSD")]
+        public void RepeatedRequestIsServedFromMemory(int year, int month, int day, SecurityType securityType, string symbol)
+        {
+            using (Py.GIL())
+            {
+                var test = _module.HistoryCacheTest(new DateTime(year, month, day), securityType, symbol, _folder);
+                Assert.IsTrue((bool)test.test_memory_hit(10));
+            }
+        }
+
+        [TestCase(2013, 10, 11, SecurityType.Equity, "SPY")]
+        [TestCase(2014, 5, 9, SecurityType.Forex, "EURUSD")]
+        public void SpilledRequestIsServedFromDisk(int year, int month, int day, SecurityType securityType, string symbol)
+        {
+            using (Py.GIL())
+            {
+                var end = new DateTime(year, month, day);
+                var test = _module.HistoryCacheTest(end, securityType, symbol, _folder);
+                Assert.IsTrue((bool)test.test_disk_hit(end.AddDays(-30), end));
+            }
+        }
+
+        [Test]
+        public void DifferentResolutionOrNormalizationAreDifferentEntries()
+        {
+            using (Py.GIL())
+            {
+                var test = _module.HistoryCacheTest(new DateTime(2013, 10, 11), SecurityType.Equity, "SPY", _folder);
+                Assert.AreEqual(3, (int)test.test_distinct_requests(10));
+            }
+        }
+
+        [Test]
+        public void SubscriptionNormalizationChangeIsADifferentEntry()
+        {
+            using (Py.GIL())
+            {
+                var test = _module.HistoryCacheTest(new DateTime(2013, 10, 11), SecurityType.Equity, "SPY", _folder);
+                Assert.AreEqual(2, (int)test.test_subscription_change(10));
+            }
+        }
+
+        [Test]
+        public void AllSecuritiesRequestIncludesTheSecurities()
+        {
+            using (Py.GIL())
+            {
+                var test = _module.HistoryCacheTest(new DateTime(2013, 10, 11), SecurityType.Equity, "SPY", _folder);
+                Assert.AreEqual(2, (int)test.test_all_securities_request(10, "AAPL"));
+            }
+        }
+
+        [Test]
+        public void SpilledSymbolsKeepTheirValue()
+        {
+            using (Py.GIL())
+            {
+                var end = new DateTime(2013, 10, 11);
+                var test = _module.HistoryCacheTest(end, SecurityType.Equity, "SPY", _folder);
+                Assert.IsTrue((bool)test.test_disk_hit_symbol_value(end.AddDays(-30), end));
+            }
+        }
+
+        [Test]
+        public void TickersAreCaseInsensitive()
+        {
+            using (Py.GIL())
+            {
+                var test = _module.HistoryCacheTest(new DateTime(2013, 10, 11), SecurityType.Equity, "SPY", _folder);
+                Assert.AreEqual(1, (int)test.test_ticker_case(10));
+            }
+        }
+    }
+}
@@ -0,0 +1,70 @@
+# QUANTCONNECT.COM - Democratizing Finance, Empowering Individuals.
+# Lean Algorithmic Trading Engine v2.0. Copyright 2014 QuantConnect Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from AlgorithmImports import *
+
+from history_cache import HistoryCache
+
+class HistoryCacheTest():
+    def __init__(self, start_date, security_type, symbol, folder):
+        self.qb = QuantBook()
+        self.qb.set_start_date(start_date)
+        self.symbol = self.qb.add_security(security_type, symbol).symbol
+        self.folder = folder
+        self.cache = HistoryCache(self.qb, folder)
+
+    def test_memory_hit(self, period):
+        first = self.cache.history([self.symbol], period, Resolution.DAILY)
+        second = self.cache.history([self.symbol], period, Resolution.DAILY)
+        return first.equals(second) and self.cache.memory_hits == 1
+
+    def test_disk_hit(self, start, end):
+        first = self.cache.history([self.symbol], start, end, Resolution.DAILY)
+        # a new cache over the same folder, like a later session
+        cache = HistoryCache(self.qb, self.folder)
+        second = cache.history([self.symbol], start, end, Resolution.DAILY)
+        # the symbol level holds Symbol objects again
+        return first.equals(second) and cache.disk_hits == 1 and second.loc[self.symbol].shape == first.loc[self.symbol].shape
+
+    def test_distinct_requests(self, period):
+        self.cache.history([self.symbol], period, Resolution.DAILY)
+        self.cache.history([self.symbol], period, Resolution.HOUR)
+        self.cache.history([self.symbol], period, Resolution.DAILY, data_normalization_mode=DataNormalizationMode.RAW)
+        return self.cache.misses
+
+    def test_subscription_change(self, period):
+        self.cache.history([self.symbol], period, Resolution.DAILY)
+        # the request leaves the normalization to the subscription
+        self.qb.securities[self.symbol].set_data_normalization_mode(DataNormalizationMode.RAW)
+        self.cache.history([self.symbol], period, Resolution.DAILY)
+        return self.cache.misses
+
+    def test_ticker_case(self, period):
+        self.cache.history([self.symbol.value.lower()], period, Resolution.DAILY)
+        self.cache.history([self.symbol.value.upper()], period, Resolution.DAILY)
+        return self.cache.memory_hits
+
+    def test_all_securities_request(self, period, ticker):
+        self.cache.history(period, Resolution.DAILY)
+        # same request and time, one more security
+        self.qb.add_equity(ticker)
+        self.cache.history(period, Resolution.DAILY)
+        return self.cache.misses
+
+    def test_disk_hit_symbol_value(self, start, end):
+        first = self.cache.history([self.symbol], start, end, Resolution.DAILY)
+        cache = HistoryCache(self.qb, self.folder)
+        # a new session, the Symbols are rebuilt from the spill
+        cache._symbols.clear()
+        second = cache.history([self.symbol], start, end, Resolution.DAILY)
+        return [symbol.value for symbol in second.index.levels[0]] == [symbol.value for symbol in first.index.levels[0]]
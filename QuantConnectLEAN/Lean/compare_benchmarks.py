@@ -1,28 +1,198 @@
 import sys
 import json
+import math
+import random
+import itertools
+import argparse
+import statistics
 
-print(f'Will compare benchmark results {sys.argv[2]} against reference {sys.argv[1]}')
+def parseArguments():
+	parser = argparse.ArgumentParser(description="Compares benchmark results produced by run_benchmarks.py against a reference")
+	parser.add_argument("reference", help="reference benchmark results json")
+	parser.add_argument("new", help="new benchmark results json")
+	parser.add_argument("--threshold", type=float, default=0.10, help="default relative change tolerated before a significant difference fails")
+	parser.add_argument("--thresholds", default=None, help="json file with per benchmark thresholds, e.g. {\"Python/HistoryRequestBenchmark\": {\"dps\": 0.1, \"length\": 0.2, \"wall-time\": 0.2}}")
+	parser.add_argument("--alpha", type=float, default=0.05, help="significance level of the Mann-Whitney test")
+	parser.add_argument("--bootstrap", type=int, default=2000, help="bootstrap resamples used for the confidence intervals")
+	parser.add_argument("--markdown", default=None, help="write the summary table as markdown to this file")
+	parser.add_argument("--json", default=None, help="write the summary as json to this file")
+	return parser.parse_args()
 
-referenceBenchmark = json.load(open(sys.argv[1]))
-newBenchmark = json.load(open(sys.argv[2]))
+# largest number of rank assignments enumerated for the exact test, above it the normal approximation is used
+EXACT_LIMIT = 20000
 
-failed = False
-for language in ["CSharp", "Python"]:
+def minimumPValue(n1, n2):
+	'''Smallest two sided p-value the Mann-Whitney test can reach with these sample counts'''
+	return min(1.0, 2 / math.comb(n1 + n2, n1))
 
-	for key, value in referenceBenchmark[language].items():
-		if key not in newBenchmark[language]:
-			failed = True
-			print(f'Performance benchmark {key} language {language} was not found in new results')
-			continue
-		newResult = newBenchmark[language][key]
+def mannWhitneyU(reference, new):
+	'''Two sided Mann-Whitney U test. Small samples use the exact distribution of the rank sum over all the
+	assignments of the ranks, ties included, larger ones the normal approximation with tie correction.
+	Returns the p-value, 1 when there are not enough samples to tell the distributions apart'''
+	n1, n2 = len(reference), len(new)
+	if n1 < 2 or n2 < 2:
+		return 1.0
 
-		# allow 5% noise
-		expectedValue = value["average-dps"] * 0.90
-		if expectedValue > newResult["average-dps"]:
-			failed = True
-			print(f'Performance benchmark Failed for algorithm {key} language {language}. Was {str(newResult["average-dps"])} expected as low as {str(expectedValue)}')
-		else:
-			print(f'Performance benchmark Passed for algorithm {key} language {language}. Was {str(newResult["average-dps"])} expected as low as {str(expectedValue)}')
+	combined = sorted([(value, 0) for value in reference] + [(value, 1) for value in new])
+	ranks = [0.0] * len(combined)
+	tieCorrection = 0.0
+	i = 0
+	while i < len(combined):
+		j = i
+		while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+			j += 1
+		# average rank for ties, ranks are 1 based
+		for k in range(i, j + 1):
+			ranks[k] = (i + j) / 2 + 1
+		ties = j - i + 1
+		tieCorrection += ties ** 3 - ties
+		i = j + 1
 
-if failed:
-	exit(1)
+	rankSum = sum(rank for rank, (value, group) in zip(ranks, combined) if group == 0)
+	u = rankSum - n1 * (n1 + 1) / 2
+	mean = n1 * n2 / 2
+	n = n1 + n2
+	if math.comb(n, n1) <= EXACT_LIMIT:
+		# rank sums as far or farther from the mean than the observed one, rounding guards the half ranks
+		expected = n1 * (n + 1) / 2
+		distance = round(abs(rankSum - expected), 6)
+		extreme = sum(1 for ranksOfReference in itertools.combinations(ranks, n1) if round(abs(sum(ranksOfReference) - expected), 6) >= distance)
+		return min(1.0, extreme / math.comb(n, n1))
+	variance = n1 * n2 / 12 * ((n + 1) - tieCorrection / (n * (n - 1)))
+	if variance <= 0:
+		return 1.0
+	z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+	return min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+def bootstrapRelativeChange(reference, new, resamples, confidence=0.95, seed=0):
+	'''Bootstrap confidence interval of the relative change of the median from reference to new'''
+	generator = random.Random(seed)
+	changes = []
+	for _ in range(resamples):
+		referenceMedian = statistics.median(generator.choices(reference, k=len(reference)))
+		newMedian = statistics.median(generator.choices(new, k=len(new)))
+		if referenceMedian != 0:
+			changes.append(newMedian / referenceMedian - 1)
+	if not changes:
+		return None, None
+	changes.sort()
+	tail = (1 - confidence) / 2
+	return changes[int(tail * (len(changes) - 1))], changes[int((1 - tail) * (len(changes) - 1))]
+
+def getSamples(result, samplesKey, averageKey = None):
+	'''Per run samples when available, falling back to the single average stored by older results'''
+	samples = [sample for sample in result.get(samplesKey) or [] if sample is not None]
+	if samples:
+		return samples
+	average = result.get(averageKey) if averageKey else None
+	return [average] if average is not None else []
+
+def compareMetric(reference, new, threshold, higherIsBetter, arguments):
+	'''Compares two samples of a metric. A regression requires the change to be worse than the threshold and,
+	when there are enough samples, to be statistically significant'''
+	if not reference or not new:
+		return None
+
+	referenceMedian = statistics.median(reference)
+	newMedian = statistics.median(new)
+	change = newMedian / referenceMedian - 1 if referenceMedian else 0
+	pValue = mannWhitneyU(reference, new)
+	lower, upper = bootstrapRelativeChange(reference, new, arguments.bootstrap) if len(reference) > 1 and len(new) > 1 else (None, None)
+
+	worse = -change if higherIsBetter else change
+	# with a single sample per side there is no variance to test against, and too few samples can't reach the
+	# significance level, just use the threshold
+	testable = len(reference) > 1 and len(new) > 1 and minimumPValue(len(reference), len(new)) < arguments.alpha
+	significant = pValue < arguments.alpha if testable else True
+	return {
+		"reference": referenceMedian,
+		"new": newMedian,
+		"change": change,
+		"ci-lower": lower,
+		"ci-upper": upper,
+		"p-value": pValue,
+		"threshold": threshold,
+		"tested": testable,
+		"regression": significant and worse > threshold
+	}
+
+def formatChange(metric):
+	if metric is None:
+		return "n/a"
+	text = f'{metric["change"] * 100:+.1f}%'
+	if metric["ci-lower"] is not None:
+		text += f' [{metric["ci-lower"] * 100:+.1f}%, {metric["ci-upper"] * 100:+.1f}%]'
+	return text
+
+# compared metrics: (name, samples key, average key of older results, higher is better, column title, value format)
+METRICS = [("dps", "samples", "average-dps", True, "DPS", "{:.0f}k"),
+	("length", "length-samples", "average-length", False, "Length", "{:.2f}s"),
+	("wall-time", "wall-time-samples", None, False, "Wall time", "{:.2f}s")]
+
+def toMarkdown(rows):
+	header = "| Language | Benchmark | "
+	for name, samplesKey, averageKey, higherIsBetter, title, valueFormat in METRICS:
+		header += f"{title} ref | {title} new | {title} change (95% CI) | {title} p | "
+	lines = [header + "Status |", "|---|---|" + "---|---|---|---|" * len(METRICS) + "---|"]
+	for row in rows:
+		cells = [row["language"], row["benchmark"]]
+		for name, samplesKey, averageKey, higherIsBetter, title, valueFormat in METRICS:
+			metric = row.get(name)
+			cells += [valueFormat.format(metric["reference"]) if metric else "n/a", valueFormat.format(metric["new"]) if metric else "n/a",
+				formatChange(metric), f'{metric["p-value"]:.3f}' if metric else "n/a"]
+		lines.append("| " + " | ".join(cells + [row["status"]]) + " |")
+	return "\n".join(lines)
+
+def main():
+	arguments = parseArguments()
+	print(f'Will compare benchmark results {arguments.new} against reference {arguments.reference}')
+
+	referenceBenchmark = json.load(open(arguments.reference))
+	newBenchmark = json.load(open(arguments.new))
+	thresholds = json.load(open(arguments.thresholds)) if arguments.thresholds else {}
+
+	rows = []
+	failed = False
+	for language in ["CSharp", "Python"]:
+
+		for key, value in referenceBenchmark.get(language, {}).items():
+			if key not in newBenchmark.get(language, {}):
+				failed = True
+				print(f'Performance benchmark {key} language {language} was not found in new results')
+				row = { "language": language, "benchmark": key, "status": "Missing" }
+				row.update({ name: None for name, *_ in METRICS })
+				rows.append(row)
+				continue
+			newResult = newBenchmark[language][key]
+
+			benchmarkThresholds = thresholds.get(f"{language}/{key}", thresholds.get(key, {}))
+			row = { "language": language, "benchmark": key }
+			for name, samplesKey, averageKey, higherIsBetter, title, valueFormat in METRICS:
+				metric = compareMetric(getSamples(value, samplesKey, averageKey), getSamples(newResult, samplesKey, averageKey),
+					benchmarkThresholds.get(name, arguments.threshold), higherIsBetter, arguments)
+				row[name] = metric
+				if metric is not None and metric["ci-lower"] is not None and not metric["tested"]:
+					print(f'Warning: {title} samples of {key} language {language} are too few to reach alpha {arguments.alpha}, '
+						f'only the threshold is applied. Use more runs, e.g. --repeat 5')
+
+			regression = any(row[name] is not None and row[name]["regression"] for name, *_ in METRICS)
+			failed |= regression
+			row["status"] = "Failed" if regression else "Passed"
+			rows.append(row)
+			print(f'Performance benchmark {row["status"]} for algorithm {key} language {language}. '
+				+ ", ".join(f'{title} {formatChange(row[name])}' for name, samplesKey, averageKey, higherIsBetter, title, valueFormat in METRICS))
+
+	markdown = toMarkdown(rows)
+	print(markdown)
+	if arguments.markdown:
+		with open(arguments.markdown, "w") as outfile:
+			outfile.write(markdown + "\n")
+	if arguments.json:
+		with open(arguments.json, "w") as outfile:
+			json.dump({ "failed": failed, "results": rows }, outfile, indent=4)
+
+	if failed:
+		sys.exit(1)
+
+if __name__ == "__main__":
+	main()
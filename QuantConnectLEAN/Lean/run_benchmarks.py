@@ -1,62 +1,215 @@
 import os
 import re
-import sys
 import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
 import subprocess
 import statistics
 from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 
-dataPath = '../../../Data'
-if len(sys.argv) > 1:
-	dataPath = sys.argv[1]
-print(f'Using data path {dataPath}')
-
-results = {}
-for baseDirectory in ["Algorithm.CSharp/Benchmarks", "Algorithm.Python/Benchmarks"]:
-
-	language = baseDirectory[len("Algorithm") + 1:baseDirectory.index("/")]
-	resultsPerLanguage = {}
-
-	for algorithmFile in sorted(os.listdir(baseDirectory)):
-		if algorithmFile.endswith(("py", "cs")):
-
-			algorithmName = Path(algorithmFile).stem
-
-			if "Fine" in algorithmName:
-				# we skip fundamental benchmarks for now
-				continue
-			algorithmLocation = "QuantConnect.Algorithm.CSharp.dll" if language == "CSharp" else os.path.join("../../../", baseDirectory, algorithmFile)
-			print(f'Start running algorithm {algorithmName} language {language}...')
-
-			dataPointsPerSecond = []
-			benchmarkLengths = []
-			for x in range(1, 2):
-
-				subprocess.run(["dotnet", "./QuantConnect.Lean.Launcher.dll",
-					"--data-folder " + dataPath,
-					"--algorithm-language " + language,
-					"--algorithm-type-name " + algorithmName,
-					"--algorithm-location " + algorithmLocation,
-					"--log-handler ConsoleErrorLogHandler",
-					"--close-automatically true"],
-					cwd="./Launcher/bin/Release",
-					stdout=subprocess.DEVNULL,
-					stderr=subprocess.DEVNULL)
-
-				algorithmLogs = os.path.join("./Launcher/bin/Release", algorithmName + "-log.txt")
-				file = open(algorithmLogs, 'r')
-				for line in file.readlines():
-					for match in re.findall(r"(\d+)k data points per second", line):
-						dataPointsPerSecond.append(int(match))
-					for match in re.findall(r" completed in (\d+)", line):
-						benchmarkLengths.append(int(match))
-
-			averageDps = statistics.mean(dataPointsPerSecond)
-			averageLength = statistics.mean(benchmarkLengths)
-			resultsPerLanguage[algorithmName] = { "average-dps": averageDps, "samples": dataPointsPerSecond, "average-length": averageLength }
-			print(f'Performance for {algorithmName} language {language} avg dps: {averageDps}k samples: [{",".join(str(x) for x in dataPointsPerSecond)}] avg length {averageLength} sec')
-
-	results[language] = resultsPerLanguage
-
-with open("benchmark_results.json", "w") as outfile:
-	json.dump(results, outfile)
+launcherDirectory = "./Launcher/bin/Release"
+
+def parseArguments():
+	parser = argparse.ArgumentParser(description="Runs the Lean performance benchmark algorithms and stores their statistics")
+	parser.add_argument("dataPath", nargs="?", default="../../../Data", help="data folder used by the launcher")
+	parser.add_argument("--warmup", type=int, default=1, help="number of discarded warm-up runs per algorithm")
+	parser.add_argument("--repeat", type=int, default=5, help="number of measured runs per algorithm")
+	parser.add_argument("--parallel", type=int, default=1, help="number of concurrent runs, each one pinned to its own core")
+	parser.add_argument("--language", choices=["CSharp", "Python"], action="append", help="only run the given language, can be repeated")
+	parser.add_argument("--filter", default=None, help="only run algorithms whose name contains this value")
+	parser.add_argument("--output", default="benchmark_results.json", help="destination of the json results")
+	parser.add_argument("--keep-logs", action="store_true", help="keep the per run result folders instead of deleting them")
+	parser.add_argument("--profile-callbacks", action="store_true", help="enable the Python callback latency report, see Common/CallbackProfiler.py")
+	return parser.parse_args()
+
+def getMachineMetadata():
+	'''Describes the machine and revision the benchmarks ran on so results from different hosts are not compared blindly'''
+	metadata = {
+		"timestamp": datetime.now(timezone.utc).isoformat(),
+		"hostname": platform.node(),
+		"platform": platform.platform(),
+		"processor": platform.processor(),
+		"machine": platform.machine(),
+		"cpu-count": os.cpu_count(),
+		"python-version": platform.python_version()
+	}
+	for key, command in [("dotnet-version", ["dotnet", "--version"]), ("git-commit", ["git", "rev-parse", "HEAD"])]:
+		try:
+			metadata[key] = subprocess.run(command, capture_output=True, text=True, check=True).stdout.strip()
+		except (OSError, subprocess.CalledProcessError):
+			metadata[key] = None
+	return metadata
+
+def getAvailableCores():
+	if hasattr(os, "sched_getaffinity"):
+		return sorted(os.sched_getaffinity(0))
+	return list(range(os.cpu_count() or 1))
+
+def percentile(values, percent):
+	'''Linear interpolation percentile, matching numpy's default method'''
+	ordered = sorted(values)
+	if len(ordered) == 1:
+		return ordered[0]
+	position = (len(ordered) - 1) * percent / 100
+	lower = int(position)
+	upper = min(lower + 1, len(ordered) - 1)
+	return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def describe(values):
+	if not values:
+		return {}
+	return {
+		"mean": statistics.mean(values),
+		"median": statistics.median(values),
+		"stdev": statistics.stdev(values) if len(values) > 1 else 0,
+		"variance": statistics.variance(values) if len(values) > 1 else 0,
+		"min": min(values),
+		"max": max(values),
+		"p5": percentile(values, 5),
+		"p25": percentile(values, 25),
+		"p75": percentile(values, 75),
+		"p95": percentile(values, 95)
+	}
+
+def runAlgorithm(job, arguments, cores):
+	'''Runs a single launcher instance in its own results folder and returns the scraped data points per second and length'''
+	algorithmName, language, algorithmLocation, runId = job
+	dataPath = arguments.dataPath
+	resultsFolder = tempfile.mkdtemp(prefix=f"{algorithmName}-{runId}-", dir=os.path.abspath(launcherDirectory))
+
+	preexecFunction = None
+	core = cores.pop() if cores is not None else None
+	if core is not None:
+		preexecFunction = lambda: os.sched_setaffinity(0, {core})
+
+	try:
+		start = time.perf_counter()
+		command = ["dotnet", "./QuantConnect.Lean.Launcher.dll",
+			"--data-folder " + dataPath,
+			"--algorithm-language " + language,
+			"--algorithm-type-name " + algorithmName,
+			"--algorithm-location " + algorithmLocation,
+			"--results-destination-folder " + resultsFolder,
+			"--log-handler ConsoleErrorLogHandler",
+			"--close-automatically true"]
+		environment = None
+		if arguments.profile_callbacks:
+			command.append("--parameters profile-callbacks:true")
+			# event handlers are decorated when the algorithm is imported, before the parameters are read
+			environment = dict(os.environ, LEAN_PROFILE_CALLBACKS="true")
+		subprocess.run(command,
+			cwd=launcherDirectory,
+			env=environment,
+			stdout=subprocess.DEVNULL,
+			stderr=subprocess.DEVNULL,
+			preexec_fn=preexecFunction)
+		wallTime = time.perf_counter() - start
+	finally:
+		if core is not None:
+			cores.append(core)
+
+	dataPointsPerSecond = None
+	benchmarkLength = None
+	algorithmLogs = os.path.join(resultsFolder, algorithmName + "-log.txt")
+	if os.path.exists(algorithmLogs):
+		with open(algorithmLogs, 'r') as file:
+			for line in file:
+				for match in re.findall(r"(\d+)k data points per second", line):
+					dataPointsPerSecond = int(match)
+				for match in re.findall(r" completed in (\d+(?:\.\d+)?)", line):
+					benchmarkLength = float(match)
+
+	if not arguments.keep_logs:
+		shutil.rmtree(resultsFolder, ignore_errors=True)
+	return dataPointsPerSecond, benchmarkLength, wallTime
+
+def runJobs(jobs, arguments):
+	'''Runs the given jobs with up to arguments.parallel concurrent launchers, pinning each one to a free core when supported'''
+	cores = None
+	workers = max(1, arguments.parallel)
+	if workers > 1 and hasattr(os, "sched_setaffinity"):
+		# list.pop/append are atomic, each running job borrows a core and returns it when done
+		cores = getAvailableCores()[:workers]
+		workers = len(cores)
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		return list(executor.map(lambda job: runAlgorithm(job, arguments, cores), jobs))
+
+def getAlgorithms(arguments):
+	algorithms = []
+	for baseDirectory in ["Algorithm.CSharp/Benchmarks", "Algorithm.Python/Benchmarks"]:
+
+		language = baseDirectory[len("Algorithm") + 1:baseDirectory.index("/")]
+		if arguments.language and language not in arguments.language:
+			continue
+
+		for algorithmFile in sorted(os.listdir(baseDirectory)):
+			if algorithmFile.endswith(("py", "cs")):
+
+				algorithmName = Path(algorithmFile).stem
+
+				if "Fine" in algorithmName:
+					# we skip fundamental benchmarks for now
+					continue
+				if arguments.filter and arguments.filter not in algorithmName:
+					continue
+				algorithmLocation = "QuantConnect.Algorithm.CSharp.dll" if language == "CSharp" else os.path.join("../../../", baseDirectory, algorithmFile)
+				algorithms.append((algorithmName, language, algorithmLocation))
+	return algorithms
+
+def main():
+	arguments = parseArguments()
+	print(f'Using data path {arguments.dataPath}, {arguments.warmup} warm-up and {arguments.repeat} measured runs, {arguments.parallel} in parallel')
+
+	algorithms = getAlgorithms(arguments)
+
+	if arguments.warmup > 0:
+		print(f'Running warm-up for {len(algorithms)} algorithms...')
+		runJobs([algorithm + (f"warmup{x}",) for algorithm in algorithms for x in range(arguments.warmup)], arguments)
+
+	jobs = [algorithm + (f"run{x}",) for algorithm in algorithms for x in range(arguments.repeat)]
+	print(f'Start running {len(jobs)} measured runs...')
+	runs = runJobs(jobs, arguments)
+
+	results = { "metadata": getMachineMetadata() }
+	results["metadata"]["warmup"] = arguments.warmup
+	results["metadata"]["repeat"] = arguments.repeat
+	results["metadata"]["parallel"] = arguments.parallel
+	for algorithmName, language, algorithmLocation in algorithms:
+		results.setdefault(language, {})
+
+	for (algorithmName, language, algorithmLocation), index in zip(algorithms, range(0, len(jobs), max(1, arguments.repeat))):
+		algorithmRuns = runs[index:index + arguments.repeat]
+		dataPointsPerSecond = [dps for dps, length, wallTime in algorithmRuns if dps is not None]
+		benchmarkLengths = [length for dps, length, wallTime in algorithmRuns if length is not None]
+		wallTimes = [wallTime for dps, length, wallTime in algorithmRuns]
+
+		if not dataPointsPerSecond:
+			print(f'No results found for algorithm {algorithmName} language {language}, skipping')
+			continue
+
+		averageDps = statistics.mean(dataPointsPerSecond)
+		averageLength = statistics.mean(benchmarkLengths) if benchmarkLengths else None
+		results[language][algorithmName] = {
+			"average-dps": averageDps,
+			"samples": dataPointsPerSecond,
+			"average-length": averageLength,
+			"length-samples": benchmarkLengths,
+			"wall-time-samples": wallTimes,
+			"failed-runs": len(algorithmRuns) - len(dataPointsPerSecond),
+			"dps-stats": describe(dataPointsPerSecond),
+			"length-stats": describe(benchmarkLengths)
+		}
+		dpsStats = results[language][algorithmName]["dps-stats"]
+		print(f'Performance for {algorithmName} language {language} avg dps: {averageDps}k median: {dpsStats["median"]}k stdev: {dpsStats["stdev"]:.2f} '
+			f'p5/p95: {dpsStats["p5"]:.1f}/{dpsStats["p95"]:.1f} samples: [{",".join(str(x) for x in dataPointsPerSecond)}] avg length {averageLength} sec')
+
+	with open(arguments.output, "w") as outfile:
+		json.dump(results, outfile, indent=4)
+
+if __name__ == "__main__":
+	main()
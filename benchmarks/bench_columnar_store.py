@@ -0,0 +1,88 @@
+"""Restart warm-up of 10 and 50 day EMAs for 2000 symbols from a year of saved daily closes: a CSV text per
+symbol read with pd.read_csv and replayed value by value through the indicators, like ObjectStoreExampleAlgorithm
+did, against one ColumnarStore blob and exponential_moving_average over the close matrix.
+
+Usage: python benchmarks/bench_columnar_store.py [symbols] [days]"""
+import os
+import sys
+from io import StringIO
+from time import perf_counter
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'QuantConnectLEAN', 'Lean', 'Common'))
+from ColumnarStore import exponential_moving_average, from_bytes, to_bytes
+
+SYMBOLS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+DAYS = int(sys.argv[2]) if len(sys.argv) > 2 else 252
+PERIODS = (10, 50)
+
+
+class Ema:
+    """Per value update, as the engine's indicators are fed"""
+
+    def __init__(self, period):
+        self.period = period
+        self.k = 2 / (period + 1)
+        self.samples = 0
+        self.total = 0.0
+        self.value = 0.0
+
+    def update(self, time, value):
+        self.samples += 1
+        if self.samples <= self.period:
+            self.total += value
+            if self.samples == self.period:
+                self.value = self.total / self.period
+        else:
+            self.value = value * self.k + self.value * (1 - self.k)
+
+
+def csv_warm_up(texts):
+    values = {}
+    for symbol, text in texts.items():
+        history = pd.read_csv(StringIO(text), header=None, index_col=0).iloc[:, 0]
+        history.index = pd.to_datetime(history.index)
+        indicators = [Ema(period) for period in PERIODS]
+        for time, close in history.items():
+            for indicator in indicators:
+                indicator.update(time, close)
+        values[symbol] = [indicator.value for indicator in indicators]
+    return values
+
+
+def columnar_warm_up(blob):
+    columns, _, metadata = from_bytes(blob)
+    values = np.column_stack([exponential_moving_average(columns['close'], period) for period in PERIODS])
+    return dict(zip(metadata['symbols'], values))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    closes = 100 * np.exp(0.01 * rng.normal(size=(DAYS, SYMBOLS)).cumsum(axis=0))
+    times = pd.bdate_range('2023-01-02', periods=DAYS)
+    symbols = [f'S{i:04d}' for i in range(SYMBOLS)]
+
+    texts = {symbol: '\n'.join(f'{time},{close}' for time, close in zip(times, closes[:, i])) for i, symbol in enumerate(symbols)}
+    blob = to_bytes({'time': times.values, 'close': closes}, 1, {'symbols': symbols})
+
+    # a single run, it takes seconds
+    started = perf_counter()
+    csv_values = csv_warm_up(texts)
+    csv = perf_counter() - started
+    columnar = min(repeat(lambda: columnar_warm_up(blob), number=1, repeat=20))
+    columnar_values = columnar_warm_up(blob)
+    difference = max(np.abs(np.array(value) - columnar_values[symbol]).max() for symbol, value in csv_values.items())
+
+    print(f'{SYMBOLS} symbols, {DAYS} days, EMA {", ".join(map(str, PERIODS))}')
+    print(f'{"":<10}{"bytes":>12}{"warm-up ms":>14}')
+    print(f'{"csv":<10}{sum(len(text) for text in texts.values()):>12}{csv * 1000:>14.1f}')
+    print(f'{"columnar":<10}{len(blob):>12}{columnar * 1000:>14.2f}')
+    print(f'speedup {csv / columnar:.0f}x, max difference {difference:.2e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""EMA cross universe selection over 8000 symbols every day for two years: an indicator pair per symbol updated
+one symbol at a time and a full sort, like EmaCrossUniverseSelectionModel did, against the EmaStateStore update
+and top_indices. The per symbol indicators are Python objects here, the engine's .NET indicators add an interop
+call per update on top.
+
+Usage: python benchmarks/bench_ema_state_store.py [symbols] [days]"""
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'QuantConnectLEAN', 'Lean', 'Algorithm.Framework'))
+from Selection.EmaStateStore import EmaStateStore
+from Selection.Ranking import top_indices
+
+SYMBOLS = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+DAYS = int(sys.argv[2]) if len(sys.argv) > 2 else 504
+FAST, SLOW, COUNT, TOLERANCE = 100, 300, 500, 0.01
+
+
+class Ema:
+    def __init__(self, period):
+        self.period = period
+        self.k = 2 / (period + 1)
+        self.samples = 0
+        self.total = 0.0
+        self.value = 0.0
+
+    def update(self, value):
+        self.samples += 1
+        if self.samples <= self.period:
+            self.total += value
+            if self.samples == self.period:
+                self.value = self.total / self.period
+        else:
+            self.value = value * self.k + self.value * (1 - self.k)
+        return self.samples >= self.period
+
+
+class SelectionData:
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.fast_ema = Ema(FAST)
+        self.slow_ema = Ema(SLOW)
+
+    @property
+    def scaled_delta(self):
+        fast, slow = self.fast_ema.value, self.slow_ema.value
+        return (fast - slow) / ((fast + slow) / 2)
+
+    def update(self, value):
+        return self.slow_ema.update(value) & self.fast_ema.update(value)
+
+
+def select_per_symbol(averages, symbols, prices):
+    filtered = []
+    for symbol, price in zip(symbols, prices):
+        if symbol not in averages:
+            averages[symbol] = SelectionData(symbol)
+        avg = averages[symbol]
+        if avg.update(price) and avg.fast_ema.value > avg.slow_ema.value * (1 + TOLERANCE):
+            filtered.append(avg)
+    filtered = sorted(filtered, key=lambda avg: avg.scaled_delta, reverse=True)
+    return [x.symbol for x in filtered[:COUNT]]
+
+
+def select_store(store, symbols, prices):
+    rows = store.rows(symbols)
+    ready = store.update(rows, prices)
+    fast, slow = store.current(0, rows), store.current(1, rows)
+    filtered = np.flatnonzero(ready & (fast > slow * (1 + TOLERANCE)))
+    scaled_delta = (fast[filtered] - slow[filtered]) / ((fast[filtered] + slow[filtered]) / 2)
+    return [symbols[i] for i in filtered[top_indices(scaled_delta, COUNT)].tolist()]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    # trending random walks, a tenth of the universe is missing on any day
+    drifts = rng.normal(0, 0.001, size=SYMBOLS)
+    symbols = [f'S{i:05d}' for i in range(SYMBOLS)]
+
+    averages, store = {}, EmaStateStore((FAST, SLOW))
+    prices = np.full(SYMBOLS, 50.0)
+    per_symbol_seconds = store_seconds = 0
+    differences = 0
+    for day in range(DAYS):
+        prices *= np.exp(drifts + 0.02 * rng.normal(size=SYMBOLS))
+        present = np.flatnonzero(rng.random(size=SYMBOLS) < 0.9)
+        day_symbols = [symbols[i] for i in present]
+        day_prices = prices[present].tolist()
+
+        start = perf_counter()
+        expected = select_per_symbol(averages, day_symbols, day_prices)
+        per_symbol_seconds += perf_counter() - start
+
+        start = perf_counter()
+        selected = select_store(store, day_symbols, day_prices)
+        store_seconds += perf_counter() - start
+        differences += selected != expected
+
+    print(f'{SYMBOLS} symbols, {DAYS} daily selections, EMA {FAST}/{SLOW}, top {COUNT}')
+    print(f'{"per symbol":<12}{per_symbol_seconds:>10.2f}s{per_symbol_seconds / DAYS * 1000:>10.2f} ms/day')
+    print(f'{"store":<12}{store_seconds:>10.2f}s{store_seconds / DAYS * 1000:>10.2f} ms/day')
+    print(f'speedup {per_symbol_seconds / store_seconds:.1f}x, days with a different selection: {differences}')
+
+
+if __name__ == '__main__':
+    main()
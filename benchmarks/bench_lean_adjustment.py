@@ -0,0 +1,66 @@
+"""Adjusts multi-year minute bars with the factor file, comparing a per bar lookup (the reversed scan the engine
+does for each date) against the vectorized AdjustmentEngine.
+
+Usage: python benchmarks/bench_lean_adjustment.py [years]"""
+import os
+import sys
+from timeit import repeat
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lean_adjustment import ADJUSTED, AdjustmentEngine
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'QuantConnectLEAN', 'Lean', 'Data')
+
+
+def minute_bars(years):
+    """Synthetic regular session minute bars ending 2020-12-31"""
+    days = np.arange(np.datetime64('2021-01-01') - np.timedelta64(365 * years, 'D'), np.datetime64('2021-01-01'))
+    days = days[np.is_busday(days)]
+    minutes = np.arange(571, 961).astype('timedelta64[m]')
+    times = (days.astype('datetime64[m]')[:, None] + minutes[None, :]).ravel().astype('datetime64[ms]')
+    generator = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(generator.normal(0, 0.0005, len(times))))
+    return {'time': times, 'open': close, 'high': close * 1.001, 'low': close * 0.999, 'close': close,
+            'volume': generator.integers(100, 10000, len(times)).astype(np.float64)}
+
+
+def adjust_per_bar(factor_file, columns):
+    """One lookup per bar, walking the rows backwards like the engine"""
+    dates = list(factor_file.dates.astype('datetime64[D]').astype(object))
+    result = {name: np.array(column) for name, column in columns.items()}
+    for i, time in enumerate(columns['time'].astype('datetime64[D]').astype(object)):
+        price_factor, split_factor = 1.0, 1.0
+        for row in range(len(dates) - 1, -1, -1):
+            if dates[row] < time:
+                break
+            price_factor, split_factor = factor_file.price_factors[row], factor_file.split_factors[row]
+        for name in ('open', 'high', 'low', 'close'):
+            result[name][i] = columns[name][i] * price_factor * split_factor
+        result['volume'][i] = columns['volume'][i] / split_factor
+    return result
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    engine = AdjustmentEngine(DATA_FOLDER)
+    columns = minute_bars(years)
+    rows = len(columns['time'])
+
+    vectorized = engine.adjust('aapl', columns, ADJUSTED)
+    per_bar = adjust_per_bar(engine.factor_files['aapl'], columns)
+    np.testing.assert_allclose(vectorized['close'], per_bar['close'])
+
+    # the per bar loop is slow enough to be timed once
+    vectorized_seconds = min(repeat(lambda: engine.adjust('aapl', columns, ADJUSTED), number=1, repeat=5))
+    per_bar_seconds = min(repeat(lambda: adjust_per_bar(engine.factor_files['aapl'], columns), number=1, repeat=1))
+    print(f'{rows} minute bars over {years} years')
+    print(f'{"method":<12}{"seconds":>10}{"rows/s":>16}')
+    print(f'{"per bar":<12}{per_bar_seconds:>10.3f}{rows / per_bar_seconds:>16.0f}')
+    print(f'{"vectorized":<12}{vectorized_seconds:>10.3f}{rows / vectorized_seconds:>16.0f}')
+    print(f'speedup {per_bar_seconds / vectorized_seconds:.0f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Top N coarse selection over every available day: reading and sorting the coarse csv each day, like the
+coarse universe benchmarks do, against slicing the ranked CoarseStore.
+
+Usage: python benchmarks/bench_lean_coarse.py [data folder]"""
+import os
+import csv
+import sys
+import shutil
+import tempfile
+from timeit import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lean_coarse import CoarseStore
+
+DATA_FOLDER = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'QuantConnectLEAN', 'Lean', 'Data')
+COUNT = 250
+
+
+def sort_files(folder, has_fundamental_data):
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name)) as f:
+            rows = [(row[0], float(row[4]), row[5] == 'True') for row in csv.reader(f)]
+        selected = [row for row in rows if row[2]] if has_fundamental_data else rows
+        [row[0] for row in sorted(selected, key=lambda row: row[1], reverse=True)[:COUNT]]
+
+
+def sort_loaded(days, has_fundamental_data):
+    """Sorting already parsed rows, the part of the work done inside the selection function"""
+    for rows in days:
+        selected = [row for row in rows if row[2]] if has_fundamental_data else rows
+        [row[0] for row in sorted(selected, key=lambda row: row[1], reverse=True)[:COUNT]]
+
+
+def slice_store(store, dates, has_fundamental_data):
+    for day in dates:
+        store.top(day, COUNT, has_fundamental_data)['sid']
+
+
+def main():
+    cache_folder = tempfile.mkdtemp()
+    try:
+        store = CoarseStore(DATA_FOLDER, cache_folder)
+        build = min(repeat(lambda: CoarseStore(DATA_FOLDER, cache_folder).update(),
+                           setup=lambda: shutil.rmtree(cache_folder, ignore_errors=True), number=1, repeat=3))
+        store.update()
+        dates = store.dates()
+        folder = store.source_folder
+        days = []
+        for name in sorted(os.listdir(folder)):
+            with open(os.path.join(folder, name)) as f:
+                days.append([(row[0], float(row[4]), row[5] == 'True') for row in csv.reader(f)])
+
+        print(f'{len(dates)} days, {sum(len(rows) for rows in days)} rows, store built in {build * 1000:.1f}ms')
+        print(f'{"workload":<32}{"csv + sort ms/day":>20}{"sort ms/day":>14}{"store ms/day":>14}')
+        for has_fundamental_data in (False, True):
+            files = min(repeat(lambda: sort_files(folder, has_fundamental_data), number=1, repeat=5)) / len(dates) * 1000
+            loaded = min(repeat(lambda: sort_loaded(days, has_fundamental_data), number=1, repeat=5)) / len(dates) * 1000
+            sliced = min(repeat(lambda: slice_store(store, dates, has_fundamental_data), number=1, repeat=5)) / len(dates) * 1000
+            name = f'top {COUNT}' + (' has_fundamental_data' if has_fundamental_data else '')
+            print(f'{name:<32}{files:>20.3f}{loaded:>14.3f}{sliced:>14.3f}')
+    finally:
+        shutil.rmtree(cache_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
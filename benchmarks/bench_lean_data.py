@@ -0,0 +1,49 @@
+"""Compares decoding Lean zips on every request against LeanDataCache memory-mapped queries.
+
+Usage: python benchmarks/bench_lean_data.py [data folder]"""
+import os
+import sys
+import shutil
+import tempfile
+from timeit import repeat
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lean_data import LeanDataCache, get_source_path, list_source_dates, read_zip, concatenate_columns
+
+DATA_FOLDER = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'QuantConnectLEAN', 'Lean', 'Data')
+
+WORKLOADS = [
+    ('SPY minute trade', 'equity', 'usa', 'minute', 'SPY', 'trade', date(2013, 10, 7), date(2013, 10, 11)),
+    ('SPY minute quote', 'equity', 'usa', 'minute', 'SPY', 'quote', date(2013, 10, 7), date(2013, 10, 11)),
+    ('SPY daily trade', 'equity', 'usa', 'daily', 'SPY', 'trade', date(1998, 1, 1), date(2021, 12, 31)),
+    ('EURUSD minute quote', 'forex', 'oanda', 'minute', 'EURUSD', 'quote', date(2014, 5, 1), date(2014, 5, 7)),
+]
+
+
+def read_sources(security_type, market, resolution, symbol, tick_type, start, end):
+    if resolution in ('hour', 'daily'):
+        return read_zip(get_source_path(DATA_FOLDER, security_type, market, resolution, symbol, tick_type), security_type, resolution, tick_type)
+    days = [day for day in list_source_dates(DATA_FOLDER, security_type, market, resolution, symbol, tick_type) if start <= day <= end]
+    return concatenate_columns([read_zip(get_source_path(DATA_FOLDER, security_type, market, resolution, symbol, tick_type, day),
+                                         security_type, resolution, tick_type, day) for day in days])
+
+
+def main():
+    cache_folder = tempfile.mkdtemp()
+    try:
+        cache = LeanDataCache(DATA_FOLDER, cache_folder)
+        print(f'{"workload":<24}{"rows":>10}{"zip ms":>10}{"cold ms":>10}{"cached ms":>12}{"speedup":>10}')
+        for name, *args in WORKLOADS:
+            rows = len(read_sources(*args)['time'])
+            parse = min(repeat(lambda: read_sources(*args), number=1, repeat=5)) * 1000
+            cold = min(repeat(lambda: cache.query(*args), setup=lambda: shutil.rmtree(cache_folder, ignore_errors=True), number=1, repeat=5)) * 1000
+            cached = min(repeat(lambda: cache.query(*args), number=20, repeat=5)) / 20 * 1000
+            print(f'{name:<24}{rows:>10}{parse:>10.2f}{cold:>10.2f}{cached:>12.3f}{parse / cached:>9.1f}x')
+    finally:
+        shutil.rmtree(cache_folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Trailing stop over 2000 open positions in an algorithm holding 8000 securities: going over every security and
+its holdings on each call, like TrailingStopRiskManagementModel did, against the RiskStateEngine reading only the
+invested securities and evaluating the stops as arrays. The securities are Python objects here, the engine's .NET
+objects add an interop call per property read on top.
+
+Usage: python benchmarks/bench_risk_state_engine.py [positions] [securities]"""
+import os
+import sys
+from time import perf_counter
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'QuantConnectLEAN', 'Lean', 'Algorithm.Framework'))
+from Risk.RiskStateEngine import RiskStateEngine
+
+POSITIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+SECURITIES = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+MAXIMUM_DRAWDOWN = 0.05
+STEPS = 50
+
+
+class Event:
+    def __init__(self):
+        self.handlers = []
+
+    def __iadd__(self, handler):
+        self.handlers.append(handler)
+        return self
+
+
+class Holdings:
+    def __init__(self, security, quantity, average_price):
+        self.security = security
+        self.quantity = quantity
+        self.average_price = average_price
+        self.quantity_changed = Event()
+
+    @property
+    def is_long(self):
+        return self.quantity > 0
+
+    @property
+    def absolute_holdings_cost(self):
+        return abs(self.quantity) * self.average_price
+
+    @property
+    def absolute_holdings_value(self):
+        return abs(self.quantity) * self.security.price
+
+
+class Security:
+    def __init__(self, symbol, price, quantity):
+        self.symbol = symbol
+        self.price = price
+        self.holdings = Holdings(self, quantity, price)
+
+    @property
+    def invested(self):
+        return self.holdings.quantity != 0
+
+
+def legacy_trailing_stop(algorithm, state):
+    liquidate = []
+    for kvp in algorithm.securities:
+        symbol, security = kvp.key, kvp.value
+        if not security.invested:
+            state.pop(symbol, None)
+            continue
+        is_long = security.holdings.is_long
+        value = security.holdings.absolute_holdings_value
+        current = state.get(symbol)
+        if current is None or current[0] != is_long:
+            state[symbol] = current = [is_long, security.holdings.absolute_holdings_cost]
+        if (is_long and current[1] < value) or (not is_long and current[1] > value):
+            current[1] = value
+            continue
+        if MAXIMUM_DRAWDOWN < abs((current[1] - value) / current[1]):
+            state.pop(symbol, None)
+            liquidate.append(symbol)
+    return liquidate
+
+
+def engine_trailing_stop(algorithm, engine):
+    invested, quantities, values = engine.update(algorithm, 'absolute_holdings_value')
+    rows = np.flatnonzero(engine.trailing_drawdowns(invested, quantities, values[0]) > MAXIMUM_DRAWDOWN)
+    engine.reset_marks(rows)
+    return [engine.securities[row].symbol for row in rows.tolist()]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    held = set(rng.choice(SECURITIES, POSITIONS, replace=False).tolist())
+    securities = [Security(f'S{i:05d}', 100.0, (1 if i % 2 else -1) * 10 if i in held else 0) for i in range(SECURITIES)]
+    algorithm = SimpleNamespace(securities=[SimpleNamespace(key=x.symbol, value=x) for x in securities])
+    state, engine = {}, RiskStateEngine()
+
+    legacy_seconds = engine_seconds = 0
+    differences = 0
+    prices = np.full(SECURITIES, 100.0)
+    for step in range(STEPS):
+        prices *= np.exp(0.01 * rng.normal(size=SECURITIES))
+        for security, price in zip(securities, prices.tolist()):
+            security.price = price
+
+        start = perf_counter()
+        expected = legacy_trailing_stop(algorithm, state)
+        legacy_seconds += perf_counter() - start
+
+        start = perf_counter()
+        result = engine_trailing_stop(algorithm, engine)
+        engine_seconds += perf_counter() - start
+        differences += sorted(expected) != sorted(result)
+
+    print(f'{POSITIONS} positions in {SECURITIES} securities, {STEPS} calls')
+    print(f'{"every security":<16}{legacy_seconds / STEPS * 1000:>10.2f} ms/call')
+    print(f'{"engine":<16}{engine_seconds / STEPS * 1000:>10.2f} ms/call')
+    print(f'speedup {legacy_seconds / engine_seconds:.1f}x, calls with different liquidations: {differences}')
+
+
+if __name__ == '__main__':
+    main()
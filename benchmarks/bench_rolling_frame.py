@@ -0,0 +1,63 @@
+"""A year of minute bars appended to a rolling window, the window's closes read back on every bar the way
+TalibIndicatorsAlgorithm feeds talib: pd.concat of a one row DataFrame against RollingFrame.append.
+
+Usage: python benchmarks/bench_rolling_frame.py [window size]"""
+import os
+import sys
+from timeit import repeat
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'QuantConnectLEAN', 'Lean', 'Common'))
+from RollingFrame import RollingFrame
+
+WINDOW = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+BARS = 252 * 390
+COLUMNS = ['close', 'DEMA', 'EMA', 'WMA']
+
+
+def concat_window(times, closes):
+    window = pd.DataFrame()
+    for time, close in zip(times, closes):
+        row = pd.DataFrame({'close': [close]}, index=[time])
+        window = pd.concat([window, row]).iloc[-WINDOW:]
+        values = window['close'].values
+        # stands in for the talib calls on the closes
+        values[-3:].mean()
+    return window
+
+
+def rolling_frame(times, closes):
+    window = RollingFrame(WINDOW, COLUMNS)
+    for time, close in zip(times, closes):
+        window.append({'close': close}, time)
+        values = window['close']
+        window.set_last('EMA', values[-3:].mean())
+    return window
+
+
+def main():
+    rng = np.random.default_rng(0)
+    start = datetime(2020, 1, 2, 9, 31)
+    times = [start + timedelta(minutes=i) for i in range(BARS)]
+    closes = (100 + np.cumsum(rng.normal(scale=0.05, size=BARS))).tolist()
+
+    # concat takes minutes on the full year, time a slice of it
+    concat_bars = BARS // 20
+    concat = min(repeat(lambda: concat_window(times[:concat_bars], closes[:concat_bars]), number=1, repeat=3)) / concat_bars
+    frame = min(repeat(lambda: rolling_frame(times, closes), number=1, repeat=5)) / BARS
+
+    expected = concat_window(times[-WINDOW:], closes[-WINDOW:])['close'].values
+    assert np.array_equal(rolling_frame(times, closes)['close'], expected)
+
+    print(f'{BARS} minute bars, window of {WINDOW} rows')
+    print(f'{"pattern":<24}{"us/bar":>10}{"year s":>10}')
+    print(f'{"pd.concat":<24}{concat * 1e6:>10.1f}{concat * BARS:>10.2f}')
+    print(f'{"RollingFrame":<24}{frame * 1e6:>10.1f}{frame * BARS:>10.2f}')
+    print(f'speedup: {concat / frame:.0f}x')
+
+
+if __name__ == '__main__':
+    main()
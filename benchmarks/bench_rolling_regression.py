@@ -0,0 +1,54 @@
+"""Slope and intercept of 1000 symbols over a 30 day window: a least squares fit per symbol on every new day,
+like the regression examples did, against the closed form RollingRegression update.
+
+Usage: python benchmarks/bench_rolling_regression.py [symbols] [window]"""
+import os
+import sys
+from timeit import repeat
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'QuantConnectLEAN', 'Lean', 'Algorithm.Framework'))
+from Alphas.RollingRegression import RollingRegression
+
+SYMBOLS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+WINDOW = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+STEPS = 20
+
+
+def per_symbol(prices):
+    x = np.arange(len(prices))
+    return [np.polyfit(x, prices[:, i], 1) for i in range(prices.shape[1])]
+
+
+def batched(prices):
+    # one least squares solve with a column per symbol
+    design = np.vstack([np.arange(len(prices)), np.ones(len(prices))]).T
+    return np.linalg.lstsq(design, prices, rcond=None)[0]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(0.01 * rng.normal(size=(WINDOW + STEPS, SYMBOLS)).cumsum(axis=0))
+    window = prices[-WINDOW:]
+
+    loop = min(repeat(lambda: per_symbol(window), number=1, repeat=3))
+    solve = min(repeat(lambda: batched(window), number=1, repeat=10))
+
+    regression = RollingRegression(WINDOW, range(SYMBOLS))
+    regression.update_many(prices[:WINDOW])
+    rows = iter(prices[WINDOW:])
+    # best of the steps, each adds a day and reads the slopes and intercepts
+    step = min(repeat(lambda: (regression.update(next(rows)), regression.slopes, regression.intercepts), number=1, repeat=STEPS))
+    difference = np.abs(regression.slopes - batched(window)[0]).max()
+
+    print(f'{SYMBOLS} symbols, {WINDOW} day window, per new day')
+    print(f'{"polyfit per symbol ms":<24}{loop * 1000:>10.2f}')
+    print(f'{"batched lstsq ms":<24}{solve * 1000:>10.3f}{loop / solve:>10.0f}x')
+    print(f'{"rolling update ms":<24}{step * 1000:>10.3f}{loop / step:>10.0f}x')
+    print(f'max slope difference {difference:.2e}')
+
+
+if __name__ == '__main__':
+    main()
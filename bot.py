@@ -3,6 +3,7 @@ import logging
 import discord
 from discord.ext import commands, tasks
 from datetime import datetime, time
+from collections import deque
 import asyncio
 
 class BotConfig:
@@ -20,23 +21,28 @@ class BotConfig:
         self.channels = config['channels']
         self.subscriptions = config.get('subscriptions', {})
         self.log_file = config.get('log_file', 'bot.log')
+        self.signal_export = config.get('signal_export', None)
 
     def save_config(self):
+        config = {
+            "token": self.token,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "redirect_uri": self.redirect_uri,
+            "channels": self.channels,
+            "subscriptions": self.subscriptions,
+            "log_file": self.log_file
+        }
+        if self.signal_export is not None:
+            config["signal_export"] = self.signal_export
         with open(self.config_file, 'w') as f:
-            json.dump({
-                "token": self.token,
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "redirect_uri": self.redirect_uri,
-                "channels": self.channels,
-                "subscriptions": self.subscriptions,
-                "log_file": self.log_file
-            }, f, indent=4)
+            json.dump(config, f, indent=4)
 
 class ChannelManager:
-    def __init__(self, channels, subscriptions):
+    def __init__(self, channels, subscriptions, clock=datetime.now):
         self.channels = channels
         self.subscriptions = subscriptions
+        self.clock = clock
         self.message_counters = {channel_id: 0 for channel_id in channels}
         self.last_message_time = {channel_id: datetime.min for channel_id in channels}
 
@@ -53,7 +59,7 @@ class ChannelManager:
         rate_limit_interval = channel_config['rate_limit_interval']
 
         # Check rate limits
-        now = datetime.now()
+        now = self.clock()
         time_since_last_message = (now - self.last_message_time[channel_id]).total_seconds()
         if self.message_counters[channel_id] >= rate_limit and time_since_last_message < rate_limit_interval:
             return False
@@ -69,7 +75,7 @@ class ChannelManager:
 
     def increment_message_counter(self, channel_id):
         self.message_counters[channel_id] += 1
-        self.last_message_time[channel_id] = datetime.now()
+        self.last_message_time[channel_id] = self.clock()
 
     def reset_message_counters(self):
         self.message_counters = {channel_id: 0 for channel_id in self.channels}
@@ -88,16 +94,148 @@ class ChannelManager:
     def list_subscriptions(self, channel_id):
         return self.subscriptions.get(channel_id, [])
 
+class DiscordTransport:
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def send(self, channel_id, content):
+        channel = self.bot.get_channel(int(channel_id))
+        if channel is None:
+            raise ValueError(f"Unknown channel {channel_id}")
+        await channel.send(content)
+
+class SignalDispatcher:
+    def __init__(self, channel_manager, transport, max_pending=100):
+        self.channel_manager = channel_manager
+        self.transport = transport
+        self.max_pending = max_pending
+        # messages held back by rate limits or send times, per channel: (queued time, content)
+        self.pending = {}
+        self.delivered = 0
+        self.delayed = 0
+        self.dropped = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    async def dispatch(self, signal, content):
+        for channel_id in self.channel_manager.get_subscriptions(signal):
+            queue = self.pending.setdefault(channel_id, deque())
+            # keep the order, nothing jumps ahead of held back messages
+            if not queue and self.channel_manager.can_send_message(channel_id):
+                if not await self._send(channel_id, content):
+                    # retried by the next flush
+                    queue.append((self.channel_manager.clock(), content))
+            elif len(queue) >= self.max_pending:
+                self.dropped += 1
+                logging.warning(f"Dropped signal {signal} for channel {channel_id}, {len(queue)} messages pending")
+            else:
+                queue.append((self.channel_manager.clock(), content))
+
+    async def flush(self):
+        for channel_id, queue in self.pending.items():
+            while queue and self.channel_manager.can_send_message(channel_id):
+                queued_time, content = queue[0]
+                # a failed send stays first in the queue, the other channels are still flushed
+                if not await self._send(channel_id, content):
+                    break
+                queue.popleft()
+                delay = (self.channel_manager.clock() - queued_time).total_seconds()
+                self.delayed += 1
+                self.total_delay += delay
+                self.max_delay = max(self.max_delay, delay)
+
+    async def _send(self, channel_id, content):
+        # False when the transport failed, the caller keeps the message
+        try:
+            await self.transport.send(channel_id, content)
+        except Exception as e:
+            logging.error(f"Failed to send to channel {channel_id}: {e}")
+            return False
+        self.channel_manager.increment_message_counter(channel_id)
+        self.delivered += 1
+        return True
+
+    def pending_count(self):
+        return sum(len(queue) for queue in self.pending.values())
+
+class SignalReceiver:
+    DIRECTIONS = {1: "up", 0: "flat", -1: "down"}
+
+    def __init__(self, dispatcher, host="127.0.0.1", port=8765, max_message_length=2000):
+        self.dispatcher = dispatcher
+        self.host = host
+        self.port = port
+        self.max_message_length = max_message_length
+        self.server = None
+        self.batches = 0
+
+    async def start(self):
+        if self.server is None:
+            # a batch holds a whole time slice, allow long lines
+            self.server = await asyncio.start_server(self.handle_connection, self.host, self.port, limit=1 << 24)
+            logging.info(f"Signal receiver listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    await self.dispatch_batch(json.loads(line))
+                except Exception as e:
+                    logging.error(f"Error dispatching signal batch: {e}")
+        finally:
+            writer.close()
+
+    async def dispatch_batch(self, batch):
+        self.batches += 1
+        for content in self.format_batch(batch):
+            await self.dispatcher.dispatch(batch['signal'], content)
+
+    def format_batch(self, batch):
+        # one message per batch, split at the Discord message length
+        lines = [f"{target['symbol']} target {target['quantity']:g}" for target in batch.get('targets', [])]
+        for insight in batch.get('insights', []):
+            line = f"{insight['symbol']} {self.DIRECTIONS.get(insight['direction'], insight['direction'])} for {insight['period']:g}s"
+            if insight.get('confidence') is not None:
+                line += f" confidence {insight['confidence']:g}"
+            lines.append(line)
+
+        header = f"{batch['signal']} {batch['time']} ({batch.get('algorithm', '')})"
+        # a line longer than a message is split over several
+        room = max(1, self.max_message_length - len(header) - 1)
+        messages = []
+        current = header
+        for line in lines:
+            for start in range(0, len(line), room):
+                part = line[start:start + room]
+                if current != header and len(current) + len(part) + 1 > self.max_message_length:
+                    messages.append(current)
+                    current = header
+                current += "\n" + part
+        if current != header:
+            messages.append(current)
+        return messages
+
 class MessageBot(commands.Cog):
-    def __init__(self, bot, channel_manager):
+    def __init__(self, bot, channel_manager, dispatcher=None, signal_export=None):
         self.bot = bot
         self.channel_manager = channel_manager
+        self.dispatcher = dispatcher or SignalDispatcher(channel_manager, DiscordTransport(bot))
+        self.signal_receiver = SignalReceiver(self.dispatcher, **signal_export) if signal_export else None
 
     @commands.Cog.listener()
     async def on_ready(self):
         logging.info(f'Logged in as {self.bot.user.name}')
         print(f'Logged in as {self.bot.user.name}')
         self.reset_message_counters.start()
+        self.flush_pending_signals.start()
+        if self.signal_receiver:
+            await self.signal_receiver.start()
         logging.info('Bot is ready and reset_message_counters task started')
 
     @commands.command(name='help_custom')
@@ -273,6 +411,10 @@ class MessageBot(commands.Cog):
         logging.info("Message counters reset.")
         print("Message counters reset.")
 
+    @tasks.loop(seconds=1)
+    async def flush_pending_signals(self):
+        await self.dispatcher.flush()
+
 class DiscordBot:
     def __init__(self, config_file):
         self.config = BotConfig(config_file)
@@ -284,7 +426,7 @@ class DiscordBot:
         self.bot = commands.Bot(command_prefix='!', intents=intents)
         self.bot.config = self.config
         self.channel_manager = ChannelManager(self.config.channels, self.config.subscriptions)
-        self.message_bot = MessageBot(self.bot, self.channel_manager)
+        self.message_bot = MessageBot(self.bot, self.channel_manager, signal_export=self.config.signal_export)
 
     async def setup(self):
         await self.bot.add_cog(self.message_bot)
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from lean_data import HIGH_RESOLUTIONS, LOW_RESOLUTIONS, concatenate_columns, get_columns, read_zip
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+SECURITY_TYPES = ('equity', 'forex', 'cfd', 'crypto', 'future')
+TICK_TYPES = ('trade', 'quote', 'openinterest')
+# hour/daily zips without the tick type in the name
+DEFAULT_TICK_TYPES = {'equity': 'trade', 'forex': 'quote', 'cfd': 'quote'}
+MANIFEST = '_manifest.json'
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_supported(security_type, resolution, tick_type):
+    try:
+        get_columns(security_type, resolution, tick_type)
+        return True
+    except ValueError:
+        return False
+
+
+def find_tasks(data_folder, security_types=SECURITY_TYPES, resolutions=HIGH_RESOLUTIONS + LOW_RESOLUTIONS, symbols=None):
+    """Walks the Lean data layout and groups the source zips into conversion tasks: one per
+    (security type, market, resolution, symbol, tick type, month) for daily zips, one per zip for hour/daily data"""
+    tasks = defaultdict(list)
+    for security_type in security_types:
+        security_folder = os.path.join(data_folder, security_type)
+        if not os.path.isdir(security_folder):
+            continue
+        for market in sorted(os.listdir(security_folder)):
+            for resolution in resolutions:
+                folder = os.path.join(security_folder, market, resolution)
+                if not os.path.isdir(folder):
+                    continue
+                if resolution in HIGH_RESOLUTIONS:
+                    for symbol in sorted(os.listdir(folder)):
+                        if (symbols and symbol not in symbols) or not os.path.isdir(os.path.join(folder, symbol)):
+                            continue
+                        for name in sorted(os.listdir(os.path.join(folder, symbol))):
+                            # {yyyyMMdd}_{tick type}.zip, other layouts (e.g. options) are not supported
+                            stem, extension = os.path.splitext(name)
+                            parts = stem.split('_')
+                            if extension != '.zip' or len(parts) != 2 or parts[1] not in TICK_TYPES or not parts[0].isdigit() \
+                                    or not is_supported(security_type, resolution, parts[1]):
+                                continue
+                            key = (security_type, market, resolution, symbol, parts[1], parts[0][:6])
+                            tasks[key].append(os.path.join(folder, symbol, name))
+                else:
+                    for name in sorted(os.listdir(folder)):
+                        stem, extension = os.path.splitext(name)
+                        if extension != '.zip':
+                            continue
+                        symbol, _, tick_type = stem.rpartition('_')
+                        if tick_type not in TICK_TYPES:
+                            symbol, tick_type = stem, DEFAULT_TICK_TYPES.get(security_type)
+                        if tick_type is None or (symbols and symbol not in symbols) or not is_supported(security_type, resolution, tick_type):
+                            continue
+                        tasks[(security_type, market, resolution, symbol, tick_type, None)].append(os.path.join(folder, name))
+    return tasks
+
+
+def partition_path(output_folder, security_type, market, resolution, symbol, tick_type, month, extension):
+    """Hive style partition: security_type=equity/market=usa/resolution=minute/symbol=spy/tick_type=trade/month=2013-10"""
+    return os.path.join(output_folder, f"security_type={security_type}", f"market={market}", f"resolution={resolution}",
+                        f"symbol={symbol}", f"tick_type={tick_type}", f"month={month}", f"part.{extension}")
+
+
+def write_partition(path, columns, output_format):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = path + '.tmp'
+    if output_format == 'parquet':
+        pq.write_table(pa.table(columns), temporary)
+    else:
+        with open(temporary, 'wb') as f:
+            np.savez(f, **columns)
+    os.replace(temporary, path)
+
+
+def convert_task(key, sources, output_folder, output_format):
+    """Decodes the sources of a task and writes one partition per month.
+    Returns the task key, written partitions, rows converted and an error message if the task failed"""
+    security_type, market, resolution, symbol, tick_type, _ = key
+    try:
+        parts = []
+        for source in sources:
+            day = None
+            if resolution in HIGH_RESOLUTIONS:
+                day = datetime.strptime(os.path.basename(source)[:8], '%Y%m%d').date()
+            parts.append(read_zip(source, security_type, resolution, tick_type, day))
+        columns = concatenate_columns(parts)
+
+        months = columns['time'].astype('datetime64[M]')
+        # rows are time ordered, each month is a contiguous range
+        boundaries = np.flatnonzero(months[1:] != months[:-1]) + 1
+        starts = np.concatenate([[0], boundaries])
+        stops = np.concatenate([boundaries, [len(months)]])
+        partitions = []
+        for start, stop in zip(starts, stops):
+            if start == stop:
+                continue
+            path = partition_path(output_folder, security_type, market, resolution, symbol, tick_type, str(months[start]), output_format)
+            write_partition(path, {name: column[start:stop] for name, column in columns.items()}, output_format)
+            partitions.append(os.path.relpath(path, output_folder))
+        return key, partitions, len(months), None
+    except Exception as e:
+        return key, [], 0, f"{type(e).__name__}: {e}"
+
+
+class LeanDataConverter:
+    """Converts the Lean data folder into a partitioned columnar dataset. A manifest in the output folder records
+    each converted source's modification time, size and hash so re-runs only convert the tasks whose sources changed"""
+
+    def __init__(self, data_folder, output_folder, output_format=None, workers=None):
+        if output_format is None:
+            output_format = 'parquet' if pa is not None else 'npz'
+        if output_format == 'parquet' and pa is None:
+            raise ValueError("Parquet output requires pyarrow, install it or use the npz format")
+        self.data_folder = data_folder
+        self.output_folder = output_folder
+        self.output_format = output_format
+        self.workers = workers or os.cpu_count()
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        path = os.path.join(self.output_folder, MANIFEST)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('format') == self.output_format:
+                return manifest
+        return {'format': self.output_format, 'sources': {}}
+
+    def _save_manifest(self):
+        os.makedirs(self.output_folder, exist_ok=True)
+        path = os.path.join(self.output_folder, MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(path + '.tmp', path)
+
+    def _is_unchanged(self, source):
+        """Compares the source with the manifest, by modification time and size first then by content hash"""
+        record = self.manifest['sources'].get(os.path.relpath(source, self.data_folder))
+        if record is None:
+            return False
+        stat = os.stat(source)
+        if record['mtime'] == stat.st_mtime and record['size'] == stat.st_size:
+            return True
+        if record['size'] == stat.st_size and record['sha1'] == file_hash(source):
+            # touched but identical, remember the new time so the hash is not computed again
+            record['mtime'] = stat.st_mtime
+            return True
+        return False
+
+    def _record(self, source):
+        stat = os.stat(source)
+        self.manifest['sources'][os.path.relpath(source, self.data_folder)] = {
+            'mtime': stat.st_mtime, 'size': stat.st_size, 'sha1': file_hash(source)}
+
+    def run(self, security_types=SECURITY_TYPES, resolutions=HIGH_RESOLUTIONS + LOW_RESOLUTIONS, symbols=None):
+        """Converts the changed tasks in a process pool. Returns a summary with the throughput in rows/s"""
+        tasks = find_tasks(self.data_folder, security_types, resolutions, symbols)
+        pending = {key: sources for key, sources in tasks.items() if not all(self._is_unchanged(source) for source in sources)}
+        logging.info(f"{len(pending)} of {len(tasks)} tasks to convert with {self.workers} workers into {self.output_format}")
+
+        summary = {'tasks': len(tasks), 'converted': 0, 'skipped': len(tasks) - len(pending), 'failed': 0,
+                   'partitions': 0, 'rows': 0, 'seconds': 0.0, 'rows_per_second': 0.0, 'errors': {}}
+        start = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(convert_task, key, sources, self.output_folder, self.output_format)
+                           for key, sources in pending.items()]
+                for future in as_completed(futures):
+                    key, partitions, rows, error = future.result()
+                    name = '/'.join(part for part in key if part)
+                    if error:
+                        summary['failed'] += 1
+                        summary['errors'][name] = error
+                        logging.warning(f"Failed to convert {name}: {error}")
+                        continue
+                    for source in pending[key]:
+                        self._record(source)
+                    summary['converted'] += 1
+                    summary['partitions'] += len(partitions)
+                    summary['rows'] += rows
+        finally:
+            # keep the progress of interrupted runs
+            self._save_manifest()
+
+        summary['seconds'] = time.perf_counter() - start
+        if summary['seconds'] > 0:
+            summary['rows_per_second'] = summary['rows'] / summary['seconds']
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converts the Lean data folder into a partitioned Parquet (or npz) dataset")
+    parser.add_argument("data_folder", help="Lean data folder, e.g. QuantConnectLEAN/Lean/Data")
+    parser.add_argument("output_folder", help="destination of the partitioned dataset")
+    parser.add_argument("--format", choices=['parquet', 'npz'], default=None, help="defaults to parquet when pyarrow is installed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to the cpu count")
+    parser.add_argument("--security-type", action="append", choices=SECURITY_TYPES, help="security types to convert, defaults to all")
+    parser.add_argument("--resolution", action="append", choices=HIGH_RESOLUTIONS + LOW_RESOLUTIONS, help="resolutions to convert, defaults to all")
+    parser.add_argument("--symbol", action="append", help="symbols to convert, defaults to all")
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    converter = LeanDataConverter(arguments.data_folder, arguments.output_folder, arguments.format, arguments.workers)
+    summary = converter.run(tuple(arguments.security_type or SECURITY_TYPES),
+                            tuple(arguments.resolution or HIGH_RESOLUTIONS + LOW_RESOLUTIONS),
+                            {symbol.lower() for symbol in arguments.symbol} if arguments.symbol else None)
+    print(f"Converted {summary['converted']} tasks ({summary['partitions']} partitions), skipped {summary['skipped']} unchanged, "
+          f"failed {summary['failed']}: {summary['rows']} rows in {summary['seconds']:.2f}s, {summary['rows_per_second']:.0f} rows/s")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
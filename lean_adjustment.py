@@ -0,0 +1,185 @@
+import os
+from datetime import date, datetime
+
+import numpy as np
+
+from lean_data import PRICE_COLUMNS, concatenate_columns
+
+RAW = 'raw'
+ADJUSTED = 'adjusted'
+SPLIT_ADJUSTED = 'split_adjusted'
+MODES = (RAW, ADJUSTED, SPLIT_ADJUSTED)
+
+# sizes are scaled by the inverse of the split factor, like the engine does for volume
+VOLUME_COLUMNS = frozenset(['volume', 'quantity', 'bid_size', 'ask_size'])
+
+
+def _parse_dates(values):
+    return np.array([datetime.strptime(value, '%Y%m%d').date() for value in values], dtype='datetime64[D]')
+
+
+def _days(times):
+    return np.asarray(times).astype('datetime64[D]')
+
+
+class FactorFile:
+    """Split and dividend factors of a symbol as sorted arrays. A row applies to the dates up to and including
+    its own date, after the last row the factors are 1"""
+
+    def __init__(self, dates, price_factors, split_factors, reference_prices=None):
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        # trailing 1 for the dates after the last row
+        self.price_factors = np.append(np.asarray(price_factors, dtype=np.float64), 1.0)
+        self.split_factors = np.append(np.asarray(split_factors, dtype=np.float64), 1.0)
+        self.reference_prices = np.asarray(reference_prices if reference_prices is not None else np.zeros(len(self.dates)), dtype=np.float64)
+
+    @classmethod
+    def load(cls, path):
+        rows = np.loadtxt(path, delimiter=',', dtype=[('date', 'U8'), ('price', 'f8'), ('split', 'f8'), ('reference', 'f8')],
+                          usecols=range(4), ndmin=1)
+        order = np.argsort(rows['date'], kind='stable')
+        rows = rows[order]
+        return cls(_parse_dates(rows['date']), rows['price'], rows['split'], rows['reference'])
+
+    def _rows(self, times):
+        return np.searchsorted(self.dates, _days(times), side='left')
+
+    def scale_factors(self, times, mode):
+        """Price scale factor of each time for the normalization mode"""
+        if mode == RAW:
+            return np.ones(len(times))
+        rows = self._rows(times)
+        if mode == SPLIT_ADJUSTED:
+            return self.split_factors[rows]
+        if mode == ADJUSTED:
+            return self.price_factors[rows] * self.split_factors[rows]
+        raise ValueError(f"Unsupported normalization mode: {mode}")
+
+    def adjust(self, columns, mode):
+        """Returns a copy of the columns with prices scaled and sizes divided by the split factor"""
+        if mode not in MODES:
+            raise ValueError(f"Unsupported normalization mode: {mode}")
+        if mode == RAW:
+            return dict(columns)
+        rows = self._rows(columns['time'])
+        splits = self.split_factors[rows]
+        prices = splits if mode == SPLIT_ADJUSTED else self.price_factors[rows] * splits
+
+        result = {}
+        for name, column in columns.items():
+            if name in PRICE_COLUMNS:
+                result[name] = column * prices
+            elif name in VOLUME_COLUMNS:
+                result[name] = column / splits
+            else:
+                result[name] = column
+        return result
+
+
+class MapFile:
+    """Ticker history of a security: each row's ticker is used up to and including its date"""
+
+    def __init__(self, permtick, dates, tickers):
+        self.permtick = permtick
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.tickers = np.asarray(tickers)
+
+    @classmethod
+    def load(cls, path):
+        rows = np.loadtxt(path, delimiter=',', dtype=[('date', 'U8'), ('ticker', 'U32')], usecols=(0, 1), ndmin=1)
+        order = np.argsort(rows['date'], kind='stable')
+        rows = rows[order]
+        permtick = os.path.splitext(os.path.basename(path))[0]
+        return cls(permtick, _parse_dates(rows['date']), np.char.lower(rows['ticker']))
+
+    @property
+    def first_date(self):
+        return self.dates[0]
+
+    @property
+    def last_date(self):
+        return self.dates[-1]
+
+    def tickers_at(self, times):
+        """Ticker in use at each time, None outside of the map file range"""
+        days = _days(times)
+        tickers = np.append(self.tickers, None).astype(object)[np.searchsorted(self.dates, days, side='left')]
+        tickers[days < self.first_date] = None
+        return tickers
+
+    def ticker_at(self, day):
+        return self.tickers_at(np.array([day], dtype='datetime64[D]'))[0]
+
+    def segments(self, start, end):
+        """(ticker, start, end) ranges of the tickers used between start and end, inclusive"""
+        start = max(np.datetime64(start, 'D'), self.first_date)
+        end = min(np.datetime64(end, 'D'), self.last_date)
+        result = []
+        row = int(np.searchsorted(self.dates, start, side='left'))
+        while start <= end and row < len(self.dates):
+            stop = min(self.dates[row], end)
+            # consecutive rows can keep the same ticker (e.g. an exchange change)
+            if result and result[-1][0] == self.tickers[row]:
+                result[-1] = (result[-1][0], result[-1][1], stop.astype(date))
+            else:
+                result.append((str(self.tickers[row]), start.astype(date), stop.astype(date)))
+            start = self.dates[row] + np.timedelta64(1, 'D')
+            row += 1
+        return result
+
+
+class AdjustmentEngine:
+    """Loads the factor and map files of a market once and applies them to columnar data"""
+
+    def __init__(self, data_folder, market='usa', security_type='equity'):
+        folder = os.path.join(data_folder, security_type, market)
+        self.factor_files = self._load_folder(os.path.join(folder, 'factor_files'), FactorFile.load)
+        self.map_files = self._load_folder(os.path.join(folder, 'map_files'), MapFile.load)
+
+        # ticker -> [(first date, last date, permtick)] to resolve historical tickers
+        self._ticker_index = {}
+        for permtick, map_file in self.map_files.items():
+            for ticker, start, end in map_file.segments(map_file.first_date.astype(date), map_file.last_date.astype(date)):
+                self._ticker_index.setdefault(ticker, []).append((np.datetime64(start, 'D'), np.datetime64(end, 'D'), permtick))
+
+    @staticmethod
+    def _load_folder(folder, load):
+        if not os.path.isdir(folder):
+            return {}
+        return {os.path.splitext(name)[0]: load(os.path.join(folder, name))
+                for name in sorted(os.listdir(folder)) if name.endswith('.csv')}
+
+    def resolve(self, ticker, day):
+        """Permtick (the map file name) of the security trading as ticker on the day, the ticker itself if unknown"""
+        day = np.datetime64(day, 'D')
+        for start, end, permtick in self._ticker_index.get(ticker.lower(), []):
+            if start <= day <= end:
+                return permtick
+        return ticker.lower()
+
+    def adjust(self, permtick, columns, mode):
+        """Applies the permtick's factors to the columns, unchanged when it has no factor file"""
+        if mode not in MODES:
+            raise ValueError(f"Unsupported normalization mode: {mode}")
+        factor_file = self.factor_files.get(permtick.lower())
+        if factor_file is None or mode == RAW:
+            return dict(columns)
+        return factor_file.adjust(columns, mode)
+
+    def query(self, cache, permtick, resolution, tick_type, start, end, mode=ADJUSTED, market='usa'):
+        """Reads the permtick's data through a lean_data.LeanDataCache following its ticker history, then adjusts it"""
+        map_file = self.map_files.get(permtick.lower())
+        start_day = start.date() if isinstance(start, datetime) else start
+        end_day = end.date() if isinstance(end, datetime) else end
+        segments = map_file.segments(start_day, end_day) if map_file else []
+        if not segments:
+            segments = [(permtick.lower(), start_day, end_day)]
+
+        parts = []
+        for ticker, segment_start, segment_end in segments:
+            # keep the time of day bounds on the first and last segment
+            lower = start if segment_start == start_day else segment_start
+            upper = end if segment_end == end_day else segment_end
+            parts.append(cache.query('equity', market, resolution, ticker, tick_type, lower, upper))
+        columns = concatenate_columns(parts)
+        return self.adjust(permtick, columns, mode)
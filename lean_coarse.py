@@ -0,0 +1,171 @@
+import io
+import os
+import json
+import logging
+from datetime import datetime
+
+import numpy as np
+
+# sid, ticker, close, volume, dollar volume, has fundamental data, price factor, split factor
+COARSE_DTYPE = [('sid', 'S32'), ('ticker', 'S16'), ('close', 'f8'), ('volume', 'f8'), ('dollar_volume', 'f8'),
+                ('has_fundamental_data', 'S5'), ('price_factor', 'f8'), ('split_factor', 'f8')]
+COARSE_COLUMNS = [name for name, _ in COARSE_DTYPE] + ['rank']
+
+
+def decode_coarse(data):
+    """Decodes a coarse csv into columns sorted by descending dollar volume, with the 0 based dollar volume rank"""
+    rows = np.loadtxt(io.BytesIO(data), delimiter=',', dtype=COARSE_DTYPE, ndmin=1, comments=None)
+    # stable on the negated value keeps the file order between equal dollar volumes
+    order = np.argsort(-rows['dollar_volume'], kind='stable')
+    rows = rows[order]
+    result = {name: np.ascontiguousarray(rows[name]) for name, _ in COARSE_DTYPE}
+    result['has_fundamental_data'] = rows['has_fundamental_data'] == b'True'
+    result['rank'] = np.arange(len(rows), dtype=np.int32)
+    return result
+
+
+class CoarseStore:
+    """Date indexed store of the coarse universe files.
+
+    Every day is stored ranked by dollar volume in one raw binary file per column, so the top N of a day is a slice.
+    A second column holds, per day, the rows with fundamental data in rank order, making the top N of those a
+    slice as well. Days are decoded once and again when the source file's modification time changes. New days are
+    appended at the end of the files, a day decoded again is appended as well and its old rows, like the rows of
+    removed days, are left unused until they make up half of the files, which are then compacted."""
+
+    VERSION = 2
+
+    def __init__(self, data_folder, cache_folder, market='usa'):
+        self.source_folder = os.path.join(data_folder, 'equity', market, 'fundamental', 'coarse')
+        self.folder = os.path.join(cache_folder, 'equity', market, 'fundamental', 'coarse')
+        self._index = None
+        self._columns = None
+
+    def _load_index(self):
+        path = os.path.join(self.folder, 'index.json')
+        if not os.path.exists(path):
+            return {'days': {}}
+        with open(path, 'r') as f:
+            index = json.load(f)
+        # written by an older version, decoded again
+        return index if index.get('version') == self.VERSION else {'days': {}}
+
+    def _save_index(self, index):
+        with open(os.path.join(self.folder, 'index.json.tmp'), 'w') as f:
+            json.dump(index, f)
+        os.replace(os.path.join(self.folder, 'index.json.tmp'), os.path.join(self.folder, 'index.json'))
+
+    def _load_columns(self, index):
+        lengths = {name: index.get('rows', 0) for name in COARSE_COLUMNS}
+        lengths['fundamental_rows'] = index.get('fundamental_rows', 0)
+        return {name: np.memmap(os.path.join(self.folder, f"{name}.bin"), dtype=np.dtype(dtype), mode='r', shape=(lengths[name],))
+                if lengths[name] else np.empty(0, dtype=np.dtype(dtype)) for name, dtype in index.get('columns', {}).items()}
+
+    def update(self):
+        """Decodes the coarse files that are new or changed since the last update and appends them"""
+        index = self._load_index()
+        days = index['days']
+        sources = {}
+        if os.path.isdir(self.source_folder):
+            sources = {name[:8]: os.path.join(self.source_folder, name)
+                       for name in os.listdir(self.source_folder) if name.endswith('.csv') and name[:8].isdigit()}
+        stale = sorted(key for key, path in sources.items() if key not in days or days[key][4] != os.path.getmtime(path))
+        removed = [key for key in days if key not in sources]
+        if not stale and not removed:
+            self._set(index)
+            return index
+
+        logging.info(f"Caching {len(stale)} coarse files")
+        parts = []
+        for key in stale:
+            with open(sources[key], 'rb') as f:
+                parts.append((key, decode_coarse(f.read()), os.path.getmtime(sources[key])))
+        rows = index.get('rows', 0)
+        fundamental_rows = index.get('fundamental_rows', 0)
+        columns = index.get('columns') or {name: parts[0][1][name].dtype.str for name in COARSE_COLUMNS}
+        columns['fundamental_rows'] = np.dtype(np.int64).str
+
+        os.makedirs(self.folder, exist_ok=True)
+        for name, dtype in columns.items():
+            with open(os.path.join(self.folder, f"{name}.bin"), 'ab') as f:
+                # drop rows written by an update that did not get to save its index
+                f.truncate((fundamental_rows if name == 'fundamental_rows' else rows) * np.dtype(dtype).itemsize)
+                row = rows
+                for key, part, mtime in parts:
+                    if name == 'fundamental_rows':
+                        f.write((row + np.flatnonzero(part['has_fundamental_data'])).astype(np.dtype(dtype)).tobytes())
+                    else:
+                        f.write(np.ascontiguousarray(part[name], dtype=np.dtype(dtype)).tobytes())
+                    row += len(part['rank'])
+        for key, part, mtime in parts:
+            count = len(part['rank'])
+            fundamental = int(np.count_nonzero(part['has_fundamental_data']))
+            days[key] = [rows, rows + count, fundamental_rows, fundamental_rows + fundamental, mtime]
+            rows += count
+            fundamental_rows += fundamental
+        for key in removed:
+            del days[key]
+
+        self._columns = None
+        index = {'version': self.VERSION, 'columns': columns, 'rows': rows, 'fundamental_rows': fundamental_rows, 'days': days}
+        if rows > 2 * sum(stop - begin for begin, stop, _, _, _ in days.values()):
+            index = self._compact(index)
+        self._save_index(index)
+        self._set(index)
+        return index
+
+    def _compact(self, index):
+        """Rewrites the columns without the rows of days decoded again or removed, days in date order"""
+        columns = self._load_columns(index)
+        days = {}
+        row = fundamental_row = 0
+        for key, (begin, stop, fundamental_begin, fundamental_stop, mtime) in sorted(index['days'].items()):
+            days[key] = [row, row + stop - begin, fundamental_row, fundamental_row + fundamental_stop - fundamental_begin, mtime]
+            row += stop - begin
+            fundamental_row += fundamental_stop - fundamental_begin
+        for name, column in columns.items():
+            path = os.path.join(self.folder, f"{name}.bin")
+            with open(path + '.tmp', 'wb') as f:
+                for key, (begin, stop, fundamental_begin, fundamental_stop, mtime) in sorted(index['days'].items()):
+                    if name == 'fundamental_rows':
+                        # rows of the day move along with it
+                        f.write((column[fundamental_begin:fundamental_stop] + (days[key][0] - begin)).tobytes())
+                    else:
+                        f.write(column[begin:stop].tobytes())
+            os.replace(path + '.tmp', path)
+        return dict(index, rows=row, fundamental_rows=fundamental_row, days=days)
+
+    def _set(self, index):
+        self._index = index
+        self._columns = self._load_columns(index)
+
+    def _day(self, day):
+        if self._index is None:
+            self.update()
+        return self._index['days'].get(f"{day:%Y%m%d}")
+
+    def dates(self):
+        """Sorted dates available in the store"""
+        if self._index is None:
+            self.update()
+        return [datetime.strptime(key, '%Y%m%d').date() for key in sorted(self._index['days'])]
+
+    def get(self, day):
+        """All the coarse rows of the day ranked by dollar volume, as memory-mapped slices"""
+        entry = self._day(day)
+        if entry is None:
+            return None
+        begin, stop = entry[0], entry[1]
+        return {name: self._columns[name][begin:stop] for name in COARSE_COLUMNS}
+
+    def top(self, day, count, has_fundamental_data=False):
+        """The count rows of the day with the highest dollar volume, optionally only those with fundamental data"""
+        entry = self._day(day)
+        if entry is None:
+            return None
+        begin, stop, fundamental_begin, fundamental_stop, _ = entry
+        if not has_fundamental_data:
+            stop = min(stop, begin + count)
+            return {name: self._columns[name][begin:stop] for name in COARSE_COLUMNS}
+        rows = self._columns['fundamental_rows'][fundamental_begin:min(fundamental_stop, fundamental_begin + count)]
+        return {name: self._columns[name][rows] for name in COARSE_COLUMNS}
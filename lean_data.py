@@ -0,0 +1,280 @@
+import io
+import os
+import json
+import zipfile
+import logging
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+# Equity and option prices are stored as integers in deci-cents
+PRICE_SCALE = 10000
+SCALED_SECURITY_TYPES = ('equity', 'option')
+HIGH_RESOLUTIONS = ('tick', 'second', 'minute')
+LOW_RESOLUTIONS = ('hour', 'daily')
+
+BAR_COLUMNS = {
+    'trade': ['open', 'high', 'low', 'close', 'volume'],
+    'quote': ['bid_open', 'bid_high', 'bid_low', 'bid_close', 'bid_size',
+              'ask_open', 'ask_high', 'ask_low', 'ask_close', 'ask_size'],
+    'openinterest': ['open_interest'],
+}
+
+TICK_COLUMNS = {
+    ('equity', 'trade'): ['price', 'quantity', 'exchange', 'condition', 'suspicious'],
+    ('equity', 'quote'): ['bid_price', 'bid_size', 'ask_price', 'ask_size', 'exchange', 'condition', 'suspicious'],
+    ('forex', 'quote'): ['bid_price', 'ask_price'],
+    ('cfd', 'quote'): ['bid_price', 'ask_price'],
+    ('crypto', 'trade'): ['price', 'quantity'],
+    ('crypto', 'quote'): ['bid_price', 'bid_size', 'ask_price', 'ask_size'],
+    ('future', 'trade'): ['price', 'quantity'],
+    ('future', 'openinterest'): ['open_interest'],
+}
+
+PRICE_COLUMNS = frozenset(['open', 'high', 'low', 'close', 'price', 'bid_price', 'ask_price',
+                           'bid_open', 'bid_high', 'bid_low', 'bid_close',
+                           'ask_open', 'ask_high', 'ask_low', 'ask_close'])
+
+TEXT_COLUMNS = {'exchange': 'S8', 'condition': 'S16'}
+
+
+def get_columns(security_type, resolution, tick_type):
+    if resolution == 'tick':
+        columns = TICK_COLUMNS.get((security_type, tick_type))
+    else:
+        columns = BAR_COLUMNS.get(tick_type)
+    if columns is None:
+        raise ValueError(f"Unsupported data: {security_type} {resolution} {tick_type}")
+    return columns
+
+
+def get_source_path(data_folder, security_type, market, resolution, symbol, tick_type, day=None):
+    """Path of the zip holding the data, day is required for tick, second and minute resolution"""
+    folder = os.path.join(data_folder, security_type, market, resolution)
+    symbol = symbol.lower()
+    if resolution in HIGH_RESOLUTIONS:
+        return os.path.join(folder, symbol, f"{day:%Y%m%d}_{tick_type}.zip")
+    # equity hour/daily are trade only and forex/cfd quote only, they don't carry the tick type in the name
+    path = os.path.join(folder, f"{symbol}_{tick_type}.zip")
+    return path if os.path.exists(path) else os.path.join(folder, f"{symbol}.zip")
+
+
+def list_source_dates(data_folder, security_type, market, resolution, symbol, tick_type):
+    """Sorted dates of the daily zips available for a high resolution symbol"""
+    folder = os.path.join(data_folder, security_type, market, resolution, symbol.lower())
+    suffix = f"_{tick_type}.zip"
+    if not os.path.isdir(folder):
+        return []
+    return sorted(datetime.strptime(name[:8], '%Y%m%d').date() for name in os.listdir(folder) if name.endswith(suffix))
+
+
+def _parse_bar_times(stamps):
+    """Vectorized parse of 'yyyyMMdd HH:mm' byte strings into datetime64[ms]"""
+    digits = np.ascontiguousarray(stamps, dtype="S14").view(np.uint8).reshape(len(stamps), 14).astype(np.int64) - ord('0')
+    years = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    months = digits[:, 4] * 10 + digits[:, 5]
+    days = digits[:, 6] * 10 + digits[:, 7]
+    minutes = (digits[:, 9] * 10 + digits[:, 10]) * 60 + digits[:, 12] * 10 + digits[:, 13]
+    month_starts = ((years - 1970) * 12 + months - 1).astype('datetime64[M]')
+    return (month_starts.astype('datetime64[D]') + (days - 1).astype('timedelta64[D]')).astype('datetime64[ms]') \
+        + (minutes * 60000).astype('timedelta64[ms]')
+
+
+def decode_csv(data, security_type, resolution, tick_type, day=None):
+    """Decodes the content of a Lean csv into a dict of typed NumPy columns, 'time' being datetime64[ms]
+    in the data time zone. Prices are unscaled to floats"""
+    columns = get_columns(security_type, resolution, tick_type)
+    time_dtype = 'S14' if resolution in LOW_RESOLUTIONS else 'f8'
+    dtype = [('time', time_dtype)] + [(name, TEXT_COLUMNS.get(name, 'f8')) for name in columns]
+
+    # some files leave trailing fields empty (e.g. crypto volume), loadtxt needs a value
+    if b',\n' in data or b',,' in data or data.endswith(b','):
+        data = data.replace(b',,', b',0,').replace(b',,', b',0,').replace(b',\r\n', b',0\r\n').replace(b',\n', b',0\n')
+        if data.endswith(b','):
+            data += b'0'
+
+    rows = np.loadtxt(io.BytesIO(data), delimiter=',', dtype=dtype, ndmin=1, usecols=range(len(dtype)))
+
+    result = {}
+    if resolution in LOW_RESOLUTIONS:
+        result['time'] = _parse_bar_times(rows['time'])
+    else:
+        result['time'] = np.datetime64(day, 'ms') + rows['time'].astype(np.int64).astype('timedelta64[ms]')
+
+    scaled = security_type in SCALED_SECURITY_TYPES
+    for name in columns:
+        column = rows[name]
+        if name == 'suspicious':
+            column = column.astype(np.bool_)
+        elif scaled and name in PRICE_COLUMNS:
+            column = column / PRICE_SCALE
+        result[name] = np.ascontiguousarray(column)
+    return result
+
+
+def _empty_columns(security_type, resolution, tick_type):
+    columns = get_columns(security_type, resolution, tick_type)
+    result = {'time': np.empty(0, dtype='datetime64[ms]')}
+    for name in columns:
+        result[name] = np.empty(0, dtype=np.bool_ if name == 'suspicious' else TEXT_COLUMNS.get(name, 'f8'))
+    return result
+
+
+def concatenate_columns(parts):
+    names = list(parts[0].keys())
+    return {name: np.concatenate([part[name] for part in parts]) for name in names}
+
+
+def read_zip(path, security_type, resolution, tick_type, day=None):
+    """Decodes a Lean zip. Entries holding a single contract (futures) get an extra 'expiry' column taken
+    from the entry name, and zips with several of them are merged into a single time ordered set of columns"""
+    with zipfile.ZipFile(path) as archive:
+        parts = []
+        for name in archive.namelist():
+            if not name.endswith('.csv'):
+                continue
+            part = decode_csv(archive.read(name), security_type, resolution, tick_type, day)
+            # {date}_{symbol}_{resolution}_{tick type}_{contract month}_{expiry}.csv
+            fields = name[:-4].split('_')
+            if len(fields) > 4:
+                expiry = np.datetime64(datetime.strptime(fields[-1], '%Y%m%d').date(), 'D')
+                part['expiry'] = np.full(len(part['time']), expiry)
+            parts.append(part)
+
+    if not parts:
+        return _empty_columns(security_type, resolution, tick_type)
+    if len(parts) == 1:
+        return parts[0]
+    result = concatenate_columns(parts)
+    order = np.argsort(result['time'], kind='stable')
+    return {name: column[order] for name, column in result.items()}
+
+
+class LeanDataCache:
+    """Serves Lean data as NumPy columns from a memory-mapped cache.
+
+    Each (security type, market, resolution, symbol, tick type) is stored as one raw binary file per column, with
+    an index.json holding the column dtypes and mapping each source date to its row range. Decoded days are
+    appended at the end of the files, so updating the cache costs the new days only. A day decoded again because
+    its source changed is appended as well, its old rows are left unused until they make up half of the files,
+    which are then compacted. Date-range queries over consecutive rows are zero-copy slices of the memory-mapped
+    columns. Source zips are decoded on first use and again when their modification time changes."""
+
+    VERSION = 2
+
+    def __init__(self, data_folder, cache_folder):
+        self.data_folder = data_folder
+        self.cache_folder = cache_folder
+
+    def _key_folder(self, security_type, market, resolution, symbol, tick_type):
+        return os.path.join(self.cache_folder, security_type, market, resolution, symbol.lower(), tick_type)
+
+    def _load_index(self, folder):
+        path = os.path.join(folder, 'index.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r') as f:
+            index = json.load(f)
+        # written by an older version, decoded again
+        return index if index.get('version') == self.VERSION else {}
+
+    def _save_index(self, folder, index):
+        with open(os.path.join(folder, 'index.json.tmp'), 'w') as f:
+            json.dump(index, f)
+        os.replace(os.path.join(folder, 'index.json.tmp'), os.path.join(folder, 'index.json'))
+
+    def _load_columns(self, folder, index):
+        rows = index.get('rows', 0)
+        return {name: np.memmap(os.path.join(folder, f"{name}.bin"), dtype=np.dtype(dtype), mode='r', shape=(rows,))
+                if rows else np.empty(0, dtype=np.dtype(dtype)) for name, dtype in index.get('columns', {}).items()}
+
+    def _sources(self, security_type, market, resolution, symbol, tick_type, start, end):
+        """(key, day, path) of the source zips covering the range"""
+        if resolution in LOW_RESOLUTIONS:
+            path = get_source_path(self.data_folder, security_type, market, resolution, symbol, tick_type)
+            return [('all', None, path)] if os.path.exists(path) else []
+        days = list_source_dates(self.data_folder, security_type, market, resolution, symbol, tick_type)
+        return [(f"{day:%Y%m%d}", day, get_source_path(self.data_folder, security_type, market, resolution, symbol, tick_type, day))
+                for day in days if start <= day <= end]
+
+    def update(self, security_type, market, resolution, symbol, tick_type, start=date.min, end=date.max):
+        """Decodes the source zips in the range that are missing or stale in the cache and appends them"""
+        folder = self._key_folder(security_type, market, resolution, symbol, tick_type)
+        index = self._load_index(folder)
+        segments = index.get('segments', {})
+
+        stale = [(key, day, path) for key, day, path in self._sources(security_type, market, resolution, symbol, tick_type, start, end)
+                 if key not in segments or segments[key][2] != os.path.getmtime(path)]
+        if not stale:
+            return index
+
+        logging.info(f"Caching {len(stale)} files of {symbol} {resolution} {tick_type}")
+        parts = [(key, read_zip(path, security_type, resolution, tick_type, day), os.path.getmtime(path)) for key, day, path in stale]
+        columns = index.get('columns') or {name: column.dtype.str for name, column in parts[0][1].items()}
+        rows = index.get('rows', 0)
+
+        os.makedirs(folder, exist_ok=True)
+        for name, dtype in columns.items():
+            with open(os.path.join(folder, f"{name}.bin"), 'ab') as f:
+                # drop rows written by an update that did not get to save its index
+                f.truncate(rows * np.dtype(dtype).itemsize)
+                for key, part, mtime in parts:
+                    f.write(np.ascontiguousarray(part[name], dtype=np.dtype(dtype)).tobytes())
+        for key, part, mtime in parts:
+            count = len(part['time'])
+            segments[key] = [rows, rows + count, mtime]
+            rows += count
+
+        index = {'version': self.VERSION, 'columns': columns, 'rows': rows, 'segments': segments}
+        if rows > 2 * sum(stop - begin for begin, stop, mtime in segments.values()):
+            index = self._compact(folder, index)
+        self._save_index(folder, index)
+        return index
+
+    def _compact(self, folder, index):
+        """Rewrites the columns without the rows of days decoded again, days in date order"""
+        columns = self._load_columns(folder, index)
+        segments = {}
+        row = 0
+        for key, (begin, stop, mtime) in sorted(index['segments'].items()):
+            segments[key] = [row, row + stop - begin, mtime]
+            row += stop - begin
+        for name, column in columns.items():
+            path = os.path.join(folder, f"{name}.bin")
+            with open(path + '.tmp', 'wb') as f:
+                for key, (begin, stop, mtime) in sorted(index['segments'].items()):
+                    f.write(column[begin:stop].tobytes())
+            os.replace(path + '.tmp', path)
+        return dict(index, rows=row, segments=segments)
+
+    def query(self, security_type, market, resolution, symbol, tick_type, start, end):
+        """Columns between start and end (dates or datetimes, inclusive) as read-only memory-mapped slices, copies
+        when the days are not stored next to each other"""
+        start_day = start.date() if isinstance(start, datetime) else start
+        end_day = end.date() if isinstance(end, datetime) else end
+        index = self.update(security_type, market, resolution, symbol, tick_type, start_day, end_day)
+        if not index.get('segments'):
+            return _empty_columns(security_type, resolution, tick_type)
+
+        folder = self._key_folder(security_type, market, resolution, symbol, tick_type)
+        columns = self._load_columns(folder, index)
+
+        if resolution in LOW_RESOLUTIONS:
+            rows = [index['segments']['all'][:2]]
+        else:
+            rows = [(begin, stop) for key, (begin, stop, mtime) in sorted(index['segments'].items())
+                    if start_day <= datetime.strptime(key, '%Y%m%d').date() <= end_day]
+            if not rows:
+                return {name: column[:0] for name, column in columns.items()}
+        if all(previous[1] == following[0] for previous, following in zip(rows, rows[1:])):
+            columns = {name: column[rows[0][0]:rows[-1][1]] for name, column in columns.items()}
+        else:
+            columns = {name: np.concatenate([column[begin:stop] for begin, stop in rows]) for name, column in columns.items()}
+
+        # narrow down to the requested times, rows are time ordered
+        lower = np.datetime64(start if isinstance(start, datetime) else datetime.combine(start, datetime.min.time()), 'ms')
+        upper = np.datetime64(end if isinstance(end, datetime) else datetime.combine(end, datetime.min.time()) + timedelta(days=1), 'ms')
+        times = columns['time']
+        first = int(np.searchsorted(times, lower, side='left'))
+        last = int(np.searchsorted(times, upper, side='right' if isinstance(end, datetime) else 'left'))
+        return {name: column[first:last] for name, column in columns.items()}
@@ -0,0 +1,216 @@
+import sys
+import json
+import time
+import heapq
+import asyncio
+import logging
+import argparse
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from bot import ChannelManager, SignalDispatcher
+from lean_data import LOW_RESOLUTIONS, get_source_path, list_source_dates, read_zip
+
+Bar = namedtuple('Bar', ['time', 'symbol', 'open', 'high', 'low', 'close', 'volume'])
+Signal = namedtuple('Signal', ['time', 'name', 'content'])
+
+
+class AllSignals:
+    """Channel signals list matching every signal"""
+
+    def __contains__(self, signal):
+        return True
+
+
+# a single channel taking every signal, with the defaults of !add_channel
+DEFAULT_CHANNELS = {"replay": {"signals": AllSignals(), "rate_limit": 5, "send_times": ["00:00"], "rate_limit_interval": 60}}
+
+
+def _symbol_bars(data_folder, security_type, market, resolution, symbol, start, end):
+    """Bars of a symbol in time order, decoded one source file at a time"""
+    if resolution in LOW_RESOLUTIONS:
+        sources = [(get_source_path(data_folder, security_type, market, resolution, symbol, 'trade'), None)]
+    else:
+        sources = [(get_source_path(data_folder, security_type, market, resolution, symbol, 'trade', day), day)
+                   for day in list_source_dates(data_folder, security_type, market, resolution, symbol, 'trade')
+                   if start <= day and (end is None or day <= end)]
+    lower = np.datetime64(start, 'ms')
+    upper = np.datetime64(end + timedelta(days=1), 'ms') if end is not None else None
+    for path, day in sources:
+        columns = read_zip(path, security_type, resolution, 'trade', day)
+        times = columns['time']
+        first = np.searchsorted(times, lower)
+        last = np.searchsorted(times, upper) if upper is not None else len(times)
+        rows = zip(times[first:last].astype(datetime), *(columns[name][first:last].tolist() for name in Bar._fields[2:]))
+        for row in rows:
+            yield Bar(row[0], symbol, *row[1:])
+
+
+def read_bars(data_folder, symbols, security_type='equity', market='usa', resolution='minute', start=date.min, end=None):
+    """Streams the trade bars of the symbols merged in time order, up to the end date included, None for no end"""
+    streams = [_symbol_bars(data_folder, security_type, market, resolution, symbol.lower(), start, end) for symbol in symbols]
+    return heapq.merge(*streams, key=lambda bar: bar.time)
+
+
+def crossover_signals(bars, fast=10, slow=30):
+    """Emits EMA_CROSS when a symbol's fast exponential moving average crosses its slow one"""
+    states = {}
+    fast_alpha, slow_alpha = 2 / (fast + 1), 2 / (slow + 1)
+    for bar in bars:
+        state = states.get(bar.symbol)
+        if state is None:
+            states[bar.symbol] = [bar.close, bar.close, 0, 0]
+            continue
+        state[0] += fast_alpha * (bar.close - state[0])
+        state[1] += slow_alpha * (bar.close - state[1])
+        state[3] += 1
+        direction = 1 if state[0] > state[1] else -1
+        if state[3] >= slow and direction != state[2]:
+            if state[2] != 0:
+                side = 'up' if direction > 0 else 'down'
+                yield Signal(bar.time, 'EMA_CROSS', f"{bar.symbol.upper()} crossed {side} at {bar.close:.2f} ({bar.time:%Y-%m-%d %H:%M})")
+            state[2] = direction
+
+
+def every_bar_signals(bars):
+    """Emits BAR for every bar, a worst case burst"""
+    for bar in bars:
+        yield Signal(bar.time, 'BAR', f"{bar.symbol.upper()} {bar.close:.2f} ({bar.time:%Y-%m-%d %H:%M})")
+
+
+SIGNAL_FUNCTIONS = {'crossover': crossover_signals, 'every_bar': every_bar_signals}
+
+
+class ReplayClock:
+    def __init__(self, start):
+        self.current = start
+
+    def __call__(self):
+        return self.current
+
+
+class FakeTransport:
+    """Records the messages instead of sending them to Discord"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.sent = []
+
+    async def send(self, channel_id, content):
+        self.sent.append((self.clock(), channel_id, content))
+
+
+class SignalReplay:
+    """Replays bars through a signal function and the bot's subscription and rate limit path on a simulated clock.
+    Held back messages are retried at every bar time, message counters are reset every simulated day like
+    MessageBot.reset_message_counters"""
+
+    def __init__(self, bars, signal_function, channels=None, max_pending=100, drain_step=timedelta(seconds=1), drain_limit=timedelta(days=1)):
+        channels = {channel_id: dict(config) for channel_id, config in (channels or DEFAULT_CHANNELS).items()}
+        self.bars = bars
+        self.signal_function = signal_function
+        self.clock = ReplayClock(datetime.min)
+        self.channel_manager = ChannelManager(channels, {}, clock=self.clock)
+        self.transport = FakeTransport(self.clock)
+        self.dispatcher = SignalDispatcher(self.channel_manager, self.transport, max_pending)
+        self.drain_step = drain_step
+        self.drain_limit = drain_limit
+        self._ticks = []
+        self._next_reset = None
+        self.bar_count = 0
+        self.signal_count = 0
+        self.start_time = None
+
+    def _tracked_bars(self):
+        for bar in self.bars:
+            self.bar_count += 1
+            self._ticks.append(bar.time)
+            yield bar
+
+    async def _advance(self, now):
+        """Moves the clock forward, resetting the counters daily and retrying the held back messages"""
+        if now <= self.clock.current:
+            return
+        if self._next_reset is None:
+            self.start_time = now
+            self._next_reset = now + timedelta(days=1)
+        while now >= self._next_reset:
+            self.clock.current = self._next_reset
+            self.channel_manager.reset_message_counters()
+            self._next_reset += timedelta(days=1)
+        self.clock.current = now
+        await self.dispatcher.flush()
+
+    async def run(self):
+        """Replays every bar and returns the report"""
+        started = time.perf_counter()
+        for signal in self.signal_function(self._tracked_bars()):
+            # bars read by the signal function before this signal
+            for tick in self._ticks:
+                await self._advance(tick)
+            self._ticks.clear()
+            await self._advance(signal.time)
+            self.signal_count += 1
+            await self.dispatcher.dispatch(signal.name, signal.content)
+
+        for tick in self._ticks:
+            await self._advance(tick)
+        end_time = self.clock.current
+        # let the held back messages go out, up to the drain limit
+        while self.dispatcher.pending_count() and self.clock.current - end_time < self.drain_limit:
+            await self._advance(self.clock.current + self.drain_step)
+
+        return self.report(time.perf_counter() - started, end_time)
+
+    def report(self, wall_seconds, end_time):
+        undelivered = self.dispatcher.pending_count()
+        simulated_seconds = (end_time - self.start_time).total_seconds() if self.start_time else 0
+        dispatcher = self.dispatcher
+        return {
+            'bars': self.bar_count,
+            'signals': self.signal_count,
+            'delivered': dispatcher.delivered,
+            'delivered_on_time': dispatcher.delivered - dispatcher.delayed,
+            'delayed': dispatcher.delayed,
+            'mean_delay_seconds': dispatcher.total_delay / dispatcher.delayed if dispatcher.delayed else 0,
+            'max_delay_seconds': dispatcher.max_delay,
+            'dropped': dispatcher.dropped + undelivered,
+            'undelivered': undelivered,
+            'wall_seconds': wall_seconds,
+            'bars_per_second': self.bar_count / wall_seconds if wall_seconds else 0,
+            'signals_per_second': self.signal_count / wall_seconds if wall_seconds else 0,
+            'clock_speedup': simulated_seconds / wall_seconds if wall_seconds else 0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays Lean data through a signal function and the bot's rate limits")
+    parser.add_argument("--data", default="QuantConnectLEAN/Lean/Data", help="Lean data folder")
+    parser.add_argument("--symbols", nargs="+", default=["SPY"])
+    parser.add_argument("--security-type", default="equity")
+    parser.add_argument("--market", default="usa")
+    parser.add_argument("--resolution", default="minute")
+    parser.add_argument("--start", type=lambda x: datetime.strptime(x, '%Y-%m-%d').date(), default=date.min)
+    parser.add_argument("--end", type=lambda x: datetime.strptime(x, '%Y-%m-%d').date(), default=None)
+    parser.add_argument("--signal", choices=sorted(SIGNAL_FUNCTIONS), default="crossover")
+    parser.add_argument("--config", default=None, help="bot config json whose channels are used, defaults to a single channel taking every signal")
+    parser.add_argument("--max-pending", type=int, default=100, help="messages held back per channel before dropping")
+    arguments = parser.parse_args()
+
+    channels = None
+    if arguments.config:
+        with open(arguments.config, 'r') as f:
+            channels = json.load(f)['channels']
+    bars = read_bars(arguments.data, arguments.symbols, arguments.security_type, arguments.market, arguments.resolution, arguments.start, arguments.end)
+    replay = SignalReplay(bars, SIGNAL_FUNCTIONS[arguments.signal], channels, arguments.max_pending)
+    report = asyncio.run(replay.run())
+    for key, value in report.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.ERROR)
+    sys.exit(main())
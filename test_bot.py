@@ -5,7 +5,7 @@ import discord
 import asyncio
 import json
 
-from bot import BotConfig, ChannelManager, MessageBot, DiscordBot  
+from bot import BotConfig, ChannelManager, MessageBot, DiscordBot, SignalDispatcher, SignalReceiver
 
 class TestDiscordBot(unittest.TestCase):
     @classmethod
@@ -71,6 +71,55 @@ class TestDiscordBot(unittest.TestCase):
         ctx.guild.create_text_channel.assert_awaited_with(channel_name)
         ctx.send.assert_awaited_with(f"Text channel '{channel_name}' created.")
 
+    def test_signal_receiver(self):
+        sent = []
+
+        class Transport:
+            async def send(self, channel_id, content):
+                sent.append((channel_id, content))
+
+        dispatcher = SignalDispatcher(self.bot.channel_manager, Transport())
+        receiver = SignalReceiver(dispatcher, port=0, max_message_length=80)
+        batches = [
+            {"algorithm": "Demo", "signal": "SIGNAL_1", "time": "2013-10-07T13:31:00",
+             "targets": [{"symbol": "SPY", "quantity": 0.5}, {"symbol": "IBM", "quantity": 0}],
+             "insights": [{"symbol": "SPY", "direction": 1, "period": 60, "magnitude": None, "confidence": 0.8, "source_model": ""}]},
+            {"algorithm": "Demo", "signal": "OTHER", "time": "2013-10-07T13:32:00", "targets": [{"symbol": "SPY", "quantity": 1}], "insights": []}
+        ]
+
+        async def run():
+            await receiver.start()
+            port = receiver.server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(''.join(json.dumps(batch) + '\n' for batch in batches).encode())
+            await writer.drain()
+            writer.close()
+            while receiver.batches < len(batches):
+                await asyncio.sleep(0.01)
+            await receiver.stop()
+
+        asyncio.run(run())
+        # the unsubscribed signal is not sent, the batch is split at the message length
+        self.assertEqual([channel_id for channel_id, _ in sent], ["12345", "12345"])
+        self.assertEqual(sent[0][1], "SIGNAL_1 2013-10-07T13:31:00 (Demo)\nSPY target 0.5\nIBM target 0")
+        self.assertEqual(sent[1][1], "SIGNAL_1 2013-10-07T13:31:00 (Demo)\nSPY up for 60s confidence 0.8")
+
+    def test_format_batch_splits_long_lines(self):
+        receiver = SignalReceiver(None, max_message_length=40)
+        batch = {"algorithm": "Demo", "signal": "S", "time": "T", "targets": [{"symbol": "X" * 60, "quantity": 1}], "insights": []}
+        messages = receiver.format_batch(batch)
+        self.assertTrue(all(len(message) <= 40 for message in messages))
+        self.assertEqual(''.join(message.split('\n', 1)[1] for message in messages), "X" * 60 + " target 1")
+
+    def test_save_config_without_signal_export(self):
+        import os
+        self.bot.config.config_file = 'test_saved_config.json'
+        self.bot.config.save_config()
+        with open('test_saved_config.json', 'r') as f:
+            saved = json.load(f)
+        os.remove('test_saved_config.json')
+        self.assertEqual(saved, self.config)
+
     @classmethod
     def tearDownClass(cls):
         import os
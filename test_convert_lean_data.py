@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+
+from convert_lean_data import LeanDataConverter, find_tasks
+from lean_data import read_zip
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'QuantConnectLEAN', 'Lean', 'Data')
+
+
+class TestConvertLeanData(unittest.TestCase):
+    def setUp(self):
+        # a small copy of the data folder so sources can be touched and modified
+        self.folder = tempfile.mkdtemp()
+        self.data_folder = os.path.join(self.folder, 'data')
+        self.output_folder = os.path.join(self.folder, 'output')
+        for path in [os.path.join('equity', 'usa', 'daily', 'spy.zip'),
+                     os.path.join('equity', 'usa', 'minute', 'spy', '20131007_trade.zip'),
+                     os.path.join('equity', 'usa', 'minute', 'spy', '20131008_trade.zip'),
+                     os.path.join('crypto', 'coinbase', 'daily', 'btcusd_trade.zip')]:
+            os.makedirs(os.path.dirname(os.path.join(self.data_folder, path)), exist_ok=True)
+            shutil.copy2(os.path.join(DATA_FOLDER, path), os.path.join(self.data_folder, path))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_find_tasks(self):
+        tasks = find_tasks(self.data_folder)
+        self.assertEqual(len(tasks[('equity', 'usa', 'minute', 'spy', 'trade', '201310')]), 2)
+        self.assertIn(('equity', 'usa', 'daily', 'spy', 'trade', None), tasks)
+        self.assertIn(('crypto', 'coinbase', 'daily', 'btcusd', 'trade', None), tasks)
+
+    def test_convert_partitions_by_month(self):
+        summary = LeanDataConverter(self.data_folder, self.output_folder, 'npz', workers=2).run()
+        self.assertEqual(summary['failed'], 0)
+        self.assertEqual(summary['converted'], 3)
+        self.assertGreater(summary['rows_per_second'], 0)
+
+        partition = os.path.join(self.output_folder, 'security_type=equity', 'market=usa', 'resolution=minute', 'symbol=spy',
+                                 'tick_type=trade', 'month=2013-10', 'part.npz')
+        with np.load(partition) as columns:
+            first_day = read_zip(os.path.join(self.data_folder, 'equity', 'usa', 'minute', 'spy', '20131007_trade.zip'),
+                                 'equity', 'minute', 'trade', date(2013, 10, 7))
+            np.testing.assert_array_equal(columns['close'][:len(first_day['close'])], first_day['close'])
+
+        daily = os.path.join(self.output_folder, 'security_type=equity', 'market=usa', 'resolution=daily', 'symbol=spy', 'tick_type=trade')
+        with np.load(os.path.join(daily, 'month=2013-10', 'part.npz')) as columns:
+            self.assertTrue(np.all(columns['time'].astype('datetime64[M]') == np.datetime64('2013-10')))
+
+    def test_rerun_skips_unchanged_sources(self):
+        LeanDataConverter(self.data_folder, self.output_folder, 'npz', workers=2).run()
+        summary = LeanDataConverter(self.data_folder, self.output_folder, 'npz', workers=2).run()
+        self.assertEqual(summary['converted'], 0)
+        self.assertEqual(summary['skipped'], 3)
+
+        # touched with the same content: the hash matches and the task is skipped
+        source = os.path.join(self.data_folder, 'equity', 'usa', 'daily', 'spy.zip')
+        os.utime(source, (1, 1))
+        self.assertEqual(LeanDataConverter(self.data_folder, self.output_folder, 'npz', workers=2).run()['converted'], 0)
+
+        # new content is converted again
+        shutil.copy(os.path.join(DATA_FOLDER, 'equity', 'usa', 'daily', 'aapl.zip'), source)
+        summary = LeanDataConverter(self.data_folder, self.output_folder, 'npz', workers=2).run()
+        self.assertEqual(summary['converted'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
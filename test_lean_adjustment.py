@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+
+from lean_adjustment import ADJUSTED, RAW, SPLIT_ADJUSTED, AdjustmentEngine, FactorFile
+from lean_data import LeanDataCache
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'QuantConnectLEAN', 'Lean', 'Data')
+
+
+class TestLeanAdjustment(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = AdjustmentEngine(DATA_FOLDER)
+
+    def setUp(self):
+        self.cache_folder = tempfile.mkdtemp()
+        self.cache = LeanDataCache(DATA_FOLDER, self.cache_folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_folder)
+
+    def test_factor_row_applies_up_to_its_date(self):
+        factor_file = self.engine.factor_files['aapl']
+        times = np.array(['2014-06-06T15:59', '2014-06-09T09:31', '2060-01-01T00:00'], dtype='datetime64[ms]')
+        np.testing.assert_allclose(factor_file.scale_factors(times, SPLIT_ADJUSTED), [0.0357143, 0.25, 1])
+        np.testing.assert_allclose(factor_file.scale_factors(times, ADJUSTED)[:2], [0.9011818 * 0.0357143, 0.9011818 * 0.25])
+        np.testing.assert_array_equal(factor_file.scale_factors(times, RAW), [1, 1, 1])
+
+    def test_split_adjusted_prices_are_continuous(self):
+        raw = self.engine.query(self.cache, 'aapl', 'daily', 'trade', date(2014, 6, 5), date(2014, 6, 10), RAW)
+        adjusted = self.engine.query(self.cache, 'aapl', 'daily', 'trade', date(2014, 6, 5), date(2014, 6, 10), SPLIT_ADJUSTED)
+        # 7:1 split on 2014-06-09
+        self.assertGreater(raw['close'][0] / raw['close'][-1], 6)
+        self.assertLess(abs(adjusted['close'][0] / adjusted['close'][-1] - 1), 0.05)
+        np.testing.assert_allclose(adjusted['volume'] * adjusted['close'], raw['volume'] * raw['close'])
+
+    def test_adjust_keeps_other_columns(self):
+        factor_file = FactorFile(np.array(['2020-01-01'], dtype='datetime64[D]'), [0.5], [0.25])
+        columns = {'time': np.array(['2019-12-31', '2020-01-02'], dtype='datetime64[ms]'),
+                   'close': np.array([100.0, 100.0]), 'volume': np.array([10.0, 10.0]), 'exchange': np.array([b'Q', b'Q'])}
+        result = factor_file.adjust(columns, ADJUSTED)
+        np.testing.assert_allclose(result['close'], [12.5, 100])
+        np.testing.assert_allclose(result['volume'], [40, 10])
+        self.assertIs(result['exchange'], columns['exchange'])
+        with self.assertRaises(ValueError):
+            factor_file.adjust(columns, 'total_return')
+
+    def test_map_file_tickers(self):
+        map_file = self.engine.map_files['goog']
+        self.assertEqual(map_file.ticker_at(np.datetime64('2014-03-28')), 'goocv')
+        self.assertEqual(map_file.ticker_at(np.datetime64('2014-04-03')), 'goog')
+        self.assertIsNone(map_file.ticker_at(np.datetime64('2014-01-01')))
+        self.assertEqual(map_file.segments(date(2014, 3, 1), date(2014, 5, 1)),
+                         [('goocv', date(2014, 3, 27), date(2014, 4, 2)), ('goog', date(2014, 4, 3), date(2014, 5, 1))])
+
+    def test_resolve_historical_ticker(self):
+        # GOOG traded as the class A shares, today's GOOGL, before the 2014 share class split
+        self.assertEqual(self.engine.resolve('GOOG', date(2014, 3, 1)), 'googl')
+        self.assertEqual(self.engine.resolve('GOOG', date(2015, 3, 1)), 'goog')
+        self.assertEqual(self.engine.resolve('XYZ', date(2015, 3, 1)), 'xyz')
+
+    def test_query_follows_ticker_history(self):
+        result = self.engine.query(self.cache, 'goog', 'daily', 'trade', date(2014, 3, 20), date(2014, 4, 10), RAW)
+        self.assertEqual(result['time'][0], np.datetime64('2014-03-27'))
+        self.assertTrue(np.all(np.diff(result['time'].astype(np.int64)) > 0))
+        self.assertEqual(len(result['time']), 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import csv
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+
+from lean_coarse import CoarseStore
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'QuantConnectLEAN', 'Lean', 'Data')
+COARSE_FOLDER = os.path.join(DATA_FOLDER, 'equity', 'usa', 'fundamental', 'coarse')
+
+
+def read_rows(day):
+    with open(os.path.join(COARSE_FOLDER, f"{day:%Y%m%d}.csv")) as f:
+        return list(csv.reader(f))
+
+
+class TestLeanCoarse(unittest.TestCase):
+    def setUp(self):
+        self.cache_folder = tempfile.mkdtemp()
+        self.store = CoarseStore(DATA_FOLDER, self.cache_folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_folder)
+
+    def test_dates(self):
+        dates = self.store.dates()
+        self.assertEqual(len(dates), len(os.listdir(COARSE_FOLDER)))
+        self.assertEqual(dates, sorted(dates))
+
+    def test_top_matches_sorting_the_file(self):
+        day = date(2014, 3, 25)
+        rows = read_rows(day)
+        expected = [row[1] for row in sorted(rows, key=lambda row: float(row[4]), reverse=True)[:250]]
+        top = self.store.top(day, 250)
+        self.assertEqual([ticker.decode() for ticker in top['ticker']], expected)
+        np.testing.assert_array_equal(top['rank'], np.arange(250))
+
+    def test_top_with_fundamental_data(self):
+        day = date(2014, 3, 25)
+        rows = [row for row in read_rows(day) if row[5] == 'True']
+        expected = [row[0] for row in sorted(rows, key=lambda row: float(row[4]), reverse=True)[:100]]
+        top = self.store.top(day, 100, has_fundamental_data=True)
+        self.assertEqual([sid.decode() for sid in top['sid']], expected)
+        self.assertTrue(top['has_fundamental_data'].all())
+        self.assertTrue(np.all(np.diff(top['rank']) > 0))
+
+    def test_get_and_missing_day(self):
+        day = date(2014, 3, 25)
+        self.assertEqual(len(self.store.get(day)['sid']), len(read_rows(day)))
+        self.assertIsNone(self.store.get(date(2000, 1, 1)))
+        self.assertIsNone(self.store.top(date(2000, 1, 1), 10))
+
+    def test_store_is_reused(self):
+        index = self.store.update()
+        store = CoarseStore(DATA_FOLDER, self.cache_folder)
+        self.assertEqual(store.update(), index)
+        self.assertEqual(len(store.top(date(2014, 3, 25), 10)['sid']), 10)
+
+    def test_update_appends_new_days_and_compacts_changed_ones(self):
+        data_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_folder)
+        cache_folder = os.path.join(data_folder, 'cache')
+        source_folder = os.path.join(data_folder, 'equity', 'usa', 'fundamental', 'coarse')
+        os.makedirs(source_folder)
+        names = sorted(os.listdir(COARSE_FOLDER))
+        for name in names[:3]:
+            shutil.copy(os.path.join(COARSE_FOLDER, name), source_folder)
+        index = CoarseStore(data_folder, cache_folder).update()
+
+        # a new day is appended after the existing rows
+        shutil.copy(os.path.join(COARSE_FOLDER, names[3]), source_folder)
+        appended = CoarseStore(data_folder, cache_folder).update()
+        self.assertEqual(appended['days'][names[3][:8]][0], index['rows'])
+        self.assertEqual({key: entry for key, entry in appended['days'].items() if key != names[3][:8]}, index['days'])
+
+        # changed and removed days leave unused rows, compacted once they make up half of the files
+        os.remove(os.path.join(source_folder, names[0]))
+        for name in names[1:4]:
+            os.utime(os.path.join(source_folder, name), (0, 0))
+        store = CoarseStore(data_folder, cache_folder)
+        compacted = store.update()
+        self.assertEqual(sorted(compacted['days']), [name[:8] for name in names[1:4]])
+        self.assertEqual(compacted['rows'], sum(stop - begin for begin, stop, _, _, _ in compacted['days'].values()))
+        for name in names[1:4]:
+            day = date(int(name[:4]), int(name[4:6]), int(name[6:8]))
+            expected = self.store.top(day, 50, has_fundamental_data=True)
+            actual = store.top(day, 50, has_fundamental_data=True)
+            for column in expected:
+                np.testing.assert_array_equal(actual[column], expected[column])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+
+import numpy as np
+
+from lean_data import LeanDataCache, get_source_path, list_source_dates, read_zip
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'QuantConnectLEAN', 'Lean', 'Data')
+
+
+class TestLeanData(unittest.TestCase):
+    def setUp(self):
+        self.cache_folder = tempfile.mkdtemp()
+        self.cache = LeanDataCache(DATA_FOLDER, self.cache_folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_folder)
+
+    def test_read_minute_trade(self):
+        path = get_source_path(DATA_FOLDER, 'equity', 'usa', 'minute', 'SPY', 'trade', date(2013, 10, 7))
+        columns = read_zip(path, 'equity', 'minute', 'trade', date(2013, 10, 7))
+        self.assertEqual(columns['time'][0].astype('datetime64[D]'), np.datetime64('2013-10-07'))
+        self.assertTrue(np.all(np.diff(columns['time'].astype(np.int64)) > 0))
+        # prices are unscaled from deci-cents
+        self.assertTrue(100 < columns['close'][0] < 200)
+        self.assertTrue(np.all(columns['high'] >= columns['low']))
+
+    def test_read_daily(self):
+        path = get_source_path(DATA_FOLDER, 'equity', 'usa', 'daily', 'SPY', 'trade')
+        columns = read_zip(path, 'equity', 'daily', 'trade')
+        self.assertEqual(set(columns), {'time', 'open', 'high', 'low', 'close', 'volume'})
+        self.assertIn(np.datetime64('2013-10-07T00:00', 'ms'), columns['time'])
+
+    def test_read_futures_adds_expiry(self):
+        day = list_source_dates(DATA_FOLDER, 'future', 'cme', 'minute', 'ES', 'trade')[0]
+        path = get_source_path(DATA_FOLDER, 'future', 'cme', 'minute', 'ES', 'trade', day)
+        columns = read_zip(path, 'future', 'minute', 'trade', day)
+        self.assertIn('expiry', columns)
+        self.assertTrue(np.all(np.diff(columns['time'].astype(np.int64)) >= 0))
+
+    def test_read_crypto_with_empty_fields(self):
+        day = list_source_dates(DATA_FOLDER, 'crypto', 'coinbase', 'minute', 'BTCUSD', 'trade')[0]
+        path = get_source_path(DATA_FOLDER, 'crypto', 'coinbase', 'minute', 'BTCUSD', 'trade', day)
+        columns = read_zip(path, 'crypto', 'minute', 'trade', day)
+        self.assertGreater(len(columns['time']), 0)
+        self.assertFalse(np.isnan(columns['volume']).any())
+
+    def test_query_matches_source(self):
+        start, end = date(2013, 10, 7), date(2013, 10, 8)
+        result = self.cache.query('equity', 'usa', 'minute', 'SPY', 'trade', start, end)
+        expected = [read_zip(get_source_path(DATA_FOLDER, 'equity', 'usa', 'minute', 'SPY', 'trade', day), 'equity', 'minute', 'trade', day)
+                    for day in list_source_dates(DATA_FOLDER, 'equity', 'usa', 'minute', 'SPY', 'trade') if start <= day <= end]
+        np.testing.assert_array_equal(result['close'], np.concatenate([part['close'] for part in expected]))
+        self.assertIsInstance(result['close'], np.memmap)
+
+    def test_query_datetime_range(self):
+        result = self.cache.query('equity', 'usa', 'minute', 'SPY', 'trade',
+                                  datetime(2013, 10, 7, 10, 0), datetime(2013, 10, 7, 11, 0))
+        self.assertEqual(result['time'][0], np.datetime64('2013-10-07T10:00'))
+        self.assertEqual(result['time'][-1], np.datetime64('2013-10-07T11:00'))
+
+    def test_query_daily_range(self):
+        result = self.cache.query('equity', 'usa', 'daily', 'SPY', 'trade', date(2013, 1, 1), date(2013, 12, 31))
+        self.assertTrue(np.all(result['time'] >= np.datetime64('2013-01-01')))
+        self.assertTrue(np.all(result['time'] < np.datetime64('2014-01-01')))
+
+    def test_cache_is_reused_until_source_changes(self):
+        args = ('equity', 'usa', 'minute', 'SPY', 'trade', date(2013, 10, 7), date(2013, 10, 7))
+        index = self.cache.update(*args)
+        segment = index['segments']['20131007']
+        self.assertEqual(self.cache.update(*args)['segments']['20131007'], segment)
+
+        # a different modification time on record forces the day to be decoded again
+        folder = self.cache._key_folder('equity', 'usa', 'minute', 'SPY', 'trade')
+        index['segments']['20131007'][2] = 0
+        with open(os.path.join(folder, 'index.json'), 'w') as f:
+            json.dump(index, f)
+        self.assertNotEqual(self.cache.update(*args)['segments']['20131007'][2], 0)
+
+    def test_update_appends_new_days(self):
+        index = self.cache.update('equity', 'usa', 'minute', 'SPY', 'trade', date(2013, 10, 7), date(2013, 10, 7))
+        segment = index['segments']['20131007']
+        index = self.cache.update('equity', 'usa', 'minute', 'SPY', 'trade', date(2013, 10, 7), date(2013, 10, 8))
+        # the cached day keeps its rows, the new one follows it
+        self.assertEqual(index['segments']['20131007'], segment)
+        self.assertEqual(index['segments']['20131008'][0], segment[1])
+        self.assertEqual(index['rows'], index['segments']['20131008'][1])
+
+    def test_query_after_day_decoded_again(self):
+        start, end = date(2013, 10, 7), date(2013, 10, 8)
+        expected = self.cache.query('equity', 'usa', 'minute', 'SPY', 'trade', start, end)['close'].copy()
+        folder = self.cache._key_folder('equity', 'usa', 'minute', 'SPY', 'trade')
+        index = self.cache._load_index(folder)
+        index['segments']['20131007'][2] = 0
+        with open(os.path.join(folder, 'index.json'), 'w') as f:
+            json.dump(index, f)
+
+        # the day is appended after the next one, its old rows stay unused
+        result = self.cache.query('equity', 'usa', 'minute', 'SPY', 'trade', start, end)
+        np.testing.assert_array_equal(result['close'], expected)
+        self.assertGreater(self.cache._load_index(folder)['segments']['20131007'][0], index['segments']['20131008'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import asyncio
+import unittest
+from datetime import date, datetime, timedelta
+
+from bot import ChannelManager, SignalDispatcher
+from signal_replay import Bar, Signal, FakeTransport, ReplayClock, SignalReplay, every_bar_signals, crossover_signals, read_bars
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'QuantConnectLEAN', 'Lean', 'Data')
+CHANNELS = {"1": {"signals": ["BAR"], "rate_limit": 2, "send_times": ["00:00"], "rate_limit_interval": 60}}
+
+
+def make_bars(count, start=datetime(2020, 1, 6, 9, 30), step=timedelta(seconds=1)):
+    return [Bar(start + i * step, 'spy', 1.0, 1.0, 1.0, 1.0, 100) for i in range(count)]
+
+
+class TestSignalDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.clock = ReplayClock(datetime(2020, 1, 6))
+        self.channel_manager = ChannelManager(CHANNELS, {}, clock=self.clock)
+        self.transport = FakeTransport(self.clock)
+
+    def test_holds_back_and_flushes(self):
+        dispatcher = SignalDispatcher(self.channel_manager, self.transport)
+        for i in range(4):
+            asyncio.run(dispatcher.dispatch('BAR', str(i)))
+        self.assertEqual([content for _, _, content in self.transport.sent], ['0', '1'])
+        self.assertEqual(dispatcher.pending_count(), 2)
+
+        # still inside the rate limit interval
+        self.clock.current += timedelta(seconds=30)
+        asyncio.run(dispatcher.flush())
+        self.assertEqual(dispatcher.pending_count(), 2)
+
+        self.clock.current += timedelta(seconds=31)
+        self.channel_manager.reset_message_counters()
+        asyncio.run(dispatcher.flush())
+        self.assertEqual([content for _, _, content in self.transport.sent], ['0', '1', '2', '3'])
+        self.assertEqual(dispatcher.delayed, 2)
+        self.assertEqual(dispatcher.max_delay, 61)
+
+    def test_drops_when_full(self):
+        dispatcher = SignalDispatcher(self.channel_manager, self.transport, max_pending=1)
+        for i in range(5):
+            asyncio.run(dispatcher.dispatch('BAR', str(i)))
+        self.assertEqual(dispatcher.delivered, 2)
+        self.assertEqual(dispatcher.pending_count(), 1)
+        self.assertEqual(dispatcher.dropped, 2)
+
+    def test_keeps_messages_when_the_send_fails(self):
+        dispatcher = SignalDispatcher(self.channel_manager, self.transport)
+        send = self.transport.send
+
+        async def failing_send(channel_id, content):
+            raise ValueError(f"Unknown channel {channel_id}")
+        self.transport.send = failing_send
+        asyncio.run(dispatcher.dispatch('BAR', '0'))
+        asyncio.run(dispatcher.flush())
+        self.assertEqual(dispatcher.pending_count(), 1)
+        self.assertEqual(dispatcher.delivered, 0)
+
+        self.transport.send = send
+        asyncio.run(dispatcher.flush())
+        self.assertEqual([content for _, _, content in self.transport.sent], ['0'])
+        self.assertEqual(dispatcher.pending_count(), 0)
+
+    def test_unsubscribed_signal(self):
+        dispatcher = SignalDispatcher(self.channel_manager, self.transport)
+        asyncio.run(dispatcher.dispatch('OTHER', 'x'))
+        self.assertEqual(self.transport.sent, [])
+
+
+class TestSignalReplay(unittest.TestCase):
+    def test_every_bar_counts(self):
+        # 2 messages per 60 seconds, 10 bars a second apart
+        replay = SignalReplay(make_bars(10), every_bar_signals, CHANNELS, max_pending=5)
+        report = asyncio.run(replay.run())
+        self.assertEqual(report['bars'], 10)
+        self.assertEqual(report['signals'], 10)
+        self.assertEqual(report['delivered'], 7)
+        self.assertEqual(report['delayed'], 5)
+        self.assertEqual(report['dropped'], 3)
+        self.assertEqual(report['undelivered'], 0)
+        self.assertEqual(report['delivered'] + report['dropped'], report['signals'])
+
+    def test_daily_reset(self):
+        # a bar per day never hits the daily message count
+        bars = make_bars(5, step=timedelta(days=1))
+        channels = {"1": dict(CHANNELS["1"], rate_limit=1)}
+        report = asyncio.run(SignalReplay(bars, every_bar_signals, channels).run())
+        self.assertEqual(report['delivered_on_time'], 5)
+
+    def test_crossover_signals(self):
+        closes = [10.0] * 40 + [20.0] * 40 + [5.0] * 40
+        bars = [Bar(datetime(2020, 1, 6) + timedelta(minutes=i), 'spy', c, c, c, c, 1) for i, c in enumerate(closes)]
+        signals = list(crossover_signals(bars))
+        self.assertEqual([signal.content.split(' ')[1:3] for signal in signals], [['crossed', 'up'], ['crossed', 'down']])
+
+    def test_read_bars_merged(self):
+        bars = list(read_bars(DATA_FOLDER, ['SPY', 'IBM'], start=date(2013, 10, 7), end=date(2013, 10, 7)))
+        self.assertEqual({bar.symbol for bar in bars}, {'spy', 'ibm'})
+        self.assertEqual([bar.time for bar in bars], sorted(bar.time for bar in bars))
+        self.assertTrue(all(bar.time.date() == date(2013, 10, 7) for bar in bars))
+
+    def test_read_bars_without_end(self):
+        bars = list(read_bars(DATA_FOLDER, ['SPY'], start=date(2013, 10, 11)))
+        self.assertTrue(bars)
+        self.assertTrue(all(bar.time.date() >= date(2013, 10, 11) for bar in bars))
+
+
+if __name__ == '__main__':
+    unittest.main()